@@ -0,0 +1,20 @@
+# __init__.py
+
+from .reviews import summarize_reviews
+from .geo import GeoIndex, haversine_km
+from .ranking import REVIEW_SORTING_METHODS, FrameCache, HotelFilter, HotelFrame, frame_cache
+from .prices import price_percentiles, priced, window_prices
+
+__all__ = [
+    "summarize_reviews",
+    "FrameCache",
+    "HotelFilter",
+    "HotelFrame",
+    "REVIEW_SORTING_METHODS",
+    "frame_cache",
+    "GeoIndex",
+    "haversine_km",
+    "price_percentiles",
+    "priced",
+    "window_prices",
+]
@@ -0,0 +1,87 @@
+from typing import Optional
+
+import numpy as np
+
+# Mean Earth radius
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(latitude: float, longitude: float, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Great circle distances in km from one point to arrays of points, in degrees."""
+    lat, lon = np.radians(latitude), np.radians(longitude)
+    lats, lons = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class GeoIndex:
+    """Points sorted by latitude, for radius and nearest neighbour queries.
+
+    A radius query narrows the points down to the latitude band the circle spans
+    with two binary searches, drops the ones outside its longitude span and only
+    computes exact haversine distances for what is left. Nearest neighbours grow
+    the radius from a first guess until enough points fall inside it.
+
+    Args:
+        latitudes: Latitude of every point in degrees
+        longitudes: Longitude of every point in degrees
+    """
+
+    def __init__(self, latitudes: np.ndarray, longitudes: np.ndarray):
+        self.order = np.argsort(latitudes, kind="stable")
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)[self.order]
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)[self.order]
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def within(
+        self, latitude: float, longitude: float, radius_km: float, mask: Optional[np.ndarray] = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Positions of the points at most `radius_km` away and their distances, nearest first.
+
+        Args:
+            latitude (float): Latitude of the centre in degrees
+            longitude (float): Longitude of the centre in degrees
+            radius_km (float): Radius of the circle in km
+            mask: Boolean array by position of the points which may be returned
+        """
+        span = np.degrees(radius_km / EARTH_RADIUS_KM)
+        start = np.searchsorted(self.latitudes, latitude - span, side="left")
+        end = np.searchsorted(self.latitudes, latitude + span, side="right")
+        lats, lons = self.latitudes[start:end], self.longitudes[start:end]
+        positions = self.order[start:end]
+
+        # Meridians converge, a km spans more degrees of longitude away from the equator
+        lon_span = span / np.cos(np.radians(min(abs(latitude) + span, 89.9)))
+        near = np.abs((lons - longitude + 180) % 360 - 180) <= lon_span
+        if mask is not None:
+            near &= mask[positions]
+        distances = haversine_km(latitude, longitude, lats[near], lons[near])
+        inside = distances <= radius_km
+        positions, distances = positions[near][inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return positions[order], distances[order]
+
+    def nearest(
+        self, latitude: float, longitude: float, k: int, mask: Optional[np.ndarray] = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Positions of the `k` nearest points and their distances, nearest first.
+
+        Args:
+            latitude (float): Latitude of the reference point in degrees
+            longitude (float): Longitude of the reference point in degrees
+            k (int): Number of points to return
+            mask: Boolean array by position of the points which may be returned
+        """
+        available = len(self) if mask is None else int(mask.sum())
+        k = min(k, available)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        radius_km = 1.0
+        while True:
+            positions, distances = self.within(latitude, longitude, radius_km, mask)
+            # Half the globe away every point is inside
+            if len(positions) >= k or radius_km > np.pi * EARTH_RADIUS_KM:
+                return positions[:k], distances[:k]
+            radius_km *= 4
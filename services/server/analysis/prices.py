@@ -0,0 +1,54 @@
+from datetime import date
+from typing import Optional, Sequence
+
+import numpy as np
+
+from services.server.analysis.ranking import HotelFilter, HotelFrame
+from services.server.schema.api_response import DateWindowPrice, Hotel
+
+PRICE_PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def priced(frame: HotelFrame, filters: Optional[HotelFilter] = None) -> np.ndarray:
+    """Positions of the hotels passing `filters` which have a price per night."""
+    return np.flatnonzero(frame.mask(filters or HotelFilter()) & ~np.isnan(frame.price_per_night))
+
+
+def price_percentiles(frame: HotelFrame, selected: np.ndarray) -> dict[str, float]:
+    """Percentiles of the price per night of the `selected` hotels, keyed `p10` to `p90`."""
+    if not len(selected):
+        return {}
+    values = np.percentile(frame.price_per_night[selected], PRICE_PERCENTILES)
+    return {f"p{percentile}": round(float(value), 2) for percentile, value in zip(PRICE_PERCENTILES, values)}
+
+
+def window_prices(
+    checkin_date: date,
+    checkout_date: date,
+    hotels: Sequence[Hotel],
+    filters: Optional[HotelFilter] = None,
+) -> DateWindowPrice:
+    """Lowest and median price per night of the hotels found for one check-in window.
+
+    Hotels failing `filters` or without a price per night are left out.
+
+    Args:
+        checkin_date (date): Check-in date of the window
+        checkout_date (date): Check-out date of the window
+        hotels: The hotels the search of the window returned
+        filters (HotelFilter): Filters the hotels must pass, sold out hotels are left out by default
+    """
+    frame = HotelFrame(hotels)
+    selected = priced(frame, filters)
+    window = DateWindowPrice(
+        checkin_date=checkin_date.isoformat(), checkout_date=checkout_date.isoformat(), hotels=len(selected)
+    )
+    if not len(selected):
+        return window
+    prices = frame.price_per_night[selected]
+    cheapest = frame.hotels[selected[np.argmin(prices)]]
+    window.min_price_per_night = round(float(prices.min()), 2)
+    window.median_price_per_night = round(float(np.median(prices)), 2)
+    window.cheapest_hotel_id = cheapest.hotel_id
+    window.cheapest_hotel_name = cheapest.hotel_name
+    return window
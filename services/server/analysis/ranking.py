@@ -0,0 +1,221 @@
+import os
+from collections import OrderedDict
+from functools import cached_property
+from operator import attrgetter, is_
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from services.server.analysis.geo import GeoIndex
+from services.server.schema.api_response import Hotel
+from shared.schema.sorting_methods import SortingMethods
+
+# Reviews a hotel needs before its own score outweighs the average of the results
+BAYESIAN_PRIOR_REVIEWS = float(os.getenv("RANKING_BAYESIAN_PRIOR_REVIEWS", 50))
+
+# Orders of reviews by date, hotels have no date to be sorted on
+REVIEW_SORTING_METHODS = frozenset({SortingMethods.RECENCY_DESC, SortingMethods.RECENCY_ASC})
+
+
+class HotelFilter(BaseModel):
+    min_price_per_night: Optional[float] = Field(None, description="Lowest acceptable price per night")
+    max_price_per_night: Optional[float] = Field(None, description="Highest acceptable price per night")
+    max_total_price: Optional[float] = Field(None, description="Highest acceptable price for the whole stay")
+    min_review_score: Optional[float] = Field(None, description="Lowest acceptable guest review score, 0 to 10")
+    min_review_count: Optional[int] = Field(None, description="Fewest reviews a hotel needs to be trusted")
+    min_class: Optional[int] = Field(None, description="Fewest stars")
+    max_class: Optional[int] = Field(None, description="Most stars")
+    max_distance_km: Optional[float] = Field(None, description="Farthest acceptable distance from the centre in km")
+    free_cancellation: Optional[bool] = Field(None, description="Only hotels with (or without) free cancellation")
+    no_prepayment: Optional[bool] = Field(None, description="Only hotels which can (or can't) be booked without prepayment")
+    breakfast_included: Optional[bool] = Field(None, description="Only hotels with (or without) breakfast included")
+    free_parking: Optional[bool] = Field(None, description="Only hotels with (or without) free parking")
+    accommodation_types: Optional[list[str]] = Field(
+        None, description="Accepted accommodation types, e.g. Hotel, Apartment, Villa"
+    )
+    include_sold_out: bool = Field(False, description="Keep hotels which are sold out for the dates")
+
+
+def _amount(name: str) -> Callable[[Hotel], float]:
+    def get(hotel: Hotel) -> float:
+        amount = getattr(hotel.composite_price_breakdown, name, None)
+        return amount.value if amount is not None else np.nan
+
+    return get
+
+
+def _km(hotel: Hotel) -> float:
+    try:
+        return float(hotel.distance_to_cc)
+    except ValueError:
+        return np.nan
+
+
+class HotelFrame:
+    """The fields hotels are filtered and ranked on, one NumPy column per field.
+
+    Columns are extracted from the models once; every filter is then a vectorized
+    comparison and every ranking a single `np.lexsort`, so re-ranking a cached
+    result set takes microseconds. Missing prices, scores and distances are NaN
+    and fail every bound put on them.
+    """
+
+    def __init__(self, hotels: Sequence[Hotel]):
+        self.hotels = list(hotels)
+
+        def column(get: Callable[[Hotel], object], dtype=np.float64) -> np.ndarray:
+            return np.fromiter((get(hotel) for hotel in self.hotels), dtype=dtype, count=len(self.hotels))
+
+        def flag(name: str) -> np.ndarray:
+            return column(lambda hotel: bool(getattr(hotel, name)), bool)
+
+        self.position = np.arange(len(self.hotels))
+        self.hotel_id = column(attrgetter("hotel_id"), np.int64)
+        self.price_per_night = column(_amount("gross_amount_per_night"))
+        self.total_price = column(_amount("gross_amount"))
+        self.review_score = column(
+            lambda hotel: hotel.review_score if hotel.review_score is not None else np.nan
+        )
+        self.review_count = column(lambda hotel: hotel.review_nr or 0, np.int64)
+        self.hotel_class = column(attrgetter("hotel_class"), np.int64)
+        self.distance_km = column(_km)
+        self.latitude = column(attrgetter("latitude"))
+        self.longitude = column(attrgetter("longitude"))
+        self.free_cancellation = flag("is_free_cancellable")
+        self.no_prepayment = flag("is_no_prepayment_block")
+        self.breakfast_included = flag("hotel_include_breakfast")
+        self.free_parking = flag("has_free_parking")
+        self.sold_out = flag("soldout")
+        self.accommodation_type = np.array(
+            [hotel.accommodation_type_name.lower() for hotel in self.hotels], dtype=str
+        )
+
+        # Scores shrunk towards the mean score of the results, by how few reviews back them
+        scored = ~np.isnan(self.review_score)
+        mean = self.review_score[scored].mean() if scored.any() else 0.0
+        counts = np.where(scored, self.review_count, 0)
+        self.bayesian_score = (np.nan_to_num(self.review_score) * counts + mean * BAYESIAN_PRIOR_REVIEWS) / (
+            counts + BAYESIAN_PRIOR_REVIEWS
+        )
+
+    def __len__(self) -> int:
+        return len(self.hotels)
+
+    @cached_property
+    def geo(self) -> GeoIndex:
+        """Spatial index of the hotels, built on the first proximity query."""
+        return GeoIndex(self.latitude, self.longitude)
+
+    def mask(self, filters: HotelFilter) -> np.ndarray:
+        """Boolean column of the hotels passing every set filter."""
+        keep = np.ones(len(self), dtype=bool)
+        bounds = (
+            (self.price_per_night, np.greater_equal, filters.min_price_per_night),
+            (self.price_per_night, np.less_equal, filters.max_price_per_night),
+            (self.total_price, np.less_equal, filters.max_total_price),
+            (self.review_score, np.greater_equal, filters.min_review_score),
+            (self.review_count, np.greater_equal, filters.min_review_count),
+            (self.hotel_class, np.greater_equal, filters.min_class),
+            (self.hotel_class, np.less_equal, filters.max_class),
+            (self.distance_km, np.less_equal, filters.max_distance_km),
+        )
+        for values, compare, bound in bounds:
+            if bound is not None:
+                keep &= compare(values, bound)
+        flags = (
+            (self.free_cancellation, filters.free_cancellation),
+            (self.no_prepayment, filters.no_prepayment),
+            (self.breakfast_included, filters.breakfast_included),
+            (self.free_parking, filters.free_parking),
+        )
+        for values, wanted in flags:
+            if wanted is not None:
+                keep &= values == wanted
+        if filters.accommodation_types:
+            keep &= np.isin(self.accommodation_type, [kind.lower() for kind in filters.accommodation_types])
+        if not filters.include_sold_out:
+            keep &= ~self.sold_out
+        return keep
+
+    def sort_key(self, method: SortingMethods) -> np.ndarray:
+        """Column ordering the hotels by `method` when sorted ascending, missing values last."""
+        if method in REVIEW_SORTING_METHODS:
+            raise ValueError(f"{method.name} sorts reviews, not hotels")
+        keys = {
+            SortingMethods.DISTANCE: self.distance_km,
+            # Upstream returns the superset by popularity, which is also its relevance order
+            SortingMethods.POPULARITY: self.position,
+            SortingMethods.RELEVANCE: self.position,
+            SortingMethods.BAYESIAN_REVIEW_SCORE: -self.bayesian_score,
+            SortingMethods.HOTEL_STAR_RATING_DESC: -self.hotel_class,
+            SortingMethods.HOTEL_STAR_RATING_ASC: self.hotel_class,
+            SortingMethods.PRICE_LOW_TO_HIGH: self.price_per_night,
+        }
+        key = keys[method].astype(np.float64)
+        return np.where(np.isnan(key), np.inf, key)
+
+    def rank(
+        self,
+        filters: Optional[HotelFilter] = None,
+        sort_by: Sequence[SortingMethods] = (SortingMethods.POPULARITY,),
+        limit: Optional[int] = None,
+    ) -> list[Hotel]:
+        """Hotels passing `filters`, ordered by the methods of `sort_by` in turn.
+
+        Args:
+            filters (HotelFilter): Filters to apply, none by default
+            sort_by: Sorting methods, later ones break the ties of earlier ones
+            limit (int): The maximum number of hotels to return
+        """
+        # Review-only methods raise before the filters run
+        sort_keys = [self.sort_key(method) for method in reversed(sort_by)]
+        selected = np.flatnonzero(self.mask(filters or HotelFilter()))
+        # np.lexsort sorts by its last key first, upstream order breaks the remaining ties
+        keys = [self.position[selected]] + [key[selected] for key in sort_keys]
+        order = selected[np.lexsort(keys)][:limit]
+        return [self.hotels[i] for i in order]
+
+
+class FrameCache:
+    """Frames of recently ranked result sets, rebuilt only when the results change.
+
+    A frame is kept along with the hotels it was built from and reused as long as
+    it is asked for the very same hotel objects, so that a search cache entry
+    replaced by a refresh gets a new frame.
+
+    Settings can be overridden through the environment:
+        RANKING_FRAME_CACHE_SIZE: Max number of frames kept (default 64)
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or int(os.getenv("RANKING_FRAME_CACHE_SIZE", 64))
+        self._frames: OrderedDict[str, tuple[list[Hotel], HotelFrame]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, hotels: list[Hotel]) -> HotelFrame:
+        entry = self._frames.get(key)
+        if entry is not None and len(entry[0]) == len(hotels) and all(map(is_, entry[0], hotels)):
+            self.hits += 1
+            self._frames.move_to_end(key)
+            return entry[1]
+        self.misses += 1
+        frame = HotelFrame(hotels)
+        self._frames[key] = (hotels, frame)
+        self._frames.move_to_end(key)
+        while len(self._frames) > self.max_entries:
+            self._frames.popitem(last=False)
+        return frame
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._frames),
+        }
+
+
+frame_cache = FrameCache()
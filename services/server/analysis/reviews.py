@@ -0,0 +1,90 @@
+import os
+import re
+from datetime import date
+from typing import Iterable, Optional
+
+import numpy as np
+
+from services.server.schema.api_response import HotelReview, PhraseCount, ReviewSummary
+
+# Days after which a review weighs half as much in the recency weighted score
+RECENCY_HALF_LIFE_DAYS = float(os.getenv("REVIEW_RECENCY_HALF_LIFE_DAYS", 180))
+
+_word = re.compile(r"[a-zà-ÿ']+")
+_clause = re.compile(r"[,.;:!?()\n]+")
+STOPWORDS = frozenset(
+    """a an and are as at be but by for from had has have i in is it its it's of on or our so
+    that the their there this to too us very was we were with you all not no nothing everything
+    really quite bit little just also""".split()
+)
+
+
+def _bigrams(text: Optional[str]) -> set[str]:
+    """Distinct two word phrases of a text, skipping the ones made of filler words."""
+    if not text:
+        return set()
+    phrases = set()
+    for clause in _clause.split(text.lower()):
+        words = _word.findall(clause)
+        phrases.update(
+            f"{first} {second}"
+            for first, second in zip(words, words[1:])
+            if first not in STOPWORDS and second not in STOPWORDS
+        )
+    return phrases
+
+
+def _top(values: list[str], top: int) -> list[PhraseCount]:
+    if not values:
+        return []
+    phrases, counts = np.unique(np.array(values), return_counts=True)
+    # Most frequent first, ties alphabetically thanks to the stable sort of sorted uniques
+    order = np.argsort(-counts, kind="stable")[:top]
+    return [PhraseCount(phrase=str(phrases[i]), count=int(counts[i])) for i in order]
+
+
+def summarize_reviews(
+    hotel_id: str, reviews: Iterable[HotelReview], today: Optional[date] = None, top: int = 5
+) -> ReviewSummary:
+    """Condense reviews into a fixed size summary.
+
+    Scores, dates and purposes are turned into arrays once and every statistic is
+    computed on them with NumPy. Tags and pros/cons phrases are counted once per
+    review, so a phrase repeated within one review doesn't dominate.
+
+    Args:
+        hotel_id (str): The ID of the hotel the reviews belong to
+        reviews: The reviews to summarize
+        today (date): Reference date of the recency weighting, defaults to today
+        top (int): Number of tags and phrases to keep per list
+    """
+    reviews = list(reviews)
+    if not reviews:
+        return ReviewSummary(hotel_id=hotel_id, review_count=0)
+
+    scores = np.fromiter((review.average_score for review in reviews), dtype=np.float64, count=len(reviews))
+    dates = np.array([review.date[:10] for review in reviews], dtype="datetime64[D]")
+    age = (np.datetime64(today or date.today(), "D") - dates).astype(np.float64).clip(min=0)
+    weights = np.exp2(-age / RECENCY_HALF_LIFE_DAYS)
+
+    buckets = np.bincount(np.clip(np.floor(scores), 1, 10).astype(np.int64), minlength=11)[1:]
+    purposes, purpose_counts = np.unique(
+        np.array([review.travel_purpose or "unknown" for review in reviews]), return_counts=True
+    )
+
+    return ReviewSummary(
+        hotel_id=hotel_id,
+        review_count=len(reviews),
+        average_score=round(float(scores.mean()), 2),
+        recency_weighted_score=round(float(np.average(scores, weights=weights)), 2),
+        score_distribution={str(score): int(count) for score, count in enumerate(buckets, start=1)},
+        travel_purpose={
+            str(purpose): round(float(count) / len(reviews), 3)
+            for purpose, count in zip(purposes, purpose_counts)
+        },
+        top_tags=_top([tag for review in reviews for tag in set(review.tags)], top),
+        top_pros=_top([phrase for review in reviews for phrase in _bigrams(review.pros)], top),
+        top_cons=_top([phrase for review in reviews for phrase in _bigrams(review.cons)], top),
+        newest_review=str(dates.max()),
+        oldest_review=str(dates.min()),
+    )
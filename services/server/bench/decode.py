@@ -0,0 +1,75 @@
+"""Micro-benchmark of the per-hotel decode cost of `/hotels/search` responses.
+
+Compares the former per-item path (manual key popping, a freshly generated JSON
+schema plus `jsonschema.validate` and `Hotel(**item)` for every hotel) with the
+compiled `HOTEL_DECODER` which parses the raw bytes in pydantic-core.
+
+Usage:
+    python -m services.server.bench.decode [--hotels N] [--repeat N]
+"""
+import argparse
+import json
+import timeit
+
+from services.server.mock_upstream.samples import sample_search_page
+from services.server.decoding import HOTEL_DECODER
+from services.server.schema.api_response import Hotel
+
+LEGACY_KEYS_TO_REMOVE = HOTEL_DECODER.projection.drop
+LEGACY_BREAKDOWN_KEYS = HOTEL_DECODER.projection.nested["composite_price_breakdown"].drop
+
+
+def legacy_decode(content: bytes) -> list[Hotel]:
+    from jsonschema import validate
+
+    response = json.loads(content).get("result", [])
+    for item in response:
+        for key in LEGACY_KEYS_TO_REMOVE:
+            item.pop(key, None)
+        if "composite_price_breakdown" in item:
+            breakdown = item["composite_price_breakdown"]
+            for key in LEGACY_BREAKDOWN_KEYS:
+                breakdown.pop(key, None)
+    result = []
+    for item in response:
+        validate(item, Hotel.model_json_schema(mode="serialization"))
+        if "composite_price_breakdown" in item:
+            result.append(Hotel(**item))
+    return result
+
+
+def compiled_decode(content: bytes) -> list[Hotel]:
+    return HOTEL_DECODER.decode(content)
+
+
+def measure(fn, content: bytes, hotels: int, repeat: int) -> float:
+    """Best per-hotel decode time in microseconds."""
+    best = min(timeit.repeat(lambda: fn(content), number=1, repeat=repeat))
+    return best / hotels * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m services.server.bench.decode")
+    parser.add_argument("--hotels", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    content = json.dumps(sample_search_page(args.hotels)).encode()
+
+    results = {}
+    try:
+        assert compiled_decode(content) == legacy_decode(content)
+        results["legacy"] = measure(legacy_decode, content, args.hotels, args.repeat)
+    except ImportError:
+        print("jsonschema is not installed, skipping the legacy path")
+    results["compiled"] = measure(compiled_decode, content, args.hotels, args.repeat)
+
+    print(f"{len(content) / 1024:.1f} KiB page with {args.hotels} hotels")
+    for name, per_hotel in results.items():
+        print(f"{name:>10}: {per_hotel:9.1f} us/hotel")
+    if "legacy" in results:
+        print(f"{'speedup':>10}: {results['legacy'] / results['compiled']:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Token cost of the `json` and `table` output formats of the search and review tools.
+
+Tool results are serialized the way FastMCP puts them into the text content
+seen by the model. Tokens are counted with tiktoken's `o200k_base` encoding when
+it is available, else estimated by counting words and punctuation marks, which
+tracks BPE token counts of JSON closely enough for a relative comparison.
+
+Usage:
+    python -m services.server.bench.tokens [--hotels N] [--reviews N] [--fixtures DIR]
+"""
+import argparse
+import json
+import re
+from pathlib import Path
+from typing import Callable
+
+from fastmcp.tools.tool import default_serializer
+
+from services.server.decoding import HOTEL_DECODER, REVIEW_DECODER, ResponseDecoder
+from services.server.encoding import HOTEL_TABLE, REVIEW_TABLE, TableEncoder
+from services.server.mock_upstream.samples import sample_reviews_page, sample_search_page
+
+_words = re.compile(r"\w+|[^\w\s]")
+
+
+def tokenizer() -> tuple[str, Callable[[str], int]]:
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("o200k_base")
+        return "tiktoken o200k_base", lambda text: len(encoding.encode(text))
+    except Exception:
+        # Not installed, or the encoding can't be downloaded
+        return "estimate (words and punctuation)", lambda text: len(_words.findall(text))
+
+
+def compare(name: str, bodies: list[bytes], decoder: ResponseDecoder, table: TableEncoder, count) -> dict:
+    formats = {"json": 0, "table": 0}
+    sizes = {"json": 0, "table": 0}
+    items = 0
+    for body in bodies:
+        models = decoder.decode(body)
+        items += len(models)
+        for output_format, result in (("json", models), ("table", table.encode(models))):
+            text = default_serializer(result)
+            sizes[output_format] += len(text.encode())
+            formats[output_format] += count(text)
+    return {
+        "result": name,
+        "items": items,
+        "bytes": sizes,
+        "tokens": formats,
+        "tokens_per_item": {key: value / max(items, 1) for key, value in formats.items()},
+        "saving": 1 - formats["table"] / formats["json"] if formats["json"] else 0.0,
+    }
+
+
+def _fixture_bodies(directory: Path, endpoint: str) -> list[bytes]:
+    bodies = []
+    for file in sorted((directory / endpoint).glob("*.json")):
+        fixture = json.loads(file.read_text())
+        if fixture["status"] == 200:
+            bodies.append(json.dumps(fixture["body"]).encode())
+    return bodies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m services.server.bench.tokens")
+    parser.add_argument("--hotels", type=int, default=20, help="Hotels per synthetic search page")
+    parser.add_argument("--reviews", type=int, default=25, help="Reviews per synthetic review page")
+    parser.add_argument("--fixtures", help="Measure recorded responses of this fixture directory instead")
+    args = parser.parse_args(argv)
+
+    if args.fixtures:
+        hotels = _fixture_bodies(Path(args.fixtures), "hotels_search")
+        reviews = _fixture_bodies(Path(args.fixtures), "hotels_reviews")
+    else:
+        hotels = [json.dumps(sample_search_page(args.hotels)).encode()]
+        reviews = [json.dumps(sample_reviews_page(100000, size=args.reviews, total=args.reviews)).encode()]
+
+    name, count = tokenizer()
+    rows = [
+        compare("_search_available_hotels", hotels, HOTEL_DECODER, HOTEL_TABLE, count),
+        compare("_fetch_hotel_reviews", reviews, REVIEW_DECODER, REVIEW_TABLE, count),
+    ]
+
+    print(f"Tokens counted with {name}")
+    print(f"{'tool':<26} {'items':>6} {'json tok':>9} {'table tok':>10} {'json B':>8} {'table B':>8} {'saving':>7}")
+    for row in rows:
+        print(
+            f"{row['result']:<26} {row['items']:>6} {row['tokens']['json']:>9} {row['tokens']['table']:>10}"
+            f" {row['bytes']['json']:>8} {row['bytes']['table']:>8} {row['saving']:>7.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
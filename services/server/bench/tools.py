@@ -0,0 +1,403 @@
+"""End-to-end benchmark of the MCP tools over the FastMCP HTTP transport.
+
+Starts the local upstream stand-in and the MCP server in their own processes,
+then calls every tool through `fastmcp.Client` at several concurrency levels.
+For every tool and concurrency level it reports latency percentiles, throughput,
+the size of the tool results and where the server spent its time: waiting for
+the scheduler, waiting for upstream, parsing JSON, validating models and the
+remaining CPU time (MCP framing and result serialization).
+
+By default every call uses different arguments so that the server side caches
+miss and each call reaches the stand-in, `--warm` repeats a handful of inputs.
+
+Usage:
+    python -m services.server.bench.tools [--tools NAME ...] [--concurrency 1,4,16]
+        [--requests N] [--latency-ms MS] [--jitter-ms MS] [--warm]
+        [--output FILE] [--compare FILE]
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+import httpx
+
+BENCH_DIR = Path(__file__).resolve().parents[1] / ".bench"
+ROOT_DIR = Path(__file__).resolve().parents[3]
+
+
+def _stay(i: int) -> tuple[str, str]:
+    checkin = date.today() + timedelta(days=30 + i % 60)
+    return checkin.isoformat(), (checkin + timedelta(days=2)).isoformat()
+
+
+def _search_args(i: int) -> dict:
+    checkin, checkout = _stay(i)
+    return {
+        "data": {
+            "checkin_date": checkin,
+            "checkout_date": checkout,
+            "destination_id": str(-2103041 - i),
+            "dest_type": "city",
+            "num_adults": 2,
+            "max_results": 20,
+        }
+    }
+
+
+def _flexible_dates_args(i: int) -> dict:
+    arguments = _search_args(i)
+    latest = date.fromisoformat(arguments["data"]["checkin_date"]) + timedelta(days=13)
+    return {**arguments, "latest_checkin_date": latest.isoformat(), "checkin_weekdays": ["fri", "sat"]}
+
+
+def _hotel_ids(i: int, count: int = 5) -> list[str]:
+    return [str(100000 + (i * count + offset) % 1000) for offset in range(count)]
+
+
+# Arguments of the i-th call per tool, every registered tool needs an entry
+TOOL_ARGS: dict[str, Callable[[int], dict]] = {
+    "_fetch_locations": lambda i: {"place": f"Benchtown {i}"},
+    "_resolve_destination": lambda i: {"place": f"Benchville {i}"},
+    "_search_available_hotels": _search_args,
+    "_rank_hotels": lambda i: {
+        **_search_args(i),
+        "filters": {"min_review_score": 8, "max_price_per_night": 6000},
+        "sort_by": ["bayesian_review_score", "price"],
+    },
+    "_search_flexible_dates": _flexible_dates_args,
+    "_find_hotels_within": lambda i: {
+        **_search_args(i),
+        "radius_km": 2.0,
+        "latitude": 15.5 + i % 50 / 1000,
+        "longitude": 73.76 + i % 50 / 1000,
+    },
+    "_find_nearest_hotels": lambda i: {**_search_args(i), "landmark": f"Bench Beach {i}"},
+    "_fetch_review_scores": lambda i: {"hotel_id": str(100000 + i % 1000)},
+    "_fetch_hotel_reviews": lambda i: {"hotel_id": str(100000 + i % 1000)},
+    "_collect_hotel_reviews": lambda i: {"hotel_id": str(100000 + i % 1000), "limit": 100},
+    "_fetch_hotel_dossier": lambda i: dict(
+        zip(("checkin_date", "checkout_date"), _stay(i)), hotel_id=str(100000 + i % 1000)
+    ),
+    "_fetch_review_scores_batch": lambda i: {"hotel_ids": _hotel_ids(i)},
+    "_fetch_hotel_reviews_batch": lambda i: {"hotel_ids": _hotel_ids(i)},
+    "_summarize_hotel_reviews": lambda i: {"hotel_id": str(100000 + i % 1000)},
+    "_summarize_hotel_reviews_batch": lambda i: {"hotel_ids": _hotel_ids(i)},
+    "_search_destinations_batch": lambda i: {
+        "destinations": [f"Benchcity {i}", f"Benchport {i}", str(-2203041 - i)],
+        "data": _search_args(i)["data"],
+    },
+    # The handle is filled in by `run_level`, see HANDLE_TOOLS
+    "_page_results": lambda i: {"offset": i % 10 * 10, "limit": 10},
+}
+
+# Tools reading back a result stored by an earlier call in handle mode
+HANDLE_TOOLS = {"_page_results"}
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not values:
+        return 0.0
+    rank = max(math.ceil(q / 100 * len(values)) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_up(url: str, process: subprocess.Popen, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{' '.join(process.args)} exited with {process.returncode}")
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise TimeoutError(f"{url} did not come up within {timeout}s")
+
+
+class Stack:
+    """The stand-in and the MCP server running in subprocesses for the duration of a run."""
+
+    def __init__(self, args):
+        self.args = args
+        self.processes: list[subprocess.Popen] = []
+        self.upstream_port = _free_port()
+        self.server_port = _free_port()
+        self.cache_dir = tempfile.mkdtemp(prefix="bench-cache-")
+
+    def _start(self, command: list[str], env: dict, ready_url: str):
+        process = subprocess.Popen(
+            [sys.executable, "-m", *command],
+            cwd=ROOT_DIR,
+            env={**os.environ, **env},
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL if not self.args.verbose else None,
+        )
+        self.processes.append(process)
+        _wait_until_up(ready_url, process)
+
+    def __enter__(self):
+        upstream = [
+            "services.server.mock_upstream", "serve",
+            "--port", str(self.upstream_port),
+            "--latency-ms", str(self.args.latency_ms),
+            "--jitter-ms", str(self.args.jitter_ms),
+            "--seed", "0",
+        ]
+        if self.args.fixtures:
+            upstream += ["--fixtures", self.args.fixtures]
+        self._start(upstream, {}, f"http://127.0.0.1:{self.upstream_port}/stats")
+        self._start(
+            ["services.server.server"],
+            {
+                "MCP_PORT": str(self.server_port),
+                "BOOKING_BASE_URL": f"http://127.0.0.1:{self.upstream_port}/v1",
+                "BOOKING_CACHE_DIR": self.cache_dir,
+                # The stand-in has no quota, don't let the scheduler be the bottleneck
+                "RAPIDAPI_RATE_PER_SECOND": os.getenv("RAPIDAPI_RATE_PER_SECOND", "100000"),
+                "RAPID_BOOKING_API_KEY": "bench",
+            },
+            self.stats_url,
+        )
+        return self
+
+    def __exit__(self, *exc):
+        for process in reversed(self.processes):
+            process.terminate()
+            try:
+                process.wait(10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    @property
+    def mcp_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}/mcp"
+
+    @property
+    def stats_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}/cache/stats"
+
+    def timings(self) -> dict:
+        return httpx.get(self.stats_url).json()["timings"]
+
+
+async def registered_tools(stack: Stack) -> list[str]:
+    from fastmcp import Client
+
+    async with Client(stack.mcp_url) as client:
+        return [tool.name for tool in await client.list_tools()]
+
+
+def _result_bytes(result: Any) -> int:
+    size = sum(len(getattr(block, "text", "").encode()) for block in result.content)
+    if result.structured_content is not None:
+        size += len(json.dumps(result.structured_content).encode())
+    return size
+
+
+async def stored_handle(client: Any, i: int) -> str:
+    """Handle of a search result of 100 hotels stored server-side."""
+    arguments = _search_args(i)
+    arguments["data"]["max_results"] = 100
+    result = await client.call_tool("_search_available_hotels", {**arguments, "output_format": "handle"})
+    # Results typed as a union are wrapped in a "result" object
+    content = result.structured_content
+    return content.get("result", content)["handle"]
+
+
+async def run_level(
+    stack: Stack, tool: str, concurrency: int, requests: int, warm: bool, offset: int = 0
+) -> dict:
+    """Call `tool` `requests` times from `concurrency` concurrent MCP sessions.
+
+    Calls are numbered from `offset`, so that levels run one after another don't
+    find each other's results in the caches.
+    """
+    from fastmcp import Client
+
+    make_args = TOOL_ARGS[tool]
+    counter = iter(range(requests))
+    latencies, sizes, errors = [], [], []
+    handle = None
+
+    async def worker(client: Client):
+        for i in counter:
+            arguments = make_args(i % 4 if warm else offset + i)
+            if handle is not None:
+                arguments["handle"] = handle
+            started = time.perf_counter()
+            try:
+                result = await client.call_tool(tool, arguments, raise_on_error=False)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+                continue
+            latencies.append(time.perf_counter() - started)
+            if result.is_error:
+                errors.append(" ".join(getattr(block, "text", "") for block in result.content)[:200])
+            else:
+                sizes.append(_result_bytes(result))
+
+    clients = [Client(stack.mcp_url, timeout=120) for _ in range(concurrency)]
+    for client in clients:
+        await client.__aenter__()
+    try:
+        if tool in HANDLE_TOOLS:
+            handle = await stored_handle(clients[0], offset)
+        before = stack.timings()
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for client in clients))
+        elapsed = time.perf_counter() - started
+        after = stack.timings()
+    finally:
+        for client in clients:
+            await client.__aexit__(None, None, None)
+
+    latencies.sort()
+    calls = max(len(latencies), 1)
+    phases = {
+        phase: (after[phase] - before[phase]) / calls * 1000
+        for phase in ("queue", "network", "decode", "validate")
+    }
+    cpu = (after["process_cpu"] - before["process_cpu"]) / calls * 1000
+    return {
+        "tool": tool,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": len(errors),
+        "error_samples": list(dict.fromkeys(errors))[:3],
+        "latency_ms": {
+            "p50": percentile(latencies, 50) * 1000,
+            "p95": percentile(latencies, 95) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+            "mean": sum(latencies) / calls * 1000,
+            "max": latencies[-1] * 1000 if latencies else 0.0,
+        },
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "response_bytes": {
+            "mean": sum(sizes) / len(sizes) if sizes else 0,
+            "max": max(sizes, default=0),
+        },
+        # Per call, wall time for queue and network, CPU bound phases otherwise
+        "server_ms": {
+            **phases,
+            "cpu": cpu,
+            "other_cpu": max(cpu - phases["decode"] - phases["validate"], 0.0),
+        },
+    }
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+def print_table(results: list[dict], baseline: dict[tuple[str, int], dict]):
+    header = (
+        f"{'tool':<28} {'conc':>4} {'p50':>8} {'p95':>8} {'p99':>8} {'rps':>7} {'bytes':>8}"
+        f" {'net':>7} {'decode':>7} {'valid':>7} {'other':>7} {'err':>4}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        latency, server = row["latency_ms"], row["server_ms"]
+        line = (
+            f"{row['tool']:<28} {row['concurrency']:>4} {latency['p50']:>8.1f} {latency['p95']:>8.1f}"
+            f" {latency['p99']:>8.1f} {row['throughput_rps']:>7.1f} {row['response_bytes']['mean']:>8.0f}"
+            f" {server['network']:>7.1f} {server['decode']:>7.2f} {server['validate']:>7.2f}"
+            f" {server['other_cpu']:>7.2f} {row['errors']:>4}"
+        )
+        previous = baseline.get((row["tool"], row["concurrency"]))
+        if previous:
+            change = latency["p50"] / previous["latency_ms"]["p50"] - 1 if previous["latency_ms"]["p50"] else 0
+            line += f"  p50 {change:+.0%}"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m services.server.bench.tools")
+    parser.add_argument("--tools", nargs="*", help="Tools to run, defaults to all known tools")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=50, help="Calls per tool and level")
+    parser.add_argument("--latency-ms", type=float, default=100, help="Stand-in latency")
+    parser.add_argument("--jitter-ms", type=float, default=50, help="Stand-in latency jitter")
+    parser.add_argument("--fixtures", help="Fixture directory replayed by the stand-in")
+    parser.add_argument("--warm", action="store_true", help="Repeat inputs so caches are hit")
+    parser.add_argument("--output", help="Result file, defaults to services/server/.bench/tools-<time>.json")
+    parser.add_argument("--compare", help="Earlier result file to compare p50 latencies against")
+    parser.add_argument("--verbose", action="store_true", help="Show stderr of the subprocesses")
+    args = parser.parse_args(argv)
+
+    tools = args.tools or list(TOOL_ARGS)
+    unknown = set(tools) - set(TOOL_ARGS)
+    if unknown:
+        parser.error(f"No benchmark arguments for {', '.join(sorted(unknown))}")
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    results = []
+    with Stack(args) as stack:
+        missing = set(asyncio.run(registered_tools(stack))) - set(TOOL_ARGS)
+        if missing:
+            # A tool left out of the benchmark would go unmeasured without anyone noticing
+            parser.error(f"No benchmark arguments for {', '.join(sorted(missing))}, add them to TOOL_ARGS")
+        for tool in tools:
+            for level, concurrency in enumerate(levels):
+                results.append(
+                    asyncio.run(
+                        run_level(
+                            stack, tool, concurrency, args.requests, args.warm, level * args.requests
+                        )
+                    )
+                )
+
+    baseline = {}
+    if args.compare:
+        previous = json.loads(Path(args.compare).read_text())
+        baseline = {(row["tool"], row["concurrency"]): row for row in previous["results"]}
+    print_table(results, baseline)
+
+    output = Path(args.output) if args.output else BENCH_DIR / f"tools-{datetime.now():%Y%m%dT%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": {
+                "requests": args.requests,
+                "concurrency": levels,
+                "latency_ms": args.latency_ms,
+                "jitter_ms": args.jitter_ms,
+                "fixtures": args.fixtures,
+                "warm": args.warm,
+            },
+        },
+        "results": results,
+    }
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+# __init__.py
+
+from .store import SQLiteStore
+from .locations import LocationCache, location_cache
+from .search import SearchCache, search_cache, canonical_key
+from .location_index import LocationIndex, location_index
+from .results import ResultStore, result_store
+from .reviews import ReviewStore, review_store
+
+__all__ = [
+    "SQLiteStore",
+    "LocationCache",
+    "location_cache",
+    "SearchCache",
+    "search_cache",
+    "canonical_key",
+    "LocationIndex",
+    "location_index",
+    "ResultStore",
+    "result_store",
+    "ReviewStore",
+    "review_store",
+]
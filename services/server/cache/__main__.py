@@ -0,0 +1,83 @@
+"""Inspect or purge the server side caches.
+
+Usage:
+    python -m services.server.cache stats
+    python -m services.server.cache list [--limit N]
+    python -m services.server.cache purge [--place NAME] [--locale LOCALE] [--expired]
+    python -m services.server.cache purge-reviews [--hotel HOTEL_ID] [--prune]
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+
+from services.server.cache import location_cache, review_store
+
+
+def _format_ts(ts: float) -> str:
+    return datetime.fromtimestamp(ts).isoformat(timespec="seconds")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m services.server.cache")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("stats", help="Show the number of cached and expired entries")
+
+    list_parser = subparsers.add_parser("list", help="List cached locations")
+    list_parser.add_argument("--limit", type=int, default=50)
+
+    purge_parser = subparsers.add_parser("purge", help="Delete cached locations")
+    purge_parser.add_argument("--place", help="Only purge this place name")
+    purge_parser.add_argument("--locale", default="en-gb")
+    purge_parser.add_argument("--expired", action="store_true", help="Only purge expired entries")
+
+    reviews_parser = subparsers.add_parser("purge-reviews", help="Delete stored hotel reviews")
+    reviews_parser.add_argument("--hotel", help="Only purge the reviews of this hotel ID")
+    reviews_parser.add_argument(
+        "--prune", action="store_true", help="Only purge hotels past the age and size bounds of the store"
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "stats":
+        store = location_cache.store
+        reviews = review_store.stats()
+        print(
+            json.dumps(
+                {
+                    "locations": {
+                        "path": store.path,
+                        "entries": len(store),
+                        "expired": store.count_expired(),
+                    },
+                    "reviews": {
+                        "path": review_store.path,
+                        "hotels": reviews["hotels"],
+                        "reviews": reviews["reviews"],
+                    },
+                },
+                indent=2,
+            )
+        )
+    elif args.command == "list":
+        for entry in location_cache.store.entries(limit=args.limit):
+            print(
+                f"{entry['key']:<40} {entry['size']:>8}B  "
+                f"created {_format_ts(entry['created_at'])}  "
+                f"expires {_format_ts(entry['expires_at'])}"
+            )
+    elif args.command == "purge":
+        removed = location_cache.purge(
+            place=args.place, locale=args.locale, expired_only=args.expired
+        )
+        print(f"Removed {removed} location entries")
+    elif args.command == "purge-reviews":
+        if args.prune:
+            print(f"Removed the reviews of {review_store.prune()} hotels")
+        else:
+            print(f"Removed {review_store.purge(hotel_id=args.hotel)} reviews")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
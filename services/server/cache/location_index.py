@@ -0,0 +1,339 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+try:
+    import fcntl
+except ImportError:  # Windows, flushes of concurrent workers aren't serialized there
+    fcntl = None
+
+from services.server.cache.locations import PLACE_SIZE, normalize_place
+from services.server.cache.store import DEFAULT_CACHE_DIR
+from services.server.schema.api_response import Location, LocationMatch
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("dest_id", "S24"),
+        ("dest_type", "S16"),
+        ("name", "S64"),
+        ("label", "S128"),
+        # Place name the full location list is cached under in the location cache,
+        # wide enough for any normalized name so it's never cut to another key
+        ("query", f"S{PLACE_SIZE}"),
+        ("latitude", "f8"),
+        ("longitude", "f8"),
+        ("hotels", "i4"),
+    ]
+)
+KEY_SIZE = 64
+
+
+def _encode(value: str, size: int) -> bytes:
+    # Truncate on a character boundary so the stored UTF-8 stays decodable
+    data = value.encode()
+    return data if len(data) <= size else data[:size].decode(errors="ignore").encode()
+
+
+class IndexHit(NamedTuple):
+    match: LocationMatch
+    # Place name to look up in the location cache for the full `Location` list
+    query: str
+
+
+class LocationIndex:
+    """Local index resolving place names to destinations without an upstream call.
+
+    Every location fetched from `/hotels/locations` is recorded under its name,
+    its label, the label up to the first comma and, for the top result, the
+    place name the user asked for, which is how aliases ("bombay" -> Mumbai) are
+    learned. Lookups try an exact match, then a prefix and a fuzzy (rapidfuzz)
+    match and report a confidence between 0 and 1 for the best one.
+
+    The index lives in three `.npy` files which are memory-mapped on load: the
+    location records, the sorted keys and the record of every key, so an exact
+    or prefix lookup is a binary search over the mapped keys. New locations are
+    kept in memory and written out every `flush_every` additions and on shutdown.
+
+    Every flush writes a new generation of the files and then points `CURRENT`
+    at it, so that several server processes can share one index: a flush merges
+    into the latest generation on disk under a file lock, and the other
+    processes switch to it at their next lookup after `reload_interval`.
+
+    Settings can be overridden through the environment:
+        LOCATION_INDEX_PATH: Directory of the index files
+        LOCATION_INDEX_MIN_CONFIDENCE: Confidence needed to serve a match locally (default 0.9)
+        LOCATION_INDEX_FLUSH_EVERY: Additions kept in memory before writing (default 32)
+        LOCATION_INDEX_RELOAD_INTERVAL: Seconds between checks for a newer generation (default 5)
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        min_confidence: Optional[float] = None,
+        flush_every: Optional[int] = None,
+        reload_interval: Optional[float] = None,
+    ):
+        self.path = Path(
+            path or os.getenv("LOCATION_INDEX_PATH", os.path.join(DEFAULT_CACHE_DIR, "location_index"))
+        )
+        self.min_confidence = min_confidence or float(os.getenv("LOCATION_INDEX_MIN_CONFIDENCE", 0.9))
+        self.flush_every = flush_every or int(os.getenv("LOCATION_INDEX_FLUSH_EVERY", 32))
+        self.reload_interval = (
+            reload_interval
+            if reload_interval is not None
+            else float(os.getenv("LOCATION_INDEX_RELOAD_INTERVAL", 5))
+        )
+        self.generation = 0
+        self._checked_at: Optional[float] = None
+        self._records = np.empty(0, RECORD_DTYPE)
+        self._keys = np.empty(0, f"S{KEY_SIZE}")
+        self._key_records = np.empty(0, np.int32)
+        self._choices: Optional[list[str]] = None
+        # Additions not written yet, by record id and by key
+        self._pending_records: dict[str, tuple] = {}
+        self._pending_keys: dict[str, str] = {}
+        self.hits = {"exact": 0, "prefix": 0, "fuzzy": 0}
+        self.misses = 0
+        self.lookup_seconds = 0.0
+
+    def files(self, generation: int) -> tuple[Path, Path, Path]:
+        return tuple(self.path / f"{name}.{generation}.npy" for name in ("records", "keys", "key_records"))
+
+    def _current(self) -> int:
+        try:
+            return json.loads((self.path / "CURRENT").read_text())["generation"]
+        except (FileNotFoundError, ValueError, KeyError):
+            return 0
+
+    def _load(self, force: bool = False):
+        """Map the latest generation of the index if it isn't mapped already."""
+        now = time.monotonic()
+        if not force and self._checked_at is not None and now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        generation = self._current()
+        if generation == self.generation:
+            return
+        records, keys, key_records = self.files(generation)
+        try:
+            self._records = np.load(records, mmap_mode="r")
+            self._keys = np.load(keys, mmap_mode="r")
+            self._key_records = np.load(key_records, mmap_mode="r")
+        except FileNotFoundError:
+            # Superseded and removed while loading, the next check picks the newer one
+            self._checked_at = None
+            return
+        self.generation = generation
+        self._choices = None
+
+    @contextmanager
+    def _flush_lock(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self.path / "LOCK", "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    @staticmethod
+    def _record_id(location: Location) -> str:
+        return f"{location.dest_type}:{location.dest_id}"
+
+    def add(self, place: str, locations: list[Location]):
+        """Index the locations upstream returned for `place`."""
+        self._load()
+        query = normalize_place(place)
+        if not query or not locations:
+            return
+        for position, location in enumerate(locations):
+            record_id = self._record_id(location)
+            self._pending_records[record_id] = (
+                _encode(location.dest_id, 24),
+                _encode(location.dest_type, 16),
+                _encode(location.name, 64),
+                _encode(location.label, 128),
+                _encode(query, PLACE_SIZE),
+                location.latitude,
+                location.longitude,
+                location.nr_hotels,
+            )
+            keys = {normalize_place(location.name), normalize_place(location.label)}
+            keys.add(normalize_place(location.label.split(",")[0]))
+            for key in keys:
+                # Names shared by several locations keep pointing at the first one indexed
+                if key and key not in self._pending_keys and self._find_key(key) is None:
+                    self._pending_keys[key] = record_id
+            if position == 0:
+                # What the user asked for always resolves to upstream's best match
+                self._pending_keys[query] = record_id
+        if len(self._pending_records) >= self.flush_every:
+            self.flush()
+
+    def _find_key(self, key: str) -> Optional[int]:
+        """Position of `key` in the mapped keys."""
+        data = _encode(key, KEY_SIZE)
+        position = int(np.searchsorted(self._keys, data))
+        if position < len(self._keys) and self._keys[position] == data:
+            return position
+        return None
+
+    def _mapped_record(self, key_position: int) -> tuple:
+        return self._records[self._key_records[key_position]].tolist()
+
+    def _match(self, record: tuple, matched: str, confidence: float) -> IndexHit:
+        dest_id, dest_type, name, label, query, latitude, longitude, _ = record
+        return IndexHit(
+            LocationMatch(
+                dest_id=dest_id.decode(),
+                dest_type=dest_type.decode(),
+                name=name.decode(),
+                label=label.decode(),
+                latitude=latitude,
+                longitude=longitude,
+                matched=matched,
+                confidence=round(confidence, 3),
+                source="index",
+            ),
+            query.decode(),
+        )
+
+    def _exact(self, query: str) -> Optional[IndexHit]:
+        if query in self._pending_keys:
+            return self._match(self._pending_records[self._pending_keys[query]], query, 1.0)
+        position = self._find_key(query)
+        if position is None:
+            return None
+        return self._match(self._mapped_record(position), query, 1.0)
+
+    def _prefix(self, query: str) -> Optional[IndexHit]:
+        """The location with most hotels among the names starting with `query`."""
+        data = _encode(query, KEY_SIZE)
+        start = int(np.searchsorted(self._keys, data))
+        end = int(np.searchsorted(self._keys, data + b"\xff"))
+        candidates = [
+            (self._keys[i].decode(), self._mapped_record(i)) for i in range(start, min(end, start + 50))
+        ]
+        candidates += [
+            (key, self._pending_records[record_id])
+            for key, record_id in self._pending_keys.items()
+            if key.startswith(query)
+        ]
+        if not candidates:
+            return None
+        key, record = max(candidates, key=lambda candidate: candidate[1][-1])
+        return self._match(record, key, len(query) / len(key))
+
+    def _fuzzy(self, query: str) -> Optional[IndexHit]:
+        if self._choices is None:
+            self._choices = [key.decode() for key in self._keys.tolist()]
+        candidates = []
+        found = process.extractOne(query, self._choices, scorer=fuzz.ratio, score_cutoff=50)
+        if found is not None:
+            key, score, position = found
+            candidates.append((score, key, self._mapped_record(position)))
+        pending = list(self._pending_keys.items())
+        found = process.extractOne(query, [key for key, _ in pending], scorer=fuzz.ratio, score_cutoff=50)
+        if found is not None:
+            key, score, position = found
+            candidates.append((score, key, self._pending_records[pending[position][1]]))
+        if not candidates:
+            return None
+        score, key, record = max(candidates, key=lambda candidate: candidate[0])
+        return self._match(record, key, score / 100)
+
+    def lookup(self, place: str) -> Optional[IndexHit]:
+        """Best indexed match for `place`, None if nothing comes close.
+
+        The caller decides whether the confidence of the hit is good enough,
+        see `min_confidence`.
+        """
+        self._load()
+        query = normalize_place(place)
+        if not query:
+            return None
+        started = time.perf_counter()
+        try:
+            hit = self._exact(query)
+            if hit is not None:
+                self.hits["exact"] += 1
+                return hit
+            candidates = [
+                (kind, hit)
+                for kind, hit in (("prefix", self._prefix(query)), ("fuzzy", self._fuzzy(query)))
+                if hit is not None
+            ]
+            if not candidates:
+                self.misses += 1
+                return None
+            kind, hit = max(candidates, key=lambda candidate: candidate[1].match.confidence)
+            self.hits[kind] += 1
+            return hit
+        finally:
+            self.lookup_seconds += time.perf_counter() - started
+
+    def flush(self):
+        """Merge the pending additions into a new generation of the index files."""
+        if not self._pending_records and not self._pending_keys:
+            return
+        with self._flush_lock():
+            # Other processes may have flushed since this one last loaded
+            self._load(force=True)
+            self._write(self.generation + 1)
+        self._pending_records.clear()
+        self._pending_keys.clear()
+        self._load(force=True)
+
+    def _write(self, generation: int):
+        rows = self._records.tolist()
+        record_ids = [f"{row[1].decode()}:{row[0].decode()}" for row in rows]
+        records = dict(zip(record_ids, rows))
+        keys = {
+            key.decode(): record_ids[position]
+            for key, position in zip(self._keys.tolist(), self._key_records.tolist())
+        }
+        records.update(self._pending_records)
+        keys.update(self._pending_keys)
+
+        record_ids = list(records)
+        positions = {record_id: position for position, record_id in enumerate(record_ids)}
+        sorted_keys = sorted((_encode(key, KEY_SIZE), positions[record_id]) for key, record_id in keys.items())
+
+        arrays = (
+            np.array([records[record_id] for record_id in record_ids], dtype=RECORD_DTYPE),
+            np.array([key for key, _ in sorted_keys], dtype=f"S{KEY_SIZE}"),
+            np.array([position for _, position in sorted_keys], dtype=np.int32),
+        )
+        for file, array in zip(self.files(generation), arrays):
+            np.save(file, array)
+        current = self.path / "CURRENT"
+        tmp = current.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"generation": generation}))
+        os.replace(tmp, current)
+        # Keep the previous generation for processes still loading it
+        for file in self.files(generation - 2):
+            try:
+                file.unlink(missing_ok=True)
+            except OSError:
+                # Still mapped by another process on Windows, removed by a later flush
+                pass
+
+    def stats(self) -> dict:
+        self._load()
+        lookups = sum(self.hits.values()) + self.misses
+        return {
+            "records": len(self._records) + len(self._pending_records),
+            "keys": len(self._keys) + len(self._pending_keys),
+            "pending": len(self._pending_records),
+            "generation": self.generation,
+            **{f"{kind}_hits": count for kind, count in self.hits.items()},
+            "misses": self.misses,
+            "lookup_ms_avg": self.lookup_seconds / lookups * 1000 if lookups else 0.0,
+        }
+
+
+location_index = LocationIndex()
@@ -0,0 +1,149 @@
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from services.server.cache.store import DEFAULT_CACHE_DIR, SQLiteStore
+from services.server.schema.api_response import Location
+
+# Longest normalized place name in bytes, the location index stores names at this width
+PLACE_SIZE = 128
+
+
+def normalize_place(place: str) -> str:
+    """Case-fold and collapse whitespace/punctuation so spelling of the same
+    name in a different case or spacing maps to a single cache entry.
+
+    Names are cut to `PLACE_SIZE` bytes of UTF-8, on a character boundary, so
+    the location cache and the location index agree on the key of long names.
+    """
+    place = re.sub(r"[\s,.]+", " ", place.casefold()).strip()
+    data = place.encode()
+    if len(data) <= PLACE_SIZE:
+        return place
+    return data[:PLACE_SIZE].decode(errors="ignore").strip()
+
+
+class LocationCache:
+    """Two-tier cache for `/hotels/locations` lookups.
+
+    The first tier is an in-process LRU holding validated `Location` objects, the
+    second an on-disk SQLite table that survives restarts. Entries are keyed by the
+    normalized place name and the locale and expire after `ttl` seconds.
+
+    Settings can be overridden through the environment:
+        LOCATION_CACHE_TTL: Entry lifetime in seconds (default 30 days)
+        LOCATION_CACHE_MEMORY_SIZE: Max entries kept in memory (default 1024)
+        LOCATION_CACHE_DISK_SIZE: Max entries kept on disk (default 50000)
+        LOCATION_CACHE_PATH: Path of the SQLite file
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: Optional[float] = None,
+        memory_size: Optional[int] = None,
+        disk_size: Optional[int] = None,
+    ):
+        self.path = path or os.getenv(
+            "LOCATION_CACHE_PATH", os.path.join(DEFAULT_CACHE_DIR, "locations.sqlite3")
+        )
+        self.ttl = ttl or float(os.getenv("LOCATION_CACHE_TTL", 30 * 24 * 3600))
+        self.memory_size = memory_size or int(os.getenv("LOCATION_CACHE_MEMORY_SIZE", 1024))
+        self.disk_size = disk_size or int(os.getenv("LOCATION_CACHE_DISK_SIZE", 50000))
+        self._memory: OrderedDict[str, tuple[float, list[Location]]] = OrderedDict()
+        self._store: Optional[SQLiteStore] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def store(self) -> SQLiteStore:
+        if self._store is None:
+            self._store = SQLiteStore(self.path, "locations")
+        return self._store
+
+    @staticmethod
+    def key(place: str, locale: str) -> str:
+        return f"{locale.casefold()}:{normalize_place(place)}"
+
+    def get(self, place: str, locale: str = "en-gb", count_miss: bool = True) -> Optional[list[Location]]:
+        """Cached locations of `place`, None when missing or expired.
+
+        `count_miss=False` is for a second lookup under another name in the same
+        request, whose miss was already counted by the first.
+        """
+        key = self.key(place, locale)
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, locations = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return locations
+            del self._memory[key]
+
+        row = self.store.get(key)
+        if row is not None:
+            items, _, expires_at = row
+            if expires_at > now:
+                locations = [Location.model_validate(item) for item in items]
+                self._remember(key, expires_at, locations)
+                self.disk_hits += 1
+                return locations
+            self.store.delete(key)
+
+        if count_miss:
+            self.misses += 1
+        return None
+
+    def set(self, place: str, locations: list[Location], locale: str = "en-gb"):
+        key = self.key(place, locale)
+        items = [
+            location.model_dump(mode="json", by_alias=True, exclude_none=True)
+            for location in locations
+        ]
+        self.store.set(key, items, self.ttl)
+        self._remember(key, time.time() + self.ttl, locations)
+        if len(self.store) > self.disk_size:
+            self.evictions += self.store.evict(self.disk_size)
+
+    def _remember(self, key: str, expires_at: float, locations: list[Location]):
+        self._memory[key] = (expires_at, locations)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def purge(self, place: Optional[str] = None, locale: str = "en-gb", expired_only: bool = False) -> int:
+        """Drop a single place, only the expired entries, or everything."""
+        if place is not None:
+            key = self.key(place, locale)
+            self._memory.pop(key, None)
+            return self.store.delete(key)
+        if expired_only:
+            now = time.time()
+            for key in [k for k, (expires_at, _) in self._memory.items() if expires_at <= now]:
+                del self._memory[key]
+        else:
+            self._memory.clear()
+        return self.store.purge(expired_only=expired_only)
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+            "disk_entries": len(self.store),
+        }
+
+
+location_cache = LocationCache()
@@ -0,0 +1,157 @@
+import os
+import secrets
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from pydantic import BaseModel, TypeAdapter
+
+from services.server.cache.store import DEFAULT_CACHE_DIR, SQLiteStore
+from services.server.schema.api_response import Hotel, HotelReview, NearbyHotel
+
+# Models a stored result can hold, by the kind it is stored under
+RESULT_KINDS: dict[str, type[BaseModel]] = {
+    "hotels": Hotel,
+    "nearby_hotels": NearbyHotel,
+    "reviews": HotelReview,
+}
+_adapters = {kind: TypeAdapter(list[model]) for kind, model in RESULT_KINDS.items()}
+
+
+class StoredResult(NamedTuple):
+    kind: str
+    items: list[BaseModel]
+    expires_at: float
+
+
+class ResultStore:
+    """Full results of tool calls kept server-side, to be read back page by page.
+
+    A tool answering in handle mode stores its validated result here and only
+    returns the first page along with the handle; later pages are sliced from
+    the stored models without calling upstream or validating anything again.
+    Results expire `ttl` seconds after they were stored and the least recently
+    read ones are dropped beyond `max_entries`.
+
+    When `shared` is set, results are also written to a SQLite table, so that a
+    handle issued by one worker of a multi-process deployment can be paged
+    through by any other.
+
+    Settings can be overridden through the environment:
+        RESULT_STORE_TTL: Seconds a result can be paged through (default 1800)
+        RESULT_STORE_SIZE: Max number of stored results (default 256)
+        RESULT_STORE_SHARED: Set to 1 to share results between processes (default 0)
+        RESULT_STORE_PATH: Path of the shared SQLite file
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        shared: Optional[bool] = None,
+        path: Optional[str] = None,
+    ):
+        self.ttl = ttl or float(os.getenv("RESULT_STORE_TTL", 1800))
+        self.max_entries = max_entries or int(os.getenv("RESULT_STORE_SIZE", 256))
+        if shared is None:
+            shared = os.getenv("RESULT_STORE_SHARED", "0") == "1"
+        self.shared = shared
+        self.path = path or os.getenv(
+            "RESULT_STORE_PATH", os.path.join(DEFAULT_CACHE_DIR, "results.sqlite3")
+        )
+        self._store: Optional[SQLiteStore] = None
+        self._results: OrderedDict[str, StoredResult] = OrderedDict()
+        self.stored = 0
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @property
+    def store(self) -> SQLiteStore:
+        if self._store is None:
+            self._store = SQLiteStore(self.path, "results")
+        return self._store
+
+    def put(self, kind: str, items: list[BaseModel]) -> tuple[str, StoredResult]:
+        """Store a result and return the handle it can be read back with."""
+        handle = secrets.token_urlsafe(12)
+        result = StoredResult(kind, list(items), time.time() + self.ttl)
+        self._remember(handle, result)
+        self.stored += 1
+        if self.shared:
+            value = {
+                "kind": kind,
+                "items": _adapters[kind].dump_python(
+                    result.items, mode="json", by_alias=True, exclude_none=True
+                ),
+            }
+            self.store.set(handle, value, self.ttl)
+            if len(self.store) > self.max_entries:
+                self.store.evict(self.max_entries)
+        return handle, result
+
+    def _remember(self, handle: str, result: StoredResult):
+        self._results[handle] = result
+        self._results.move_to_end(handle)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    def _load_shared(self, handle: str) -> Optional[StoredResult]:
+        if not self.shared:
+            return None
+        row = self.store.get(handle)
+        if row is None:
+            return None
+        value, _, expires_at = row
+        if expires_at <= time.time():
+            self.store.delete(handle)
+            return None
+        items = _adapters[value["kind"]].validate_python(value["items"])
+        return StoredResult(value["kind"], items, expires_at)
+
+    def get(self, handle: str) -> Optional[StoredResult]:
+        """The stored result of `handle`, None once it expired or was evicted."""
+        result = self._results.get(handle)
+        if result is not None and result.expires_at <= time.time():
+            del self._results[handle]
+            result = None
+        if result is not None:
+            self.hits += 1
+            self._results.move_to_end(handle)
+            return result
+        result = self._load_shared(handle)
+        if result is None:
+            self.misses += 1
+            return None
+        self.shared_hits += 1
+        self._remember(handle, result)
+        return result
+
+    def purge(self, expired_only: bool = False) -> int:
+        if self.shared:
+            self.store.purge(expired_only=expired_only)
+        now = time.time()
+        removed = [
+            handle
+            for handle, result in self._results.items()
+            if not expired_only or result.expires_at <= now
+        ]
+        for handle in removed:
+            del self._results[handle]
+        return len(removed)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            "stored": self.stored,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+            "entries": len(self._results),
+            "items": sum(len(result.items) for result in self._results.values()),
+            "shared_entries": len(self.store) if self.shared else 0,
+        }
+
+
+result_store = ResultStore()
@@ -0,0 +1,284 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import NamedTuple, Optional
+from weakref import WeakValueDictionary
+
+from services.server.cache.store import DEFAULT_CACHE_DIR
+from services.server.schema.api_response import HotelReview
+
+
+def matches_language(languagecode: str, languages: list[str]) -> bool:
+    # "en" matches "en-gb" and "en-us", "en-gb" only itself
+    code = languagecode.lower()
+    return any(code == language.lower() or code.split("-")[0] == language.lower() for language in languages)
+
+
+class SyncState(NamedTuple):
+    synced_at: float
+    # Whether the oldest review of the hotel has been stored
+    complete: bool
+    reviews: int
+
+
+class ReviewStore:
+    """Local copy of the reviews of every hotel looked at, keyed by hotel and review hash.
+
+    Reviews are synced newest first: a sync reads pages until it reaches a review
+    which is stored already, so a hotel asked about again only costs the pages of
+    its new reviews. Older reviews are only read when a caller needs more of them
+    than are stored, from the page following the stored ones. Reviews are then
+    served from the store, newest first.
+
+    The store is a SQLite file, so every process using the same file shares it.
+    Every `prune_every` syncs, hotels not synced for `max_age` seconds are dropped,
+    then the least recently synced ones until at most `max_reviews` are stored.
+
+    Settings can be overridden through the environment:
+        REVIEW_STORE_PATH: Path of the SQLite file
+        REVIEW_STORE_SYNC_INTERVAL: Seconds the stored reviews of a hotel are served
+            without checking for new ones (default 3600)
+        REVIEW_STORE_MAX_AGE: Seconds the reviews of a hotel are kept after its last
+            sync (default 30 days)
+        REVIEW_STORE_MAX_REVIEWS: Max reviews kept over all hotels (default 200000)
+    """
+
+    # Syncs between two prunes
+    prune_every = 50
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        sync_interval: Optional[float] = None,
+        max_age: Optional[float] = None,
+        max_reviews: Optional[int] = None,
+    ):
+        self.path = path or os.getenv(
+            "REVIEW_STORE_PATH", os.path.join(DEFAULT_CACHE_DIR, "reviews.sqlite3")
+        )
+        self.sync_interval = (
+            sync_interval
+            if sync_interval is not None
+            else float(os.getenv("REVIEW_STORE_SYNC_INTERVAL", 3600))
+        )
+        self.max_age = max_age or float(os.getenv("REVIEW_STORE_MAX_AGE", 30 * 24 * 3600))
+        self.max_reviews = max_reviews or int(os.getenv("REVIEW_STORE_MAX_REVIEWS", 200000))
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # Only kept while a sync holds or waits for them
+        self._sync_locks: WeakValueDictionary[str, asyncio.Lock] = WeakValueDictionary()
+        self.syncs = 0
+        self.evicted_hotels = 0
+        self.pages_fetched = 0
+        self.reviews_added = 0
+        self.served = 0
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS reviews (
+                    hotel_id TEXT NOT NULL,
+                    review_hash TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    review_id INTEGER NOT NULL,
+                    languagecode TEXT NOT NULL,
+                    review TEXT NOT NULL,
+                    PRIMARY KEY (hotel_id, review_hash)
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS reviews_date ON reviews (hotel_id, date, review_id)")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS review_syncs (
+                    hotel_id TEXT PRIMARY KEY,
+                    synced_at REAL NOT NULL,
+                    complete INTEGER NOT NULL
+                )"""
+            )
+            self._conn = conn
+        return self._conn
+
+    def sync_lock(self, hotel_id: str) -> asyncio.Lock:
+        """Lock held while syncing a hotel, so concurrent calls don't fetch the same pages."""
+        lock = self._sync_locks.get(hotel_id)
+        if lock is None:
+            lock = self._sync_locks[hotel_id] = asyncio.Lock()
+        return lock
+
+    def state(self, hotel_id: str) -> Optional[SyncState]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT synced_at, complete FROM review_syncs WHERE hotel_id = ?", (hotel_id,)
+            ).fetchone()
+            count = self.conn.execute(
+                "SELECT COUNT(*) FROM reviews WHERE hotel_id = ?", (hotel_id,)
+            ).fetchone()[0]
+        if row is None:
+            # Reviews stored by a sync which failed midway are kept
+            return SyncState(0.0, False, count) if count else None
+        return SyncState(row[0], bool(row[1]), count)
+
+    def newest(self, hotel_id: str) -> Optional[str]:
+        """Date of the newest stored review of a hotel."""
+        with self._lock:
+            row = self.conn.execute("SELECT MAX(date) FROM reviews WHERE hotel_id = ?", (hotel_id,)).fetchone()
+        return row[0]
+
+    def stale(self, state: Optional[SyncState]) -> bool:
+        return state is None or time.time() - state.synced_at > self.sync_interval
+
+    def add(self, hotel_id: str, reviews: list[HotelReview]) -> int:
+        """Store the reviews which aren't stored yet and return how many there were."""
+        rows = [
+            (
+                hotel_id,
+                review.review_hash,
+                review.date,
+                review.review_id,
+                review.languagecode,
+                review.model_dump_json(by_alias=True),
+            )
+            for review in reviews
+        ]
+        with self._lock:
+            before = self.conn.total_changes
+            self.conn.executemany("INSERT OR IGNORE INTO reviews VALUES (?, ?, ?, ?, ?, ?)", rows)
+            added = self.conn.total_changes - before
+        self.reviews_added += added
+        return added
+
+    def mark_synced(self, hotel_id: str, complete: bool):
+        self.syncs += 1
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO review_syncs VALUES (?, ?, ?)",
+                (hotel_id, time.time(), int(complete)),
+            )
+        if self.syncs % self.prune_every == 0:
+            self.prune()
+
+    def _drop(self, hotel_ids: list[str]):
+        params = [(hotel_id,) for hotel_id in hotel_ids]
+        self.conn.executemany("DELETE FROM reviews WHERE hotel_id = ?", params)
+        self.conn.executemany("DELETE FROM review_syncs WHERE hotel_id = ?", params)
+        self.evicted_hotels += len(hotel_ids)
+
+    def prune(self) -> int:
+        """Drop the hotels synced longer than `max_age` ago, then the least recently
+        synced ones beyond `max_reviews`, and return how many hotels were dropped."""
+        with self._lock:
+            before = self.evicted_hotels
+            expired = self.conn.execute(
+                "SELECT hotel_id FROM review_syncs WHERE synced_at < ?", (time.time() - self.max_age,)
+            ).fetchall()
+            self._drop([hotel_id for hotel_id, in expired])
+            excess = self.conn.execute("SELECT COUNT(*) FROM reviews").fetchone()[0] - self.max_reviews
+            if excess > 0:
+                oldest = self.conn.execute(
+                    """SELECT review_syncs.hotel_id, COUNT(*) FROM review_syncs
+                        JOIN reviews ON reviews.hotel_id = review_syncs.hotel_id
+                        GROUP BY review_syncs.hotel_id ORDER BY synced_at"""
+                ).fetchall()
+                dropped = []
+                for hotel_id, reviews in oldest:
+                    if excess <= 0:
+                        break
+                    dropped.append(hotel_id)
+                    excess -= reviews
+                self._drop(dropped)
+            return self.evicted_hotels - before
+
+    @staticmethod
+    def _filters(hotel_id: str, since: Optional[date], languages: Optional[list[str]]) -> tuple[str, list]:
+        """WHERE clause and parameters selecting the matching reviews of a hotel."""
+        where, params = "hotel_id = ?", [hotel_id]
+        if since:
+            where += " AND substr(date, 1, 10) >= ?"
+            params.append(since.isoformat())
+        if languages:
+            # Same matching as `matches_language`, LIKE ignores the case
+            codes = [language.lower() for language in languages]
+            matches = ["lower(languagecode) = ? OR languagecode LIKE ? || '-%'"] * len(codes)
+            where += f" AND ({' OR '.join(matches)})"
+            params.extend(value for code in codes for value in (code, code))
+        return where, params
+
+    def count(
+        self,
+        hotel_id: str,
+        since: Optional[date] = None,
+        languages: Optional[list[str]] = None,
+        limit: int = 10**9,
+    ) -> int:
+        """Number of stored reviews matching the filters, counting up to `limit`."""
+        where, params = self._filters(hotel_id, since, languages)
+        with self._lock:
+            return self.conn.execute(
+                f"SELECT COUNT(*) FROM (SELECT 1 FROM reviews WHERE {where} LIMIT ?)", [*params, limit]
+            ).fetchone()[0]
+
+    def has_older(self, hotel_id: str, since: date) -> bool:
+        """Whether a review written before `since` is stored, i.e. all later ones are."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM reviews WHERE hotel_id = ? AND substr(date, 1, 10) < ? LIMIT 1",
+                (hotel_id, since.isoformat()),
+            ).fetchone()
+        return row is not None
+
+    def reviews(
+        self,
+        hotel_id: str,
+        limit: int,
+        since: Optional[date] = None,
+        languages: Optional[list[str]] = None,
+    ) -> list[HotelReview]:
+        """Up to `limit` stored reviews of a hotel, newest first.
+
+        Args:
+            hotel_id (str): The ID of the hotel
+            limit (int): The maximum number of reviews to return
+            since (date): Skip reviews written before this date
+            languages (list[str]): Language codes to keep, e.g. `en` or `de`
+        """
+        where, params = self._filters(hotel_id, since, languages)
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT review FROM reviews WHERE {where} ORDER BY date DESC, review_id DESC LIMIT ?",
+                [*params, limit],
+            ).fetchall()
+        reviews = [HotelReview.model_validate_json(review) for review, in rows]
+        self.served += len(reviews)
+        return reviews
+
+    def purge(self, hotel_id: Optional[str] = None) -> int:
+        with self._lock:
+            if hotel_id is None:
+                self.conn.execute("DELETE FROM review_syncs")
+                return self.conn.execute("DELETE FROM reviews").rowcount
+            self.conn.execute("DELETE FROM review_syncs WHERE hotel_id = ?", (hotel_id,))
+            return self.conn.execute("DELETE FROM reviews WHERE hotel_id = ?", (hotel_id,)).rowcount
+
+    def stats(self) -> dict:
+        with self._lock:
+            reviews = self.conn.execute("SELECT COUNT(*) FROM reviews").fetchone()[0]
+            hotels = self.conn.execute("SELECT COUNT(*) FROM review_syncs").fetchone()[0]
+        return {
+            "hotels": hotels,
+            "reviews": reviews,
+            "syncs": self.syncs,
+            "pages_fetched": self.pages_fetched,
+            "reviews_added": self.reviews_added,
+            "reviews_served": self.served,
+            "evicted_hotels": self.evicted_hotels,
+        }
+
+
+review_store = ReviewStore()
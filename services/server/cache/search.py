@@ -0,0 +1,263 @@
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Awaitable, Callable, Optional
+
+from pydantic import TypeAdapter
+
+from services.server.cache.store import DEFAULT_CACHE_DIR, SQLiteStore
+from services.server.schema.api_response import BookingError, Hotel
+from services.server.upstream.scheduler import Priority, priority_scope
+
+
+def canonical_key(params: dict[str, Any]) -> str:
+    """Build a stable cache key from upstream query parameters, independent of
+    their order and of the python type used for each value."""
+    return json.dumps({k: str(v) for k, v in params.items()}, sort_keys=True)
+
+
+class SearchEntry:
+    hotels: list[Hotel]
+    created_at: float
+    checkin_date: date
+    max_results: int
+
+    def __init__(self, hotels, created_at, checkin_date, max_results):
+        self.hotels = hotels
+        self.created_at = created_at
+        self.checkin_date = checkin_date
+        self.max_results = max_results
+
+    def satisfies(self, max_results: int) -> bool:
+        # A shorter list than asked for means upstream had no more hotels
+        return max_results <= self.max_results or len(self.hotels) < self.max_results
+
+
+_hotels = TypeAdapter(list[Hotel])
+
+
+class SearchCache:
+    """Stale-while-revalidate cache for `/hotels/search` results.
+
+    Entries younger than `fresh_ttl` are served as they are. Entries older than that
+    but younger than `stale_ttl` are still served immediately while a refresh is
+    started in the background, so that the next caller gets a fresh result. Entries
+    for check-in dates which have already passed are dropped.
+
+    When `shared` is set, every search is also written to a SQLite table which
+    all server processes using the same file read from, so that the workers of a
+    multi-process deployment warm one cache instead of one each. A process
+    missing a search in memory, or holding a stale copy, looks there before
+    calling upstream.
+
+    Settings can be overridden through the environment:
+        SEARCH_CACHE_FRESH_TTL: Seconds an entry is served without refresh (default 600)
+        SEARCH_CACHE_STALE_TTL: Seconds an entry may be served at all (default 3600)
+        SEARCH_CACHE_SIZE: Max number of cached searches (default 512)
+        SEARCH_CACHE_SHARED: Set to 1 to share entries between processes (default 0)
+        SEARCH_CACHE_PATH: Path of the shared SQLite file
+    """
+
+    def __init__(
+        self,
+        fresh_ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        shared: Optional[bool] = None,
+        path: Optional[str] = None,
+    ):
+        self.fresh_ttl = fresh_ttl or float(os.getenv("SEARCH_CACHE_FRESH_TTL", 600))
+        self.stale_ttl = stale_ttl or float(os.getenv("SEARCH_CACHE_STALE_TTL", 3600))
+        self.max_entries = max_entries or int(os.getenv("SEARCH_CACHE_SIZE", 512))
+        if shared is None:
+            shared = os.getenv("SEARCH_CACHE_SHARED", "0") == "1"
+        self.shared = shared
+        self.path = path or os.getenv(
+            "SEARCH_CACHE_PATH", os.path.join(DEFAULT_CACHE_DIR, "search.sqlite3")
+        )
+        self._store: Optional[SQLiteStore] = None
+        self._entries: OrderedDict[str, SearchEntry] = OrderedDict()
+        self._refreshing: dict[str, asyncio.Task] = {}
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.served_age_total = 0.0
+        self.served_age_max = 0.0
+
+    @property
+    def store(self) -> SQLiteStore:
+        if self._store is None:
+            self._store = SQLiteStore(self.path, "searches")
+        return self._store
+
+    def _expired(self, entry: SearchEntry) -> bool:
+        return entry.checkin_date < date.today() or time.time() - entry.created_at > self.stale_ttl
+
+    def _lookup(self, key: str, max_results: int) -> Optional[SearchEntry]:
+        entry = self._entries.get(key)
+        if entry is not None and self._expired(entry):
+            del self._entries[key]
+            entry = None
+        fresh = entry is not None and time.time() - entry.created_at <= self.fresh_ttl
+        if fresh and entry.satisfies(max_results):
+            self._entries.move_to_end(key)
+            return entry
+
+        # Another process may have a fresher or longer result
+        shared = self._load_shared(key, max_results)
+        if shared is not None and (entry is None or shared.created_at > entry.created_at):
+            self.shared_hits += 1
+            self._remember(key, shared)
+            return shared
+        if entry is None or not entry.satisfies(max_results):
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _load_shared(self, key: str, max_results: int) -> Optional[SearchEntry]:
+        if not self.shared:
+            return None
+        row = self.store.get(key)
+        if row is None:
+            return None
+        value, created_at, _ = row
+        entry = SearchEntry(
+            _hotels.validate_python(value["hotels"]),
+            created_at,
+            date.fromisoformat(value["checkin_date"]),
+            value["max_results"],
+        )
+        if self._expired(entry):
+            self.store.delete(key)
+            return None
+        return entry if entry.satisfies(max_results) else None
+
+    def _remember(self, key: str, entry: SearchEntry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _store_entry(self, key: str, entry: SearchEntry):
+        self._remember(key, entry)
+        if self.shared:
+            value = {
+                "hotels": _hotels.dump_python(
+                    entry.hotels, mode="json", by_alias=True, exclude_none=True
+                ),
+                "checkin_date": entry.checkin_date.isoformat(),
+                "max_results": entry.max_results,
+            }
+            self.store.set(key, value, self.stale_ttl, created_at=entry.created_at)
+            if len(self.store) > self.max_entries:
+                self.store.evict(self.max_entries)
+
+    async def _fetch(
+        self,
+        key: str,
+        checkin_date: date,
+        max_results: int,
+        fetch: Callable[[int], Awaitable[list[Hotel] | BookingError]],
+    ) -> list[Hotel] | BookingError:
+        result = await fetch(max_results)
+        if not isinstance(result, BookingError):
+            self._store_entry(key, SearchEntry(result, time.time(), checkin_date, max_results))
+        return result
+
+    async def _refresh(self, key, checkin_date, max_results, fetch):
+        try:
+            self.refreshes += 1
+            # Nobody waits for a refresh, let it yield to interactive requests
+            with priority_scope(Priority.BACKGROUND):
+                await self._fetch(key, checkin_date, max_results, fetch)
+        except Exception:
+            # The stale entry keeps being served until it expires
+            self.refresh_errors += 1
+        finally:
+            self._refreshing.pop(key, None)
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        checkin_date: date,
+        max_results: int,
+        fetch: Callable[[int], Awaitable[list[Hotel] | BookingError]],
+    ) -> list[Hotel] | BookingError:
+        """Serve a search from the cache, refreshing or fetching it as needed.
+
+        Args:
+            key (str): Canonical key of the search, see `canonical_key`
+            checkin_date (date): Check-in date of the search, used for expiry
+            max_results (int): Number of hotels the caller wants
+            fetch: Coroutine factory performing the upstream search for a number of
+                hotels. A refresh asks for as many hotels as the entry it replaces holds,
+                which can be more than this caller wants
+
+        Returns:
+            list[Hotel] | BookingError: At most `max_results` hotels or the upstream error
+        """
+        entry = self._lookup(key, max_results)
+        if entry is None:
+            self.misses += 1
+            result = await self._fetch(key, checkin_date, max_results, fetch)
+            return result if isinstance(result, BookingError) else result[:max_results]
+
+        age = time.time() - entry.created_at
+        self.served_age_total += age
+        self.served_age_max = max(self.served_age_max, age)
+        if age <= self.fresh_ttl:
+            self.fresh_hits += 1
+        else:
+            self.stale_hits += 1
+            if key not in self._refreshing:
+                # Refresh the whole entry, not only this caller's share of it
+                self._refreshing[key] = asyncio.create_task(
+                    self._refresh(key, checkin_date, entry.max_results, fetch)
+                )
+        return entry.hotels[:max_results]
+
+    def purge(self, expired_only: bool = False) -> int:
+        if self.shared:
+            self.store.purge(expired_only=expired_only)
+        if not expired_only:
+            removed = len(self._entries)
+            self._entries.clear()
+            return removed
+        now, today = time.time(), date.today()
+        expired = [
+            key
+            for key, entry in self._entries.items()
+            if entry.checkin_date < today or now - entry.created_at > self.stale_ttl
+        ]
+        for key in expired:
+            del self._entries[key]
+        return len(expired)
+
+    def stats(self) -> dict:
+        hits = self.fresh_hits + self.stale_hits
+        lookups = hits + self.misses
+        now = time.time()
+        ages = [now - entry.created_at for entry in self._entries.values()]
+        return {
+            "fresh_hits": self.fresh_hits,
+            "stale_hits": self.stale_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "served_age_avg": self.served_age_total / hits if hits else 0.0,
+            "served_age_max": self.served_age_max,
+            "entries": len(self._entries),
+            "shared_entries": len(self.store) if self.shared else 0,
+            "entry_age_max": max(ages, default=0.0),
+        }
+
+
+search_cache = SearchCache()
@@ -0,0 +1,129 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+DEFAULT_CACHE_DIR = os.getenv(
+    "BOOKING_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache")
+)
+
+
+class SQLiteStore:
+    """Small persistent key-value table with per-entry expiry.
+
+    Values are stored as JSON text. Every entry remembers when it was written and
+    last read so that the table can be trimmed to a maximum number of rows by
+    evicting the least recently used entries first.
+    """
+
+    def __init__(self, path: str, table: str):
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"""CREATE TABLE IF NOT EXISTS {table} (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_accessed_at ON {table} (accessed_at)"
+        )
+
+    def get(self, key: str, touch: bool = True) -> Optional[tuple[Any, float, float]]:
+        """Fetch an entry regardless of its expiry.
+
+        Returns:
+            tuple: (value, created_at, expires_at) or None if the key is unknown
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created_at, expires_at FROM {self.table} WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            if touch:
+                self._conn.execute(
+                    f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+        return json.loads(row[0]), row[1], row[2]
+
+    def set(self, key: str, value: Any, ttl: float, created_at: Optional[float] = None):
+        now = time.time()
+        created_at = created_at or now
+        with self._lock:
+            self._conn.execute(
+                f"""INSERT OR REPLACE INTO {self.table}
+                    (key, value, created_at, accessed_at, expires_at)
+                    VALUES (?, ?, ?, ?, ?)""",
+                (key, json.dumps(value), created_at, now, created_at + ttl),
+            )
+
+    def delete(self, key: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key = ?", (key,)
+            ).rowcount
+
+    def purge(self, expired_only: bool = False, before: Optional[float] = None) -> int:
+        """Delete entries, either all of them or only the ones expired at `before`."""
+        with self._lock:
+            if expired_only:
+                return self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE expires_at <= ?",
+                    (before or time.time(),),
+                ).rowcount
+            return self._conn.execute(f"DELETE FROM {self.table}").rowcount
+
+    def evict(self, max_rows: int) -> int:
+        """Trim the table to `max_rows` entries, least recently used first."""
+        with self._lock:
+            return self._conn.execute(
+                f"""DELETE FROM {self.table} WHERE key IN (
+                    SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )""",
+                (max_rows,),
+            ).rowcount
+
+    def entries(self, limit: int = 100) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT key, length(value), created_at, accessed_at, expires_at
+                    FROM {self.table} ORDER BY accessed_at DESC LIMIT ?""",
+                (limit,),
+            ).fetchall()
+        return [
+            {
+                "key": key,
+                "size": size,
+                "created_at": created_at,
+                "accessed_at": accessed_at,
+                "expires_at": expires_at,
+            }
+            for key, size, created_at, accessed_at, expires_at in rows
+        ]
+
+    def count_expired(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM {self.table} WHERE expires_at <= ?", (time.time(),)
+            ).fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,24 @@
+# __init__.py
+
+from .pipeline import (
+    DecodedPage,
+    Projection,
+    ResponseDecoder,
+    LOCATION_DECODER,
+    HOTEL_DECODER,
+    REVIEW_DECODER,
+)
+from .streaming import iter_json_items
+from .timing import PhaseTimings, phase_timings
+
+__all__ = [
+    "DecodedPage",
+    "Projection",
+    "ResponseDecoder",
+    "LOCATION_DECODER",
+    "HOTEL_DECODER",
+    "REVIEW_DECODER",
+    "iter_json_items",
+    "PhaseTimings",
+    "phase_timings",
+]
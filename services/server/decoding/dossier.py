@@ -0,0 +1,67 @@
+"""Compact projections of the per-hotel detail endpoints used by the hotel dossier.
+
+The detail endpoints return far more than an agent needs, e.g. every photo in
+five resolutions. These functions keep only the fields worth putting into the
+LLM context and tolerate missing keys, the shape of these payloads varies
+between hotels.
+"""
+from typing import Any, Optional
+
+from services.server.schema.api_response import Facility, Photo, Room
+
+
+def project_description(payload: Any) -> Optional[str]:
+    # Either a single description object or a list of them by description type
+    items = payload if isinstance(payload, list) else [payload]
+    descriptions = [item.get("description") for item in items if isinstance(item, dict)]
+    return "\n\n".join(d for d in descriptions if d) or None
+
+
+def project_facilities(payload: Any) -> list[Facility]:
+    facilities, seen = [], set()
+    for item in payload or []:
+        name = item.get("facility_name")
+        if not name or name in seen:
+            continue
+        seen.add(name)
+        facilities.append(Facility(name=name, category=item.get("facilitytype_name")))
+    return facilities
+
+
+def project_photos(payload: Any, limit: int) -> list[Photo]:
+    photos = []
+    for item in payload or []:
+        if len(photos) >= limit:
+            break
+        url = item.get("url_square60") or item.get("url_max300") or item.get("url_max")
+        if not url:
+            continue
+        tags = [tag.get("tag") for tag in item.get("tags") or [] if isinstance(tag, dict)]
+        photos.append(Photo(thumbnail_url=url, tags=[tag for tag in tags if tag]))
+    return photos
+
+
+def project_rooms(payload: Any) -> list[Room]:
+    # The room list comes wrapped in a single element list holding the bookable blocks
+    result = payload[0] if isinstance(payload, list) and payload else payload or {}
+    rooms, seen = [], set()
+    for block in result.get("block") or []:
+        room_id = block.get("room_id")
+        if room_id is None or room_id in seen:
+            continue
+        seen.add(room_id)
+        price = (block.get("product_price_breakdown") or {}).get("gross_amount_per_night") or {}
+        rooms.append(
+            Room(
+                room_id=room_id,
+                name=block.get("room_name") or block.get("name_without_policy") or block.get("name") or "",
+                max_occupancy=block.get("max_occupancy"),
+                price_per_night=price.get("value"),
+                currency=price.get("currency"),
+                refundable=bool(block["refundable"]) if "refundable" in block else None,
+                breakfast_included=(
+                    bool(block["breakfast_included"]) if "breakfast_included" in block else None
+                ),
+            )
+        )
+    return rooms
@@ -0,0 +1,219 @@
+import time
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Generic, Iterable, NamedTuple, Optional, TypeVar
+
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import from_json
+
+from services.server.decoding.streaming import iter_json_items
+from services.server.decoding.timing import phase_timings
+from services.server.schema.api_response import HotelReview, Hotel, Location
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class Projection:
+    """Declarative description of the keys to strip from an upstream item.
+
+    Args:
+        drop: Keys removed from the item itself
+        nested: Projections applied to dictionaries nested under the given keys
+    """
+
+    def __init__(self, drop: Iterable[str] = (), nested: Optional[dict[str, "Projection"]] = None):
+        self.drop = frozenset(drop)
+        self.nested = nested or {}
+
+    def apply(self, item: dict) -> dict:
+        """Strip the keys from `item` in place and return it."""
+        for key in self.drop.intersection(item):
+            del item[key]
+        for key, projection in self.nested.items():
+            value = item.get(key)
+            if isinstance(value, dict):
+                projection.apply(value)
+        return item
+
+
+class DecodedPage(NamedTuple):
+    items: list
+    # Raw items read from the body, including the ones that were skipped
+    scanned: int
+
+
+class ResponseDecoder(Generic[T]):
+    """Decode an upstream response body into a list of validated models.
+
+    The validator for `list[model]` is built once when the decoder is created,
+    so decoding a response only costs one JSON parse in pydantic-core, the
+    projection of every item and a single validation call for the whole list.
+    `decode_stream` instead validates items one by one while the body arrives
+    and stops reading once enough items are collected.
+
+    Args:
+        model: Pydantic model of a single item
+        projection: Keys dropped from every item before validation
+        items_key: Key holding the list of items, None if the body is the list itself
+        require: Items missing any of these keys are skipped
+    """
+
+    def __init__(
+        self,
+        model: type[T],
+        projection: Optional[Projection] = None,
+        items_key: Optional[str] = None,
+        require: Iterable[str] = (),
+    ):
+        self.model = model
+        self.projection = projection or Projection()
+        self.items_key = items_key
+        self.require = tuple(require)
+        self.adapter = TypeAdapter(list[model])
+        self.item_adapter = TypeAdapter(model)
+
+    def accepts(self, item: dict) -> bool:
+        return all(key in item for key in self.require)
+
+    def items(self, payload: Any, limit: Optional[int] = None) -> list[dict]:
+        """Select, filter, truncate and project the raw items of a parsed body."""
+        items = payload.get(self.items_key, []) if self.items_key else payload
+        items = [item for item in items if self.accepts(item)]
+        if limit is not None:
+            items = items[:limit]
+        return [self.projection.apply(item) for item in items]
+
+    def decode_python(self, payload: Any, limit: Optional[int] = None) -> list[T]:
+        with phase_timings.measure("decode"):
+            items = self.items(payload, limit)
+        with phase_timings.measure("validate"):
+            return self.adapter.validate_python(items)
+
+    def decode(self, content: bytes, limit: Optional[int] = None) -> list[T]:
+        """Parse and validate a raw response body.
+
+        Args:
+            content (bytes): Response body as received from upstream
+            limit (int): Return at most `limit` accepted items
+
+        Returns:
+            list: Validated models
+        """
+        with phase_timings.measure("decode"):
+            payload = from_json(content)
+        return self.decode_python(payload, limit)
+
+    def decode_page(self, content: bytes, limit: Optional[int] = None) -> DecodedPage:
+        """Like `decode`, also reporting how many raw items the body contained."""
+        with phase_timings.measure("decode"):
+            payload = from_json(content)
+        scanned = len(payload.get(self.items_key, []) if self.items_key else payload)
+        return DecodedPage(self.decode_python(payload, limit), scanned)
+
+    async def decode_stream(
+        self, chunks: AsyncIterator[bytes], limit: Optional[int] = None
+    ) -> DecodedPage:
+        """Validate items while the body is being received.
+
+        Args:
+            chunks: Raw body chunks, e.g. `httpx.Response.aiter_bytes()`
+            limit (int): Stop reading once `limit` accepted items are collected
+
+        Returns:
+            DecodedPage: Validated models and the number of raw items read
+        """
+        result, scanned = [], 0
+        if limit is not None and limit <= 0:
+            return DecodedPage(result, scanned)
+        # Parsing is interleaved with the body download, it is what remains of the
+        # elapsed time once waiting for chunks and validation are accounted for
+        started = time.perf_counter()
+        waited = validated = 0.0
+
+        async def timed(chunks):
+            nonlocal waited
+            chunks = aiter(chunks)
+            while True:
+                wait_started = time.perf_counter()
+                chunk = await anext(chunks, None)
+                waited += time.perf_counter() - wait_started
+                if chunk is None:
+                    return
+                yield chunk
+
+        async with aclosing(iter_json_items(timed(chunks), self.items_key)) as items:
+            async for item in items:
+                scanned += 1
+                if not self.accepts(item):
+                    continue
+                self.projection.apply(item)
+                validate_started = time.perf_counter()
+                result.append(self.item_adapter.validate_python(item))
+                validated += time.perf_counter() - validate_started
+                if limit is not None and len(result) >= limit:
+                    break
+        phase_timings.add("network", waited)
+        phase_timings.add("validate", validated)
+        phase_timings.add("decode", time.perf_counter() - started - waited - validated)
+        return DecodedPage(result, scanned)
+
+
+LOCATION_DECODER = ResponseDecoder(
+    Location,
+    Projection(drop={"type", "b_max_los_data", "image_url", "roundtrip", "timezone", "cc1"}),
+)
+
+HOTEL_DECODER = ResponseDecoder(
+    Hotel,
+    Projection(
+        drop={
+            "selected_review_topic",
+            "review_recommendation",
+            "review_score_word",
+            "max_photo_url",
+            "max_1440_photo_url",
+            "native_ads_tracking",
+            "native_ads_cpc",
+            "block_ids",
+            "in_best_district",
+            "ufi",
+            "timezone",
+            "bwallet",
+            "native_ad_id",
+            "default_wishlist_name",
+            "class_is_estimated",
+            "main_photo_id",
+            "wishlist_count",
+            "genius_discount_percentage",
+        },
+        nested={
+            "composite_price_breakdown": Projection(
+                drop={
+                    "benefits",
+                    "price_display_config",
+                    "strikethrough_amount",
+                    "all_inclusive_amount_hotel_currency",
+                    "all_inclusive_amount",
+                    "price_breakdown",
+                }
+            )
+        },
+    ),
+    items_key="result",
+    require=("composite_price_breakdown",),
+)
+
+REVIEW_DECODER = ResponseDecoder(
+    HotelReview,
+    Projection(
+        drop={
+            "author",
+            "pros_translated",
+            "title_translated",
+            "reviewer_photos",
+            "cons_translated",
+            "is_trivial",
+        },
+        nested={"stayed_room_info": Projection(drop={"photo"})},
+    ),
+    items_key="result",
+)
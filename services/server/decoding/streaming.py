@@ -0,0 +1,119 @@
+import codecs
+import json
+import re
+from typing import Any, AsyncIterator, Optional
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r"[ \t\n\r]*")
+_number_chars = frozenset("0123456789.eE+-")
+
+# Parser states
+_START, _KEY_FIRST, _KEY, _COLON, _VALUE, _AFTER_VALUE, _ITEM_FIRST, _ITEM, _AFTER_ITEM = range(9)
+
+
+class _NeedMore(Exception):
+    pass
+
+
+async def iter_json_items(
+    chunks: AsyncIterator[bytes], items_key: Optional[str] = None
+) -> AsyncIterator[Any]:
+    """Incrementally yield the items of a JSON array while the body is still arriving.
+
+    The array is either the body itself (`items_key` is None) or the value stored
+    under `items_key` of the top-level object. Other top-level values are parsed
+    and skipped. Only the chunk being read and the item being assembled are held
+    in memory, and nothing after the closing bracket of the array is read, so a
+    caller can stop consuming at any point.
+
+    Args:
+        chunks: Raw body chunks, e.g. `httpx.Response.aiter_bytes()`
+        items_key (str): Key of the array in the top-level object
+
+    Yields:
+        Any: Every array item decoded with the standard `json` module
+
+    Raises:
+        ValueError: If the body is not valid JSON or ends prematurely
+    """
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    chunks = aiter(chunks)
+    buffer, pos, exhausted = "", 0, False
+    state, key = _START, None
+
+    def decode_value(pos: int) -> tuple[Any, int]:
+        try:
+            value, end = _decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if exhausted:
+                raise
+            raise _NeedMore
+        # Only trust a value once a delimiter follows, numbers may continue in the next chunk
+        if not exhausted:
+            follow = _whitespace.match(buffer, end).end()
+            if follow == len(buffer) or buffer[follow] in _number_chars:
+                raise _NeedMore
+        return value, end
+
+    while True:
+        pos = _whitespace.match(buffer, pos).end()
+        try:
+            if pos >= len(buffer):
+                raise _NeedMore
+            char = buffer[pos]
+
+            if state == _START:
+                expected = "{" if items_key else "["
+                if char != expected:
+                    raise ValueError(f"Expected '{expected}' at the start of the body, found {char!r}")
+                pos += 1
+                state = _KEY_FIRST if items_key else _ITEM_FIRST
+            elif state in (_KEY_FIRST, _KEY):
+                if char == "}" and state == _KEY_FIRST:
+                    return
+                key, pos = decode_value(pos)
+                state = _COLON
+            elif state == _COLON:
+                if char != ":":
+                    raise ValueError(f"Expected ':' after key {key!r}, found {char!r}")
+                pos += 1
+                state = _VALUE
+            elif state == _VALUE:
+                if key == items_key:
+                    if char != "[":
+                        raise ValueError(f"Expected an array under {items_key!r}, found {char!r}")
+                    pos += 1
+                    state = _ITEM_FIRST
+                else:
+                    _, pos = decode_value(pos)
+                    state = _AFTER_VALUE
+            elif state == _AFTER_VALUE:
+                if char == "}":
+                    return
+                if char != ",":
+                    raise ValueError(f"Expected ',' or '}}' after value of {key!r}, found {char!r}")
+                pos += 1
+                state = _KEY
+            elif state in (_ITEM_FIRST, _ITEM):
+                if char == "]" and state == _ITEM_FIRST:
+                    return
+                item, pos = decode_value(pos)
+                state = _AFTER_ITEM
+                yield item
+            elif state == _AFTER_ITEM:
+                if char == "]":
+                    return
+                if char != ",":
+                    raise ValueError(f"Expected ',' or ']' between items, found {char!r}")
+                pos += 1
+                state = _ITEM
+        except _NeedMore:
+            if exhausted:
+                raise ValueError("Response body ended before the JSON document was complete")
+            chunk = await anext(chunks, None)
+            if chunk is None:
+                exhausted = True
+                buffer = buffer[pos:] + utf8.decode(b"", final=True)
+            else:
+                buffer = buffer[pos:] + utf8.decode(chunk)
+            pos = 0
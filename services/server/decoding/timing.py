@@ -0,0 +1,39 @@
+import time
+from contextlib import contextmanager
+
+
+class PhaseTimings:
+    """Cumulative time spent in each phase of serving upstream data.
+
+    Phases:
+        queue: Waiting for the scheduler to let a request through
+        network: Waiting for upstream headers and body chunks
+        decode: Parsing JSON bodies and projecting the items
+        validate: Validating items into pydantic models
+
+    `snapshot` also reports the CPU time of the whole process, so that the time
+    spent outside these phases (MCP framing, serialization of tool results) can
+    be derived from the difference of two snapshots.
+    """
+
+    PHASES = ("queue", "network", "decode", "validate")
+
+    def __init__(self):
+        self.seconds = dict.fromkeys(self.PHASES, 0.0)
+
+    def add(self, phase: str, seconds: float):
+        self.seconds[phase] += seconds
+
+    @contextmanager
+    def measure(self, phase: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[phase] += time.perf_counter() - started
+
+    def snapshot(self) -> dict:
+        return {**self.seconds, "process_cpu": time.process_time()}
+
+
+phase_timings = PhaseTimings()
@@ -0,0 +1,11 @@
+# __init__.py
+
+from .tabular import TableEncoder, DATE_WINDOW_TABLE, HOTEL_TABLE, NEARBY_HOTEL_TABLE, REVIEW_TABLE
+
+__all__ = [
+    "TableEncoder",
+    "DATE_WINDOW_TABLE",
+    "HOTEL_TABLE",
+    "NEARBY_HOTEL_TABLE",
+    "REVIEW_TABLE",
+]
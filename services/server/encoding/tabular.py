@@ -0,0 +1,113 @@
+from operator import attrgetter
+from typing import Any, Callable, Generic, Iterable, Optional, TypeVar
+
+from services.server.schema.api_response import DateWindowPrice, Hotel, HotelReview, NearbyHotel, Table
+
+T = TypeVar("T")
+
+
+class TableEncoder(Generic[T]):
+    """Encode models as a `Table`: the column names once, then one row of values per model.
+
+    Every key of a JSON object is repeated for every item, and for hotels most of
+    them are of no use when choosing between stays. A table only carries the
+    columns listed here, so the same results take a fraction of the prompt tokens.
+
+    Args:
+        columns: Column name mapped to the function extracting its value from a model
+    """
+
+    def __init__(self, columns: dict[str, Callable[[T], Any]]):
+        self.columns = columns
+
+    def select(self, columns: Iterable[str]) -> "TableEncoder[T]":
+        """Encoder of the given columns only, in the given order."""
+        unknown = [column for column in columns if column not in self.columns]
+        if unknown:
+            raise ValueError(f"Unknown columns {unknown}, available: {list(self.columns)}")
+        return TableEncoder({column: self.columns[column] for column in columns})
+
+    def encode(self, items: Iterable[T]) -> Table:
+        getters = list(self.columns.values())
+        return Table(columns=list(self.columns), rows=[[get(item) for get in getters] for item in items])
+
+
+def _amount(name: str) -> Callable[[Hotel], Optional[float]]:
+    def get(hotel: Hotel) -> Optional[float]:
+        amount = getattr(hotel.composite_price_breakdown, name, None)
+        return round(amount.value, 2) if amount is not None else None
+
+    return get
+
+
+def _km(hotel: Hotel) -> Optional[float]:
+    try:
+        return float(hotel.distance_to_cc)
+    except ValueError:
+        return None
+
+
+HOTEL_TABLE = TableEncoder[Hotel](
+    {
+        "hotel_id": attrgetter("hotel_id"),
+        "name": attrgetter("hotel_name"),
+        "type": attrgetter("accommodation_type_name"),
+        "class": attrgetter("hotel_class"),
+        "district": attrgetter("district"),
+        "km_to_centre": _km,
+        "price_per_night": _amount("gross_amount_per_night"),
+        "total_price": _amount("gross_amount"),
+        "currency": attrgetter("currency_code"),
+        "review_score": attrgetter("review_score"),
+        "reviews": attrgetter("review_nr"),
+        "free_cancellation": attrgetter("is_free_cancellable"),
+        "no_prepayment": attrgetter("is_no_prepayment_block"),
+        "breakfast": attrgetter("hotel_include_breakfast"),
+        "free_parking": attrgetter("has_free_parking"),
+        "sold_out": attrgetter("soldout"),
+        "latitude": lambda hotel: round(hotel.latitude, 5),
+        "longitude": lambda hotel: round(hotel.longitude, 5),
+    }
+)
+
+
+def _of_hotel(get: Callable[[Hotel], Any]) -> Callable[[NearbyHotel], Any]:
+    return lambda nearby: get(nearby.hotel)
+
+
+NEARBY_HOTEL_TABLE = TableEncoder[NearbyHotel](
+    {
+        "distance_km": attrgetter("distance_km"),
+        **{name: _of_hotel(get) for name, get in HOTEL_TABLE.columns.items()},
+    }
+)
+
+REVIEW_TABLE = TableEncoder[HotelReview](
+    {
+        "review_id": attrgetter("review_id"),
+        "date": lambda review: review.date[:10],
+        "score": attrgetter("average_score"),
+        "language": attrgetter("languagecode"),
+        "country": attrgetter("countrycode"),
+        "purpose": attrgetter("travel_purpose"),
+        "room": lambda review: review.stayed_room_info.room_name,
+        "nights": lambda review: review.stayed_room_info.num_nights,
+        "title": attrgetter("title"),
+        "pros": attrgetter("pros"),
+        "cons": attrgetter("cons"),
+        "tags": lambda review: "; ".join(review.tags),
+    }
+)
+
+DATE_WINDOW_TABLE = TableEncoder[DateWindowPrice](
+    {
+        "checkin": attrgetter("checkin_date"),
+        "checkout": attrgetter("checkout_date"),
+        "hotels": attrgetter("hotels"),
+        "min_per_night": attrgetter("min_price_per_night"),
+        "median_per_night": attrgetter("median_price_per_night"),
+        "cheapest_hotel_id": attrgetter("cheapest_hotel_id"),
+        "cheapest_hotel": attrgetter("cheapest_hotel_name"),
+        "error": attrgetter("error"),
+    }
+)
@@ -0,0 +1,13 @@
+# __init__.py
+
+from .registry import Counter, Gauge, Histogram, Registry, registry
+from .middleware import ToolMetrics
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "Registry",
+    "registry",
+    "ToolMetrics",
+]
@@ -0,0 +1,40 @@
+from services.server.metrics.registry import registry
+
+TOOL_CALLS = registry.counter(
+    "mcp_tool_calls_total", "Tool calls by outcome: ok, error or cancelled", ("tool", "outcome")
+)
+TOOL_DURATION = registry.histogram(
+    "mcp_tool_duration_seconds", "Time to run a tool call and convert its result", ("tool",)
+)
+TOOL_IN_FLIGHT = registry.gauge("mcp_tool_calls_in_flight", "Tool calls being run", ("tool",))
+
+UPSTREAM_REQUESTS = registry.counter(
+    "booking_upstream_requests_total",
+    "Upstream requests sent, by response status, or `error` or `cancelled` when no response came back",
+    ("endpoint", "status"),
+)
+UPSTREAM_DURATION = registry.histogram(
+    "booking_upstream_request_duration_seconds",
+    "Time from sending an upstream request to the end of its body",
+    ("endpoint",),
+)
+UPSTREAM_BYTES = registry.counter(
+    "booking_upstream_received_bytes_total",
+    "Response body bytes received from upstream, as sent",
+    ("endpoint",),
+)
+UPSTREAM_RETRIES = registry.counter(
+    "booking_upstream_retries_total",
+    "Upstream requests sent again, by the status or error of the failed attempt",
+    ("endpoint", "reason"),
+)
+UPSTREAM_IN_FLIGHT = registry.gauge(
+    "booking_upstream_requests_in_flight",
+    "Upstream requests sent and not fully received",
+    ("endpoint",),
+)
+UPSTREAM_HEDGES = registry.counter(
+    "booking_upstream_hedges_total",
+    "Slow upstream requests sent a second time, by whether the copy answered first",
+    ("endpoint", "result"),
+)
@@ -0,0 +1,23 @@
+import asyncio
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+from services.server.metrics.instruments import TOOL_CALLS, TOOL_DURATION, TOOL_IN_FLIGHT
+
+
+class ToolMetrics(Middleware):
+    """Count, time and track the concurrency of every tool call."""
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        tool = context.message.name
+        outcome = "error"
+        with TOOL_IN_FLIGHT.track(tool=tool), TOOL_DURATION.time(tool=tool):
+            try:
+                result = await call_next(context)
+                outcome = "ok"
+                return result
+            except asyncio.CancelledError:
+                outcome = "cancelled"
+                raise
+            finally:
+                TOOL_CALLS.inc(tool=tool, outcome=outcome)
@@ -0,0 +1,281 @@
+import asyncio
+import json
+import math
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+# Seconds, from a cached lookup to a multi-page upstream search
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Labels and value of a metric whose value is read from elsewhere when collected
+Sample = tuple[dict[str, str], float]
+
+# How the values several processes report for one sample are combined
+MERGES: dict[str, Callable[[float, float], float]] = {"sum": lambda a, b: a + b, "min": min, "max": max}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: Iterable, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Running under another user, or no way to tell on this platform
+        return True
+    return True
+
+
+def _number(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), merge: str = "sum"):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.merge = merge
+        self.values: dict[tuple[str, ...], object] = {}
+
+    def _key(self, labels: dict[str, object]) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def snapshot(self) -> dict:
+        return {
+            "kind": self.kind,
+            "help": self.help,
+            "merge": self.merge,
+            "labels": list(self.labels),
+            "samples": [[list(key), value] for key, value in self.values.items()],
+        }
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        self.values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    @contextmanager
+    def track(self, **labels):
+        """Count the block as in progress while it runs."""
+        self.inc(1, **labels)
+        try:
+            yield
+        finally:
+            self.inc(-1, **labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        # Per bucket (non cumulative) counts, then the +Inf bucket, the sum and the count
+        counts = self.values.get(key)
+        if counts is None:
+            counts = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+                break
+        else:
+            counts[len(self.buckets)] += 1
+        counts[-2] += value
+        counts[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def snapshot(self) -> dict:
+        return {**super().snapshot(), "buckets": list(self.buckets)}
+
+
+class Registry:
+    """Metrics of the server, rendered in the Prometheus text exposition format.
+
+    Counters, gauges and histograms are updated in place by the code they
+    measure. Collectors are called when metrics are rendered and report values
+    kept elsewhere, such as the hit counts of the caches, as counters.
+
+    With `directory` set, every process writes a snapshot of its metrics there
+    every `share_interval` seconds and renders the sum over all snapshots, so a
+    scrape answered by any worker of a multi-process deployment covers all of
+    them. Snapshots of exited workers are kept so that counters never go back,
+    but only their counters and histograms are rendered: their gauges describe a
+    process which is gone.
+    Values are summed across processes unless the metric asks for their `min`
+    or `max`.
+
+    Settings can be overridden through the environment:
+        METRICS_DIR: Directory of the per-process snapshots (default none, this process only)
+        METRICS_SHARE_INTERVAL: Seconds between snapshots written by a process (default 5)
+    """
+
+    def __init__(self, directory: Optional[str] = None, share_interval: Optional[float] = None):
+        self.directory = directory or os.getenv("METRICS_DIR")
+        self.share_interval = share_interval or float(os.getenv("METRICS_SHARE_INTERVAL", 5))
+        self._metrics: dict[str, Metric] = {}
+        self._collectors: list[tuple[str, str, str, Callable[[], Iterable[Sample]], str]] = []
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: tuple[str, ...] = (), merge: str = "sum") -> Gauge:
+        return self._register(Gauge(name, help, labels, merge))
+
+    def histogram(
+        self, name: str, help: str, labels: tuple[str, ...] = (), buckets=DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def collector(
+        self,
+        name: str,
+        kind: str,
+        help: str,
+        collect: Callable[[], Iterable[Sample]],
+        merge: str = "sum",
+    ):
+        """Report the samples returned by `collect` as the metric `name` at every render.
+
+        `merge` combines the values of several processes: `sum` for counts, `min`
+        or `max` for values every process observes of one shared resource.
+        """
+        self._collectors.append((name, kind, help, collect, merge))
+
+    def snapshot(self) -> dict:
+        metrics = {name: metric.snapshot() for name, metric in self._metrics.items()}
+        for name, kind, help, collect, merge in self._collectors:
+            family = metrics.setdefault(
+                name, {"kind": kind, "help": help, "merge": merge, "labels": None, "samples": []}
+            )
+            for labels, value in collect():
+                family["samples"].append([list(labels.items()), value])
+        return metrics
+
+    @property
+    def _file(self) -> Path:
+        return Path(self.directory) / f"{os.getpid()}.json"
+
+    def share(self):
+        """Write the snapshot of this process for the others to render."""
+        if not self.directory:
+            return
+        Path(self.directory).mkdir(parents=True, exist_ok=True)
+        tmp = self._file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.snapshot()))
+        os.replace(tmp, self._file)
+
+    async def share_periodically(self):
+        """Keep the snapshot of this process current, until cancelled."""
+        while True:
+            self.share()
+            await asyncio.sleep(self.share_interval)
+
+    def _snapshots(self) -> list[dict]:
+        snapshots = [self.snapshot()]
+        if not self.directory or not os.path.isdir(self.directory):
+            return snapshots
+        for file in Path(self.directory).glob("*.json"):
+            if file == self._file:
+                continue
+            try:
+                snapshot = json.loads(file.read_text())
+            except (OSError, ValueError):
+                # Being replaced right now, counted at the next scrape
+                continue
+            if file.stem.isdigit() and not _alive(int(file.stem)):
+                snapshot = {name: family for name, family in snapshot.items() if family["kind"] != "gauge"}
+            snapshots.append(snapshot)
+        return snapshots
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format, summed over processes."""
+        families: dict[str, dict] = {}
+        for snapshot in self._snapshots():
+            for name, family in snapshot.items():
+                merged = families.setdefault(name, {**family, "samples": {}})
+                combine = MERGES[merged["merge"]]
+                for key, value in family["samples"]:
+                    key = json.dumps(key)
+                    if key not in merged["samples"]:
+                        merged["samples"][key] = value
+                    elif isinstance(value, list):
+                        total = merged["samples"][key]
+                        merged["samples"][key] = [a + b for a, b in zip(total, value)]
+                    else:
+                        merged["samples"][key] = combine(merged["samples"][key], value)
+
+        lines = []
+        for name, family in families.items():
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['kind']}")
+            for key, value in family["samples"].items():
+                key = json.loads(key)
+                if family["labels"] is None:
+                    # Collected samples carry their label names: [[label, value], ...]
+                    names = tuple(label for label, _ in key)
+                    lines.append(f"{name}{_labels(names, (v for _, v in key))} {_number(value)}")
+                elif family["kind"] == "histogram":
+                    labels = tuple(family["labels"])
+                    cumulative = 0
+                    for bound, count in zip([*family["buckets"], math.inf], value):
+                        cumulative += count
+                        le = f'le="{_number(bound)}"'
+                        lines.append(f"{name}_bucket{_labels(labels, key, le)} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(labels, key)} {_number(value[-2])}")
+                    lines.append(f"{name}_count{_labels(labels, key)} {value[-1]}")
+                else:
+                    lines.append(f"{name}{_labels(tuple(family['labels']), key)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
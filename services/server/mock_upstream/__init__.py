@@ -0,0 +1,3 @@
+from .app import MockSettings, MockUpstream, create_app
+
+__all__ = ["MockSettings", "MockUpstream", "create_app"]
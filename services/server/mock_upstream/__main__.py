@@ -0,0 +1,82 @@
+"""Run the local Booking API stand-in.
+
+Usage:
+    python -m services.server.mock_upstream serve [--port 9000] [--fixtures DIR] [--latency-ms MS] ...
+    python -m services.server.mock_upstream seed DIR [--hotels N]
+
+Point the server at it with `BOOKING_BASE_URL=http://127.0.0.1:9000/v1`. Real
+responses are recorded into a fixture directory by running the server against
+RapidAPI with `BOOKING_RECORD_DIR=DIR`.
+"""
+import argparse
+import json
+import sys
+
+from services.server.mock_upstream import MockSettings, create_app
+from services.server.mock_upstream.app import SYNTHETIC
+from services.server.upstream.recording import FixtureStore
+
+SEED_LOCATIONS = ("Goa", "Mumbai", "Delhi", "Jaipur", "Bangalore")
+
+
+def seed(directory: str, hotels: int) -> int:
+    """Write synthetic fixtures for every endpoint, a starting point to replace with recordings."""
+    store = FixtureStore(directory)
+    requests = [("/hotels/locations", {"name": name, "locale": "en-gb"}) for name in SEED_LOCATIONS]
+    requests += [("/hotels/search", {"page_number": str(page)}) for page in range(3)]
+    for hotel_id in range(100000, 100000 + hotels):
+        for path in SYNTHETIC:
+            if path not in ("/hotels/locations", "/hotels/search"):
+                requests.append((path, {"hotel_id": str(hotel_id), "locale": "en-gb"}))
+    for path, params in requests:
+        body = json.dumps(SYNTHETIC[path](params)).encode()
+        store.save(path, params, 200, "application/json", body)
+    return len(requests)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m services.server.mock_upstream")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="Serve the stand-in over HTTP")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=9000)
+    serve_parser.add_argument("--fixtures", help="Directory of recorded fixtures to replay")
+    serve_parser.add_argument("--latency-ms", type=float)
+    serve_parser.add_argument("--jitter-ms", type=float)
+    serve_parser.add_argument("--error-rate", type=float, help="Fraction of 5xx responses")
+    serve_parser.add_argument("--throttle-rate", type=float, help="Fraction of 429 responses")
+    serve_parser.add_argument("--retry-after", type=float, help="Seconds sent with a 429")
+    serve_parser.add_argument("--quota", type=int, help="Requests before every response is a 429")
+    serve_parser.add_argument("--chunk-size", type=int, help="Bytes per body chunk, 0 to disable")
+    serve_parser.add_argument("--no-synthetic", action="store_true", help="404 when no fixture matches")
+    serve_parser.add_argument("--seed", type=int)
+
+    seed_parser = subparsers.add_parser("seed", help="Write synthetic fixtures into a directory")
+    seed_parser.add_argument("directory")
+    seed_parser.add_argument("--hotels", type=int, default=10)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "seed":
+        print(f"Wrote {seed(args.directory, args.hotels)} fixtures to {args.directory}")
+    elif args.command == "serve":
+        import uvicorn
+
+        settings = MockSettings(
+            fixtures=args.fixtures,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate,
+            retry_after=args.retry_after,
+            quota=args.quota,
+            chunk_size=args.chunk_size,
+            synthetic=False if args.no_synthetic else None,
+            seed=args.seed,
+        )
+        uvicorn.run(create_app(settings), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
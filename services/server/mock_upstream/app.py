@@ -0,0 +1,196 @@
+import asyncio
+import json
+import os
+import random
+from collections import Counter
+from typing import Any, Callable, Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from services.server.mock_upstream import samples
+from services.server.upstream.recording import FixtureStore
+
+
+def _int(params: dict[str, str], key: str, default: int) -> int:
+    try:
+        return int(params.get(key, default))
+    except ValueError:
+        return default
+
+
+def _hotel_id(params: dict[str, str]) -> int:
+    return _int(params, "hotel_id", 100000)
+
+
+def _search(params: dict[str, str]) -> Any:
+    page = _int(params, "page_number", 0)
+    return samples.sample_search_page(20, 20 * page)
+
+
+# Generated responses for endpoints without a recording
+SYNTHETIC: dict[str, Callable[[dict[str, str]], Any]] = {
+    "/hotels/locations": lambda params: [
+        samples.sample_location(params.get("name", "Goa"), index) for index in range(5)
+    ],
+    "/hotels/search": _search,
+    # Between 75 and 1050 reviews depending on the hotel
+    "/hotels/reviews": lambda params: samples.sample_reviews_page(
+        _hotel_id(params), _int(params, "page_number", 0), total=75 * (1 + _hotel_id(params) % 14)
+    ),
+    "/hotels/review-scores": lambda params: samples.sample_review_scores(_hotel_id(params)),
+    "/hotels/description": lambda params: samples.sample_description(_hotel_id(params)),
+    "/hotels/facilities": lambda params: samples.sample_facilities(_hotel_id(params)),
+    "/hotels/photos": lambda params: samples.sample_photos(_hotel_id(params)),
+    "/hotels/room-list": lambda params: samples.sample_room_list(_hotel_id(params)),
+}
+
+
+class MockSettings:
+    """Behaviour of the stand-in, every setting can be overridden through the environment:
+        MOCK_UPSTREAM_FIXTURES: Directory of recorded fixtures to replay (default none)
+        MOCK_UPSTREAM_LATENCY_MS: Fixed latency added to every response (default 150)
+        MOCK_UPSTREAM_JITTER_MS: Random extra latency up to this value (default 100)
+        MOCK_UPSTREAM_ERROR_RATE: Fraction of requests answered with a 5xx (default 0)
+        MOCK_UPSTREAM_THROTTLE_RATE: Fraction of requests answered with a 429 (default 0)
+        MOCK_UPSTREAM_RETRY_AFTER: Seconds sent in the `Retry-After` of a 429 (default 1)
+        MOCK_UPSTREAM_QUOTA: Requests before every response is a 429, 0 for unlimited (default 0)
+        MOCK_UPSTREAM_CHUNK_SIZE: Bytes per body chunk, 0 to send bodies in one piece (default 16384)
+        MOCK_UPSTREAM_SYNTHETIC: Set to 0 to answer 404 instead of generating missing fixtures (default 1)
+        MOCK_UPSTREAM_SEED: Seed of the latency and fault injection, for reproducible runs
+    """
+
+    def __init__(
+        self,
+        fixtures: Optional[str] = None,
+        latency_ms: Optional[float] = None,
+        jitter_ms: Optional[float] = None,
+        error_rate: Optional[float] = None,
+        throttle_rate: Optional[float] = None,
+        retry_after: Optional[float] = None,
+        quota: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        synthetic: Optional[bool] = None,
+        seed: Optional[int] = None,
+    ):
+        def setting(value, name, default, cast):
+            return value if value is not None else cast(os.getenv(name, default))
+
+        self.fixtures = fixtures or os.getenv("MOCK_UPSTREAM_FIXTURES")
+        self.latency_ms = setting(latency_ms, "MOCK_UPSTREAM_LATENCY_MS", 150, float)
+        self.jitter_ms = setting(jitter_ms, "MOCK_UPSTREAM_JITTER_MS", 100, float)
+        self.error_rate = setting(error_rate, "MOCK_UPSTREAM_ERROR_RATE", 0, float)
+        self.throttle_rate = setting(throttle_rate, "MOCK_UPSTREAM_THROTTLE_RATE", 0, float)
+        self.retry_after = setting(retry_after, "MOCK_UPSTREAM_RETRY_AFTER", 1, float)
+        self.quota = setting(quota, "MOCK_UPSTREAM_QUOTA", 0, int)
+        self.chunk_size = setting(chunk_size, "MOCK_UPSTREAM_CHUNK_SIZE", 16384, int)
+        if synthetic is None:
+            synthetic = os.getenv("MOCK_UPSTREAM_SYNTHETIC", "1") != "0"
+        self.synthetic = synthetic
+        seed = setting(seed, "MOCK_UPSTREAM_SEED", "", str)
+        self.seed = int(seed) if seed != "" else None
+
+
+class MockUpstream:
+    """Local stand-in for the Booking.com RapidAPI endpoints.
+
+    A request is answered with its recorded fixture when there is one, else with
+    the recording of the same endpoint sharing most parameters, else with a
+    synthetic payload shaped like the real response. Latency, 5xx errors, 429s
+    and the RapidAPI quota headers are injected according to `MockSettings`.
+    """
+
+    def __init__(self, settings: Optional[MockSettings] = None):
+        self.settings = settings or MockSettings()
+        self.store = FixtureStore(self.settings.fixtures) if self.settings.fixtures else None
+        self.random = random.Random(self.settings.seed)
+        self.served = 0
+        self.requests: Counter[str] = Counter()
+        self.sources: Counter[str] = Counter()
+        self.injected: Counter[int] = Counter()
+
+    def _quota_headers(self) -> dict[str, str]:
+        if not self.settings.quota:
+            return {}
+        return {
+            "x-ratelimit-requests-limit": str(self.settings.quota),
+            "x-ratelimit-requests-remaining": str(max(self.settings.quota - self.served, 0)),
+            "x-ratelimit-requests-reset": "2592000",
+        }
+
+    def _body(self, content: bytes, status: int, content_type: str, headers: dict) -> Response:
+        size = self.settings.chunk_size
+        if not size or len(content) <= size:
+            return Response(content, status, headers=headers, media_type=content_type)
+
+        async def chunks():
+            for start in range(0, len(content), size):
+                yield content[start : start + size]
+                # Let other responses interleave, as they would on a real connection
+                await asyncio.sleep(0)
+
+        return StreamingResponse(chunks(), status, headers=headers, media_type=content_type)
+
+    def _payload(self, path: str, params: dict[str, str]) -> Optional[tuple[int, str, bytes]]:
+        fixture = self.store.nearest(path, params) if self.store is not None else None
+        if fixture is not None:
+            self.sources["fixture" if fixture["params"] == dict(sorted(params.items())) else "nearest"] += 1
+            return fixture["status"], fixture["content_type"], fixture.content()
+        generate = SYNTHETIC.get(path)
+        if generate is None or not self.settings.synthetic:
+            return None
+        self.sources["synthetic"] += 1
+        return 200, "application/json", json.dumps(generate(params), ensure_ascii=False).encode()
+
+    async def handle(self, request: Request) -> Response:
+        path = f"/hotels/{request.path_params['endpoint']}"
+        params = dict(request.query_params)
+        self.requests[path] += 1
+        settings = self.settings
+
+        await asyncio.sleep((settings.latency_ms + self.random.uniform(0, settings.jitter_ms)) / 1000)
+
+        roll = self.random.random()
+        if (settings.quota and self.served >= settings.quota) or roll < settings.throttle_rate:
+            self.injected[429] += 1
+            return JSONResponse(
+                {"message": "Too many requests"},
+                429,
+                headers={"Retry-After": f"{settings.retry_after:g}", **self._quota_headers()},
+            )
+        if roll < settings.throttle_rate + settings.error_rate:
+            status = self.random.choice((500, 502, 503))
+            self.injected[status] += 1
+            return JSONResponse({"message": "Injected upstream error"}, status)
+
+        self.served += 1
+        payload = self._payload(path, params)
+        if payload is None:
+            return JSONResponse({"message": f"No fixture for {path}"}, 404)
+        status, content_type, content = payload
+        return self._body(content, status, content_type, self._quota_headers())
+
+    async def stats(self, request: Request) -> JSONResponse:
+        return JSONResponse(
+            {
+                "served": self.served,
+                "requests": dict(self.requests),
+                "sources": dict(self.sources),
+                "injected": {str(status): count for status, count in self.injected.items()},
+            }
+        )
+
+
+def create_app(settings: Optional[MockSettings] = None) -> Starlette:
+    """Starlette app serving the stand-in under the same `/v1` prefix as RapidAPI."""
+    upstream = MockUpstream(settings)
+    app = Starlette(
+        routes=[
+            Route("/v1/hotels/{endpoint}", upstream.handle),
+            Route("/stats", upstream.stats),
+        ]
+    )
+    app.state.upstream = upstream
+    return app
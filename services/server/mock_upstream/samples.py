@@ -0,0 +1,306 @@
+"""Synthetic upstream payloads shaped like real Booking API responses."""
+from datetime import date, timedelta
+
+
+def _amount(value: float, currency: str = "INR") -> dict:
+    return {
+        "currency": currency,
+        "value": value,
+        "amount_unrounded": f"₹{value:,.2f}",
+        "amount_rounded": f"₹{round(value):,}",
+    }
+
+
+def sample_hotel(index: int) -> dict:
+    price = 3500.0 + 137 * (index % 40)
+    return {
+        "hotel_id": 100000 + index,
+        "id": f"property_card_{100000 + index}",
+        "hotel_name": f"Sample Hotel {index}",
+        "hotel_name_trans": f"Sample Hotel {index}",
+        "type": "property_card",
+        "url": f"https://www.booking.com/hotel/in/sample-{index}.html",
+        "city": "Goa",
+        "city_trans": "Goa",
+        "city_in_trans": "in Goa",
+        "city_name_en": "Goa",
+        "country_trans": "India",
+        "countrycode": "in",
+        "cc1": "in",
+        "district": "Calangute",
+        "district_id": 1234,
+        "districts": "1234,5678",
+        "address": f"{index} Beach Road",
+        "address_trans": f"{index} Beach Road",
+        "zip": "403516",
+        "latitude": 15.5 + (index % 50) / 1000,
+        "longitude": 73.76 + (index % 50) / 1000,
+        "timezone": "Asia/Kolkata",
+        "default_language": "en-gb",
+        "currencycode": "INR",
+        "currency_code": "INR",
+        "accommodation_type": 204,
+        "accommodation_type_name": "Hotel",
+        "class": index % 5 + 1,
+        "class_is_estimated": 0,
+        "review_score": 7.5 + (index % 25) / 10,
+        "review_score_word": "Very good",
+        "review_nr": 100 + index,
+        "review_recommendation": "",
+        "selected_review_topic": None,
+        "distance": f"{(index % 30) / 10:.1f}",
+        "distance_to_cc": f"{(index % 30) / 10:.1f}",
+        "distance_to_cc_formatted": f"{(index % 30) / 10:.1f} km",
+        "distances": [{"icon_set": None, "icon_name": "bui_geo_pin", "text": "1.2 km from centre"}],
+        "checkin": {"from": "14:00", "until": ""},
+        "checkout": {"from": "", "until": "11:00"},
+        "updated_checkin": None,
+        "updated_checkout": None,
+        "min_total_price": price * 2,
+        "hotel_facilities": "2,3,5,7,8,11,16,20,22,25,28,46,47,48,91,96,107,108,109,110",
+        "main_photo_url": f"https://cf.bstatic.com/xdata/images/hotel/square60/{index}.jpg",
+        "max_photo_url": f"https://cf.bstatic.com/xdata/images/hotel/max1024x768/{index}.jpg",
+        "max_1440_photo_url": f"https://cf.bstatic.com/xdata/images/hotel/1440x1440/{index}.jpg",
+        "main_photo_id": 500000 + index,
+        "badges": [],
+        "block_ids": [f"{100000 + index}01_1_2_0", f"{100000 + index}02_1_2_0"],
+        "matching_units_configuration": {"matching_units_common_config": {"unit_type_id": 9}},
+        "composite_price_breakdown": {
+            "items": [
+                {
+                    "kind": "charge",
+                    "name": "Goods & services tax",
+                    "inclusion_type": "excluded",
+                    "details": "12 % VAT",
+                    "base": {"kind": "percentage", "base_amount": 12.0},
+                    "item_amount": _amount(price * 0.12),
+                }
+            ],
+            "gross_amount": _amount(price * 2),
+            "gross_amount_hotel_currency": _amount(price * 2),
+            "gross_amount_per_night": _amount(price),
+            "net_amount": _amount(price * 1.76),
+            "excluded_amount": _amount(price * 0.24),
+            "included_taxes_and_charges_amount": _amount(0.0),
+            "all_inclusive_amount": _amount(price * 2.24),
+            "all_inclusive_amount_hotel_currency": _amount(price * 2.24),
+            "strikethrough_amount": _amount(price * 2.5),
+            "strikethrough_amount_per_night": _amount(price * 1.25),
+            "discounted_amount": _amount(price * 0.5),
+            "price_display_config": [{"key": "PD_INCLUDE_TAXES", "value": 1}],
+            "benefits": [
+                {
+                    "details": "You're getting a reduced rate because this property is offering a discount.",
+                    "badge_variant": "constructive",
+                    "kind": "badge",
+                    "name": "Limited-time Deal",
+                    "identifier": "limited-time-deal",
+                    "icon": None,
+                }
+            ],
+            "charges_details": {
+                "mode": "extra_charges",
+                "amount": _amount(price * 0.24),
+                "translated_copy": "+₹840 taxes and charges",
+            },
+            "has_long_stays_weekly_rate_price": False,
+            "has_long_stays_monthly_rate_price": False,
+        },
+        "price_breakdown": {"gross_price": price * 2, "currency": "INR", "has_tax_exceptions": 0},
+        "bwallet": {"hotel_eligibility": 0},
+        "native_ads_cpc": 0,
+        "native_ads_tracking": "",
+        "native_ad_id": "",
+        "default_wishlist_name": "Goa",
+        "wishlist_count": 0,
+        "genius_discount_percentage": 0,
+        "in_best_district": 0,
+        "ufi": -2103041,
+        "is_geo_rate": "",
+        "preferred": 0,
+        "preferred_plus": 0,
+        "is_genius_deal": 0,
+        "is_mobile_deal": 0,
+        "is_smart_deal": 0,
+        "is_no_prepayment_block": 1,
+        "is_free_cancellable": 1,
+        "is_beach_front": 0,
+        "is_city_center": 0,
+        "is_tpi_exclusive_property": 0,
+        "mobile_discount_percentage": 0,
+        "property_cribs_availability": 1,
+        "children_not_allowed": 0,
+        "crib_guaranteed": 0,
+        "has_free_parking": 1,
+        "hotel_include_breakfast": 0,
+        "hotel_has_vb_boost": 0,
+        "soldout": 0,
+        "cant_book": 0,
+        "cc_required": 1,
+        "price_is_final": 0,
+        "extended": 0,
+        "urgency_room_msg": None,
+    }
+
+
+def sample_search_page(size: int = 20, offset: int = 0) -> dict:
+    return {
+        "primary_count": size,
+        "count": size,
+        "unfiltered_count": size,
+        "result": [sample_hotel(offset + index) for index in range(size)],
+    }
+
+
+def sample_location(name: str, index: int = 0) -> dict:
+    return {
+        "dest_id": str(-2103041 - index),
+        "dest_type": "city",
+        "type": "ci",
+        "city_ufi": -2103041 - index,
+        "name": name if not index else f"{name} {index}",
+        "city_name": name,
+        "label": f"{name}, India" if not index else f"{name} {index}, {name}, India",
+        "region": name,
+        "country": "India",
+        "cc1": "in",
+        "lc": "en",
+        "rtl": 0,
+        "hotels": 4000 - 100 * index,
+        "nr_hotels": 4000 - 100 * index,
+        "latitude": 15.5 + index / 100,
+        "longitude": 73.8 + index / 100,
+        "timezone": "Asia/Kolkata",
+        "image_url": "https://cf.bstatic.com/xdata/images/city/150x150/684765.jpg",
+        "roundtrip": "GgxkZXN0X2lkOi0yMTAzMDQx",
+        "b_max_los_data": {"max_allowed_los": 90, "is_fullon": 0, "default_los": 45, "has_extended_los": 1},
+    }
+
+
+def sample_review(index: int, hotel_id: int) -> dict:
+    return {
+        "review_id": 900000000 + index,
+        "review_hash": f"{hotel_id:x}{index:08x}",
+        "hotel_id": hotel_id,
+        "hotelier_name": f"Sample Hotel {hotel_id - 100000}",
+        "title": "Lovely stay close to the beach",
+        "pros": "Friendly staff, clean rooms and a great breakfast spread.",
+        "cons": "The pool area gets crowded in the afternoon." if index % 3 else None,
+        "average_score": 6.0 + (index % 9) / 2,
+        # Newest first, like the most recent sort order
+        "date": f"{date(2025, 12, 31) - timedelta(days=2 * index)} 10:{index % 60:02d}:00",
+        "languagecode": ("en-gb", "de", "fr")[index % 3],
+        "countrycode": ("in", "gb", "de", "fr")[index % 4],
+        "travel_purpose": "leisure" if index % 5 else "business",
+        "tags": ["Leisure trip", "Couple", "Deluxe Double Room", "Stayed 2 nights"],
+        "stayed_room_info": {
+            "room_id": 10000001 + index % 3,
+            "room_name": "Deluxe Double Room",
+            "checkin": "2024-12-01",
+            "checkout": "2024-12-03",
+            "num_nights": 2,
+            "photo": {
+                "url_original": "https://cf.bstatic.com/xdata/images/hotel/max500/1.jpg",
+                "url_square60": "https://cf.bstatic.com/xdata/images/hotel/square60/1.jpg",
+            },
+        },
+        "author": {"name": "Guest", "type_string": "Couple", "countrycode": "in", "user_id": index},
+        "reviewer_photos": [],
+        "user_new_badges": [],
+        "helpful_vote_count": index % 4,
+        "hotelier_response": "",
+        "hotelier_response_date": None,
+        "anonymous": "false",
+        "is_incentivised": 0,
+        "is_moderated": 1,
+        "is_trivial": 0,
+        "reviewng": 0,
+    }
+
+
+def sample_reviews_page(hotel_id: int, page: int = 0, size: int = 25, total: int = 75) -> dict:
+    start = page * size
+    return {
+        "count": total,
+        "sort_options": [{"id": "sort_most_relevant", "name": "Most relevant"}],
+        "result": [sample_review(index, hotel_id) for index in range(start, min(start + size, total))],
+    }
+
+
+def sample_review_scores(hotel_id: int) -> dict:
+    questions = ("hotel_staff", "hotel_services", "hotel_clean", "hotel_comfort", "hotel_value", "hotel_location")
+    return {
+        "score_breakdown": [
+            {
+                "customer_type": "total",
+                "count": 100 + hotel_id % 900,
+                "average_score": 8.4,
+                "question": [
+                    {"question": question, "score": 7.8 + index / 10, "count": 100 + hotel_id % 900}
+                    for index, question in enumerate(questions)
+                ],
+            }
+        ],
+        "score_distribution": [{"score_word": str(score), "count": 10 * score} for score in range(1, 11)],
+        "score_percentage": [{"score_word": str(score), "percent": 10} for score in range(1, 11)],
+    }
+
+
+def sample_description(hotel_id: int) -> list[dict]:
+    return [
+        {
+            "descriptiontype_id": 6,
+            "languagecode": "en-gb",
+            "description": (
+                f"Sample Hotel {hotel_id - 100000} is set a short walk from the beach and offers an "
+                "outdoor pool, a garden and free WiFi. Every room comes with air conditioning."
+            ),
+        }
+    ]
+
+
+def sample_facilities(hotel_id: int) -> list[dict]:
+    names = ("Free WiFi", "Outdoor pool", "Airport shuttle", "Restaurant", "Fitness centre", "Free parking")
+    categories = ("Internet", "Pool and wellness", "Transport", "Food & Drink", "Activities", "Parking")
+    return [
+        {"hotel_id": hotel_id, "facility_name": name, "facilitytype_name": category, "hotelfacilitytype_id": index}
+        for index, (name, category) in enumerate(zip(names, categories))
+    ]
+
+
+def sample_photos(hotel_id: int, count: int = 30) -> list[dict]:
+    return [
+        {
+            "photo_id": 500000 + index,
+            "url_square60": f"https://cf.bstatic.com/xdata/images/hotel/square60/{hotel_id}-{index}.jpg",
+            "url_max": f"https://cf.bstatic.com/xdata/images/hotel/max1280x900/{hotel_id}-{index}.jpg",
+            "url_1440": f"https://cf.bstatic.com/xdata/images/hotel/1440x1440/{hotel_id}-{index}.jpg",
+            "url_max300": f"https://cf.bstatic.com/xdata/images/hotel/max300/{hotel_id}-{index}.jpg",
+            "url_640x200": f"https://cf.bstatic.com/xdata/images/hotel/640x200/{hotel_id}-{index}.jpg",
+            "tags": [{"id": index % 7, "tag": ("Property building", "Pool", "Bedroom", "Bathroom")[index % 4]}],
+        }
+        for index in range(count)
+    ]
+
+
+def sample_room_list(hotel_id: int) -> list[dict]:
+    blocks = []
+    for index, name in enumerate(("Standard Double Room", "Deluxe Double Room", "Family Suite")):
+        price = 3500.0 + 1500 * index
+        blocks.append(
+            {
+                "block_id": f"{hotel_id}0{index}_1_2_0",
+                "room_id": hotel_id * 100 + index,
+                "room_name": name,
+                "name_without_policy": name,
+                "max_occupancy": 2 + index,
+                "refundable": index != 0,
+                "breakfast_included": index == 2,
+                "product_price_breakdown": {
+                    "gross_amount_per_night": _amount(price),
+                    "gross_amount": _amount(price * 2),
+                    "all_inclusive_amount": _amount(price * 2.24),
+                },
+            }
+        )
+    return [{"hotel_id": hotel_id, "block": blocks, "rooms": {}}]
@@ -4,7 +4,14 @@ from .hotel import Hotel, HotelData
 from .review import HotelReview
 from .booking_error import BookingError
 from .destination_type import DestinationType
-from .locations import Location
+from .locations import Location, LocationMatch
+from .batch import BatchItem
+from .dossier import DossierSection, Facility, HotelDossier, Photo, Room
+from .table import OutputFormat, ResultPage, Table
+from .review_summary import PhraseCount, ReviewSummary
+from .nearby import NearbyHotel
+from .flexible_dates import DateWindowPrice, PriceMatrix
+from .destination_summary import DestinationSummary
 
 _all__ = [
     "Hotel",
@@ -12,5 +19,21 @@ _all__ = [
     "HotelReview",
     "BookingError", 
     "DestinationType",
-    "Location"
+    "Location",
+    "LocationMatch",
+    "BatchItem",
+    "DossierSection",
+    "Facility",
+    "HotelDossier",
+    "Photo",
+    "Room",
+    "OutputFormat",
+    "ResultPage",
+    "Table",
+    "PhraseCount",
+    "ReviewSummary",
+    "NearbyHotel",
+    "DateWindowPrice",
+    "PriceMatrix",
+    "DestinationSummary",
 ]
\ No newline at end of file
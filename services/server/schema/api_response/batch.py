@@ -0,0 +1,10 @@
+from pydantic import BaseModel, Field
+from typing import Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class BatchItem(BaseModel, Generic[T]):
+    ok: bool = Field(..., description="Whether the data for this item could be fetched")
+    result: Optional[T] = Field(None, description="The fetched data if successful")
+    error: Optional[str] = Field(None, description="Reason of the failure if unsuccessful")
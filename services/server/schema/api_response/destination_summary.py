@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+from .table import Table
+
+
+class DestinationSummary(BaseModel):
+    dest_id: str = Field(..., description="Internal ID of the destination searched")
+    dest_type: str = Field(..., description="Type of the destination searched")
+    label: Optional[str] = Field(None, description="Full name of the destination, when resolved from a name")
+    hotels: int = Field(0, description="Number of available hotels passing the filters with a price")
+    currency: Optional[str] = Field(None, description="Currency of the prices")
+    price_per_night: dict[str, float] = Field(
+        default_factory=dict, description="Percentiles of the price per night: p10, p25, p50, p75 and p90"
+    )
+    top_hotels: Optional[Table] = Field(None, description="The best reviewed of these hotels, by their Bayesian review score")
@@ -0,0 +1,39 @@
+from enum import StrEnum
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class DossierSection(StrEnum):
+    DESCRIPTION = "description"
+    FACILITIES = "facilities"
+    PHOTOS = "photos"
+    ROOMS = "rooms"
+
+
+class Facility(BaseModel):
+    name: str = Field(..., description="Name of the facility")
+    category: Optional[str] = Field(None, description="Category the facility belongs to")
+
+
+class Photo(BaseModel):
+    thumbnail_url: str = Field(..., description="URL of a small version of the photo")
+    tags: list[str] = Field([], description="Tags describing what the photo shows")
+
+
+class Room(BaseModel):
+    room_id: int = Field(..., description="The unique identifier for the room")
+    name: str = Field(..., description="Name of the room")
+    max_occupancy: Optional[int] = Field(None, description="Maximum number of guests in the room")
+    price_per_night: Optional[float] = Field(None, description="Gross price per night for the stay")
+    currency: Optional[str] = Field(None, description="Currency of the price")
+    refundable: Optional[bool] = Field(None, description="Whether the booking can be cancelled for free")
+    breakfast_included: Optional[bool] = Field(None, description="Whether breakfast is included")
+
+
+class HotelDossier(BaseModel):
+    hotel_id: str = Field(..., description="Hotel ID")
+    description: Optional[str] = Field(None, description="Description of the hotel")
+    facilities: Optional[list[Facility]] = Field(None, description="Facilities offered by the hotel")
+    photos: Optional[list[Photo]] = Field(None, description="Photos of the hotel")
+    rooms: Optional[list[Room]] = Field(None, description="Rooms available for the requested stay")
+    errors: dict[str, str] = Field({}, description="Sections which could not be fetched with the reason")
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+from .table import Table
+
+
+class DateWindowPrice(BaseModel):
+    checkin_date: str = Field(..., description="Check-in date of the window in YYYY-MM-DD format")
+    checkout_date: str = Field(..., description="Check-out date of the window in YYYY-MM-DD format")
+    hotels: int = Field(0, description="Number of available hotels passing the filters with a price")
+    min_price_per_night: Optional[float] = Field(None, description="Lowest price per night among them")
+    median_price_per_night: Optional[float] = Field(None, description="Median price per night among them")
+    cheapest_hotel_id: Optional[int] = Field(None, description="ID of the hotel with the lowest price per night")
+    cheapest_hotel_name: Optional[str] = Field(None, description="Name of the hotel with the lowest price per night")
+    error: Optional[str] = Field(None, description="Reason the window couldn't be searched")
+
+
+class PriceMatrix(BaseModel):
+    nights: int = Field(..., description="Length of the stay of every window")
+    currency: Optional[str] = Field(None, description="Currency of the prices")
+    cheapest: Optional[DateWindowPrice] = Field(
+        None, description="The window with the lowest price per night, none if no window has a price"
+    )
+    windows: Table = Field(..., description="Prices of every check-in window, in date order")
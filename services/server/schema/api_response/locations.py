@@ -1,7 +1,15 @@
 from pydantic import BaseModel, Field, field_validator
 from typing import Optional
+from functools import cache
 from zoneinfo import available_timezones
 
+
+@cache
+def _timezones() -> frozenset[str]:
+    # available_timezones() walks the tzdata directories on every call
+    return frozenset(available_timezones())
+
+
 class Location(BaseModel):
     city_ufi: Optional[int] = Field(None, description="Unique identifier for the city")
     label: str = Field(..., description="Full name of the city or landmark including the region, state and country")
@@ -24,6 +32,17 @@ class Location(BaseModel):
 
     @field_validator('timezone')
     def validate_timezone(cls, value):
-        if value not in available_timezones():
-            raise ValueError(f"Invalid timezone provided. Expected one of {available_timezones()}, found {value}")
-        return value
\ No newline at end of file
+        if value not in _timezones():
+            raise ValueError(f"Invalid timezone provided. Expected one of {set(_timezones())}, found {value}")
+        return value
+
+class LocationMatch(BaseModel):
+    dest_id: str = Field(..., description="Unique identifier for the destination")
+    dest_type: str = Field(..., description="Type of destination")
+    name: str = Field(..., description="Name of the city or landmark")
+    label: str = Field(..., description="Full name of the city or landmark including the region, state and country")
+    latitude: float = Field(..., description="Latitude of the location")
+    longitude: float = Field(..., description="Longitude of the location")
+    matched: str = Field(..., description="The known name or alias the place was matched to")
+    confidence: float = Field(..., description="How closely the place matched the known name, from 0 to 1")
+    source: str = Field(..., description="`index` when resolved locally, `api` when looked up upstream")
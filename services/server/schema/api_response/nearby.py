@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+
+from .hotel import Hotel
+
+
+class NearbyHotel(BaseModel):
+    distance_km: float = Field(..., description="Straight line distance from the reference point in km")
+    hotel: Hotel = Field(..., description="The hotel")
@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class PhraseCount(BaseModel):
+    phrase: str = Field(..., description="The tag or phrase")
+    count: int = Field(..., description="Number of reviews mentioning it")
+
+
+class ReviewSummary(BaseModel):
+    hotel_id: str = Field(..., description="Hotel ID")
+    review_count: int = Field(..., description="Number of reviews the summary is computed from")
+    average_score: Optional[float] = Field(None, description="Mean review score out of 10")
+    recency_weighted_score: Optional[float] = Field(
+        None, description="Mean review score out of 10 with recent reviews weighing more"
+    )
+    score_distribution: dict[str, int] = Field({}, description="Number of reviews per whole score from 1 to 10")
+    travel_purpose: dict[str, float] = Field({}, description="Share of reviews per purpose of travel")
+    top_tags: list[PhraseCount] = Field([], description="Most frequent review tags, e.g. type of traveller")
+    top_pros: list[PhraseCount] = Field([], description="Most frequent phrases in the pros")
+    top_cons: list[PhraseCount] = Field([], description="Most frequent phrases in the cons")
+    newest_review: Optional[str] = Field(None, description="Date of the newest review")
+    oldest_review: Optional[str] = Field(None, description="Date of the oldest review")
@@ -0,0 +1,25 @@
+from enum import StrEnum
+from pydantic import BaseModel, Field
+from typing import Any, Optional
+
+
+class OutputFormat(StrEnum):
+    JSON = "json"
+    TABLE = "table"
+    # Full result kept server-side, the first page returned as a table along with its handle
+    HANDLE = "handle"
+
+
+class Table(BaseModel):
+    columns: list[str] = Field(..., description="Column names, in the order of the values of every row")
+    rows: list[list[Any]] = Field(..., description="One row of values per record")
+
+
+class ResultPage(BaseModel):
+    handle: str = Field(..., description="Handle of the full result, to read further pages with `_page_results`")
+    total: int = Field(..., description="Number of records in the full result")
+    offset: int = Field(..., description="Position of the first record of this page in the full result")
+    next_offset: Optional[int] = Field(None, description="Offset of the next page, none after the last page")
+    expires_in: int = Field(..., description="Seconds the handle stays valid")
+    table: Optional[Table] = Field(None, description="The records of this page as a table")
+    items: Optional[list[dict[str, Any]]] = Field(None, description="The records of this page as objects")
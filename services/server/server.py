@@ -1,8 +1,6 @@
 import sys
 import os
 
-from typing import Set
-
 # Add the parent directory to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
@@ -11,22 +9,145 @@ sys.path.append(os.path.dirname(__file__))
 
 from datetime import datetime
 from shared.schema.sorting_methods import SortingMethods
-from fastmcp import FastMCP
+from fastmcp import Context, FastMCP
 import subprocess
-import requests
-from datetime import date
-from services.server.schema.api_response import BookingError, HotelReview, Hotel, DestinationType, Location
-from typing import Annotated, Optional
+import asyncio
+import shutil
+import time
+import signal
+import math
+import httpx
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+from services.server.schema.api_response import BookingError, HotelReview, Hotel, DestinationType, Location, LocationMatch, BatchItem, DossierSection, HotelDossier, OutputFormat, Table, ReviewSummary, NearbyHotel, ResultPage, DateWindowPrice, PriceMatrix, DestinationSummary
+from services.server.upstream import booking_client, Priority
+from services.server.cache import location_cache, location_index, search_cache, canonical_key, result_store, review_store
+from services.server.cache.results import RESULT_KINDS, StoredResult
+from services.server.cache.reviews import matches_language
+from services.server.cache.store import DEFAULT_CACHE_DIR
+from services.server.decoding import LOCATION_DECODER, HOTEL_DECODER, REVIEW_DECODER, DecodedPage, phase_timings
+from services.server.encoding import DATE_WINDOW_TABLE, HOTEL_TABLE, NEARBY_HOTEL_TABLE, REVIEW_TABLE, TableEncoder
+from services.server.analysis import REVIEW_SORTING_METHODS, HotelFilter, HotelFrame, frame_cache, price_percentiles, priced, summarize_reviews, window_prices
+from services.server.metrics import ToolMetrics, registry
+from services.server.decoding.dossier import project_description, project_facilities, project_photos, project_rooms
+from typing import Annotated, Any, Awaitable, Callable, Literal, Optional
 from pydantic import Field, BaseModel, field_validator, model_validator
-from jsonschema import validate
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
 import os
 
-base_url = "https://booking-com.p.rapidapi.com/v1"
-headers = {
-    "x-rapidapi-key": os.getenv("RAPID_BOOKING_API_KEY"),
-    "x-rapidapi-host": "booking-com.p.rapidapi.com",
-}
-mcp = FastMCP("MyServer")
+
+# Whether this process takes new tool calls, cleared as soon as it is asked to stop
+_ready = False
+
+
+def _drain_on(signum: int):
+    """Report not ready as soon as `signum` arrives, then let the server handle it as before."""
+    previous = signal.getsignal(signum)
+
+    def handler(received, frame):
+        global _ready
+        _ready = False
+        if callable(previous):
+            previous(received, frame)
+
+    try:
+        signal.signal(signum, handler)
+    except ValueError:
+        # Not the main thread, e.g. an in-process test client
+        pass
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    global _ready
+    _drain_on(signal.SIGTERM)
+    _drain_on(signal.SIGINT)
+    _ready = True
+    sharing = asyncio.create_task(registry.share_periodically()) if registry.directory else None
+    try:
+        yield
+    finally:
+        _ready = False
+        # Release the pooled upstream connections on shutdown
+        await booking_client.aclose()
+        location_index.flush()
+        if sharing is not None:
+            sharing.cancel()
+            registry.share()
+
+
+mcp = FastMCP("MyServer", lifespan=lifespan)
+mcp.add_middleware(ToolMetrics())
+
+# Hotels returned per /hotels/search page and pages fetched concurrently
+SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", 20))
+SEARCH_PAGE_CONCURRENCY = int(os.getenv("SEARCH_PAGE_CONCURRENCY", 3))
+# Hotels accepted by one batch tool call and upstream calls made concurrently for it
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", 25))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 5))
+# Reviews returned per /hotels/reviews page, and the most pages and reviews one call collecting reviews reads
+REVIEW_PAGE_SIZE = int(os.getenv("REVIEW_PAGE_SIZE", 25))
+REVIEW_MAX_PAGES = int(os.getenv("REVIEW_MAX_PAGES", 40))
+# Pages read per page of wanted reviews when only some languages are kept
+REVIEW_LANGUAGE_PAGES = int(os.getenv("REVIEW_LANGUAGE_PAGES", 4))
+MAX_COLLECTED_REVIEWS = int(os.getenv("MAX_COLLECTED_REVIEWS", 500))
+# Hotels fetched for a search the ranking tool filters and sorts locally
+RANKING_SUPERSET_SIZE = int(os.getenv("RANKING_SUPERSET_SIZE", 100))
+# Check-in dates one flexible dates search may try and searches run concurrently for it
+MAX_FLEXIBLE_DATE_WINDOWS = int(os.getenv("MAX_FLEXIBLE_DATE_WINDOWS", 31))
+FLEXIBLE_DATES_CONCURRENCY = int(os.getenv("FLEXIBLE_DATES_CONCURRENCY", 4))
+# Destinations one batch search compares
+MAX_BATCH_DESTINATIONS = int(os.getenv("MAX_BATCH_DESTINATIONS", 10))
+# Records returned by default and at most per page of a stored result
+RESULT_PAGE_SIZE = int(os.getenv("RESULT_PAGE_SIZE", 10))
+MAX_RESULT_PAGE_SIZE = int(os.getenv("MAX_RESULT_PAGE_SIZE", 100))
+
+# Tables the pages of every kind of stored result are encoded with
+RESULT_TABLES = {"hotels": HOTEL_TABLE, "nearby_hotels": NEARBY_HOTEL_TABLE, "reviews": REVIEW_TABLE}
+
+
+def _result_page(
+    handle: str,
+    result: StoredResult,
+    offset: int,
+    limit: int,
+    fields: Optional[list[str]] = None,
+    output_format: OutputFormat = OutputFormat.TABLE,
+) -> ResultPage:
+    items = result.items[offset : offset + limit]
+    end = offset + len(items)
+    page = ResultPage(
+        handle=handle,
+        total=len(result.items),
+        offset=offset,
+        next_offset=end if end < len(result.items) else None,
+        expires_in=max(int(result.expires_at - time.time()), 0),
+    )
+    if output_format == OutputFormat.JSON:
+        model = RESULT_KINDS[result.kind]
+        unknown = [field for field in fields or () if field not in model.model_fields]
+        if unknown:
+            raise ValueError(f"Unknown fields {unknown}, available: {list(model.model_fields)}")
+        include = set(fields) if fields else None
+        page.items = [
+            item.model_dump(mode="json", by_alias=True, exclude_none=True, include=include)
+            for item in items
+        ]
+    else:
+        encoder = RESULT_TABLES[result.kind]
+        page.table = (encoder.select(fields) if fields else encoder).encode(items)
+    return page
+
+
+def _formatted(kind: str, items: list, output_format: OutputFormat) -> list | Table | ResultPage:
+    """A tool result in the requested output format, stored for paging in handle mode."""
+    if output_format == OutputFormat.HANDLE:
+        handle, result = result_store.put(kind, items)
+        return _result_page(handle, result, 0, RESULT_PAGE_SIZE)
+    if output_format == OutputFormat.TABLE:
+        return RESULT_TABLES[kind].encode(items)
+    return items
 
 
 # @mcp.tool
@@ -72,7 +193,7 @@ def run_command_advanced(command, shell=False):
 
 
 @mcp.tool
-def _fetch_locations(place: str) -> list[Location]:
+async def _fetch_locations(place: str) -> list[Location]:
     """Fetch locations which have similar names to the given place name.
     This is a useful tool to get destination id along with other information
     about the locations with similar names.
@@ -84,25 +205,67 @@ def _fetch_locations(place: str) -> list[Location]:
         dict: JSON response containing the locations.
     """
 
-    url = f"{base_url}/hotels/locations"
+    path = "/hotels/locations"
 
     querystring = {"name": place, "locale": "en-gb"}
 
-    response = requests.get(url, headers=headers, params=querystring)
+    # Place to dest_id mappings hardly ever change, serve them locally when possible
+    cached = location_cache.get(place, querystring["locale"])
+    if cached is not None:
+        return cached
+
+    # Spelling variants and aliases of a place fetched before map to its cached list
+    hit = location_index.lookup(place)
+    if hit is not None and hit.match.confidence >= location_index.min_confidence:
+        # The miss under `place` was counted above already
+        cached = location_cache.get(hit.query, querystring["locale"], count_miss=False)
+        if cached is not None:
+            return cached
+
+    response = await booking_client.get(path, querystring)
 
     response.raise_for_status()
-    result = []
-    for item in response.json():
-        item.pop("type")
-        item.pop("b_max_los_data", "")
-        item.pop("image_url", "")
-        item.pop("roundtrip", "")
-        item.pop("timezone", "")
-        item.pop("cc1", "")
-        result.append(Location(**item))
+    result = LOCATION_DECODER.decode(response.content)
+    location_cache.set(place, result, querystring["locale"])
+    location_index.add(place, result)
     return result
 
 
+@mcp.tool
+async def _resolve_destination(place: str) -> LocationMatch:
+    """Resolve a place name to the destination ID needed to search hotels.
+    Cheaper than `_fetch_locations` when only the best match is needed: places,
+    aliases and misspellings of places seen before are resolved locally, and the
+    upstream API is only called when no indexed name is a confident match.
+
+    Args:
+        place (str): The name of the place to resolve.
+
+    Returns:
+        dict: The best matching destination, the indexed name it matched, a
+        confidence between 0 and 1 and whether it came from the local index.
+    """
+    hit = location_index.lookup(place)
+    if hit is not None and hit.match.confidence >= location_index.min_confidence:
+        return hit.match
+
+    locations = await _fetch_locations.fn(place)
+    if not locations:
+        raise ValueError(f"No destination found for {place!r}")
+    best = locations[0]
+    return LocationMatch(
+        dest_id=best.dest_id,
+        dest_type=best.dest_type,
+        name=best.name,
+        label=best.label,
+        latitude=best.latitude,
+        longitude=best.longitude,
+        matched=place,
+        confidence=1.0,
+        source="api",
+    )
+
+
 class SearchArgs(BaseModel):
     checkin_date: str = Field(
         ..., description="Check-out date for the stay in YYYY-MM-DD format"
@@ -145,24 +308,94 @@ class SearchArgs(BaseModel):
         self.checkout_date = datetime.strptime(self.checkout_date, "%Y-%m-%d").date()
 
 
-@mcp.tool
-def _search_available_hotels(data: SearchArgs) -> list[Hotel] | BookingError:
-    """Fetch available stays for specified dates and parameters.
+async def _fetch_search_pages(querystring: dict, max_results: int) -> list[Hotel]:
+    """Fetch as many `/hotels/search` pages as `max_results` needs, a few at a time.
+
+    Pages are requested in order with at most `SEARCH_PAGE_CONCURRENCY` in flight.
+    No further pages are issued once the pages received so far hold `max_results`
+    hotels or a page comes back with fewer than `SEARCH_PAGE_SIZE` items.
 
     Args:
-       data: A collection of parameters useful for filtering the available hotels
+        querystring (dict): Query parameters of the search, without page number
+        max_results (int): The maximum number of stays to return
 
     Returns:
-        list[dict]: JSON response containing available stays.
+        list[Hotel]: Hotels in upstream order without duplicates
+    """
+    path = "/hotels/search"
+    num_pages = math.ceil(max_results / SEARCH_PAGE_SIZE)
+    semaphore = asyncio.Semaphore(SEARCH_PAGE_CONCURRENCY)
+    pages: dict[int, list[Hotel]] = {}
+    last_page = num_pages - 1
+
+    def collected() -> int:
+        # Only count contiguous pages, a later page can't make up for a missing one
+        count = 0
+        for page_number in range(num_pages):
+            if page_number not in pages:
+                break
+            count += len(pages[page_number])
+        return count
+
+    async def fetch_page(page_number: int):
+        nonlocal last_page
+        async with semaphore:
+            if page_number > last_page or collected() >= max_results:
+                return
+            page = await booking_client.get_page(
+                path, {**querystring, "page_number": str(page_number)}, HOTEL_DECODER
+            )
+        pages[page_number] = page.items
+        if page.scanned < SEARCH_PAGE_SIZE:
+            last_page = min(last_page, page_number)
+
+    await asyncio.gather(*(fetch_page(page_number) for page_number in range(num_pages)))
+
+    seen, result = set(), []
+    for page_number in sorted(pages):
+        if page_number > last_page:
+            break
+        for hotel in pages[page_number]:
+            if hotel.hotel_id not in seen:
+                seen.add(hotel.hotel_id)
+                result.append(hotel)
+    return result[:max_results]
+
+
+async def _fetch_search_results(querystring: dict, max_results: int) -> list[Hotel] | BookingError:
+    """Query `/hotels/search` and validate the hotels of the returned page(s).
 
+    Args:
+        querystring (dict): Query parameters of the search
+        max_results (int): The maximum number of stays to return
+
+    Returns:
+        list[Hotel] | BookingError: Validated hotels or the error reported upstream
     """
+    path = "/hotels/search"
+
+    try:
+        if max_results > SEARCH_PAGE_SIZE:
+            return await _fetch_search_pages(querystring, max_results)
+        # Stops reading the page once `max_results` hotels with prices are collected
+        return await booking_client.get_items(
+            path, querystring, HOTEL_DECODER, limit=max_results
+        )
+    except httpx.HTTPStatusError as err:
+        if err.response.status_code == 422:
+            return BookingError.model_validate_json(err.response.content)
+        raise
+    except ValueError as e:
+        return BookingError(detail=e)
+
 
+def _search_querystring(data: SearchArgs) -> dict:
+    """Query parameters of `/hotels/search` for the stay described by `data`."""
     assert (
         data.checkout_date > data.checkin_date
     ), "Check-out date should be more than check-in date. Without checking in, check-out is not allowed"
-    url = f"{base_url}/hotels/search"
 
-    querystring = {
+    return {
         "adults_number": data.num_adults,
         "children_number": data.num_children,
         "units": "metric",
@@ -180,70 +413,334 @@ def _search_available_hotels(data: SearchArgs) -> list[Hotel] | BookingError:
         "locale": "en-gb",
     }
 
-    try:
-        response = requests.get(url, headers=headers, params=querystring)
-
-        response.raise_for_status()
-        response = response.json()
-    except requests.HTTPError as err:
-        if response.status_code == 422:
-            return BookingError(**response.json())
-
-    response = response.get("result", [])[: data.max_results]
-
-    # Define a set of keys to remove
-    keys_to_remove: Set[str] = {
-        "review_nr",
-        "review_score",
-        "selected_review_topic",
-        "review_recommendation",
-        "review_score_word",
-        "max_photo_url",
-        "max_1440_photo_url",
-        "native_ads_tracking",
-        "native_ads_cpc",
-        "block_ids",
-        "in_best_district",
-        "ufi",
-        "timezone",
-        "bwallet",
-        "native_ad_id",
-        "default_wishlist_name",
-        "selected_review_topic",
-        "class_is_estimated",
-        "main_photo_id",
-        "wishlist_count",
-        "genius_discount_percentage",
-    }
 
-    # Remove the keys for each item in the response
-    for item in response:
-        for key in keys_to_remove:
-            item.pop(key, None)
-
-        # Remove specific nested keys
-        if "composite_price_breakdown" in item:
-            breakdown = item["composite_price_breakdown"]
-            breakdown.pop("benefits", None)
-            breakdown.pop("price_display_config", None)
-            breakdown.pop("strikethrough_amount", None)
-            breakdown.pop("all_inclusive_amount_hotel_currency", None)
-            breakdown.pop("all_inclusive_amount", None)
-            breakdown.pop("price_breakdown", None)
+@mcp.tool
+async def _search_available_hotels(
+    data: SearchArgs, output_format: OutputFormat = OutputFormat.JSON
+) -> list[Hotel] | Table | ResultPage | BookingError:
+    """Fetch available stays for specified dates and parameters.
 
-    try:
-        _ = []
-        for item in response:
-            result = validate(item, Hotel.model_json_schema(mode="serialization"))
-            if "composite_price_breakdown" in item:
-                _.append(Hotel(**item))
-        return _
-    except Exception as e:
-        return BookingError(detail=e)
+    Args:
+       data: A collection of parameters useful for filtering the available hotels
+       output_format: `json` for full hotel objects, `table` for column names plus one row
+           per hotel with only the fields needed to compare stays, using far fewer tokens,
+           `handle` to keep the full result server-side and only get its first page as a
+           table plus a handle to read the rest with `_page_results`
+
+    Returns:
+        list[dict]: JSON response containing available stays.
+
+    """
+    querystring = _search_querystring(data)
+
+    # Rephrased questions and agent retries repeat the exact same search
+    result = await search_cache.get_or_fetch(
+        canonical_key(querystring),
+        data.checkin_date,
+        data.max_results,
+        lambda max_results: _fetch_search_results(querystring, max_results),
+    )
+    if isinstance(result, BookingError):
+        return result
+    return _formatted("hotels", result, output_format)
+
+
+async def _search_frame(data: SearchArgs) -> HotelFrame | BookingError:
+    """Columns of the hotel superset of a search, fetched through the search cache."""
+    querystring = _search_querystring(data)
+    key = canonical_key(querystring)
+    superset = max(RANKING_SUPERSET_SIZE, data.max_results)
+
+    # Same key as the plain search, so either tool can serve the other's results
+    result = await search_cache.get_or_fetch(
+        key,
+        data.checkin_date,
+        superset,
+        lambda max_results: _fetch_search_results(querystring, max_results),
+    )
+    if isinstance(result, BookingError):
+        return result
+    return frame_cache.get(key, result)
+
+
+@mcp.tool
+async def _rank_hotels(
+    data: SearchArgs,
+    filters: Optional[HotelFilter] = None,
+    sort_by: Optional[list[SortingMethods]] = None,
+    output_format: OutputFormat = OutputFormat.JSON,
+) -> list[Hotel] | Table | ResultPage | BookingError:
+    """Filter and re-rank the available stays for the given dates and parameters.
+    Use this instead of `_search_available_hotels` to ask for stays by price, score,
+    stars or distance ("cheapest 4-star under 6000 per night within 2 km"), or to
+    re-sort results already seen: the hotels of the search are fetched once and
+    every later filter or sort of the same search is answered locally.
+
+    Args:
+       data: The stay to search, `max_results` is the number of hotels to return
+       filters: Bounds and flags the hotels must satisfy
+       sort_by: Sorting methods applied in turn, later ones break the ties of
+           earlier ones. Defaults to popularity. The recency methods sort reviews
+           and are rejected here
+       output_format: `json` for full hotel objects, `table` for column names plus one row
+           per hotel with only the fields needed to compare stays, using far fewer tokens,
+           `handle` to keep the full result server-side and only get its first page as a
+           table plus a handle to read the rest with `_page_results`
+
+    Returns:
+        list[dict]: The matching stays in ranked order.
+    """
+    sort_by = sort_by or [SortingMethods.POPULARITY]
+    # Checked before the search is fetched for nothing
+    for method in sort_by:
+        if method in REVIEW_SORTING_METHODS:
+            raise ValueError(f"{method.name} sorts reviews, not hotels")
+    frame = await _search_frame(data)
+    if isinstance(frame, BookingError):
+        return frame
+
+    ranked = frame.rank(filters, sort_by, data.max_results)
+    return _formatted("hotels", ranked, output_format)
+
+
+Weekday = Literal["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+WEEKDAYS: tuple[Weekday, ...] = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
 
 
 @mcp.tool
-def _fetch_review_scores(hotel_id: str):
+async def _search_flexible_dates(
+    data: SearchArgs,
+    latest_checkin_date: date,
+    nights: Optional[Annotated[int, Field(ge=1, le=30)]] = None,
+    checkin_weekdays: Optional[list[Weekday]] = None,
+    filters: Optional[HotelFilter] = None,
+) -> PriceMatrix:
+    """Find the cheapest dates for a stay of fixed length within a range of check-in dates.
+    Use this for questions like "cheapest weekend in March" instead of searching every
+    date pair one by one: every check-in date is searched concurrently in one call and
+    only the lowest and median price per night of each is returned.
+
+    Args:
+       data: The stay to search, `checkin_date` is the earliest check-in date and
+           `max_results` the number of hotels priced per check-in date
+       latest_checkin_date: The latest check-in date to try
+       nights: Length of the stay, defaults to the nights between `checkin_date` and
+           `checkout_date`
+       checkin_weekdays: Only try check-ins on these days, e.g. ["fri", "sat"] for weekends
+       filters: Bounds and flags the priced hotels must satisfy
+
+    Returns:
+        dict: The cheapest window and one row of prices per check-in date.
+    """
+    nights = nights or (data.checkout_date - data.checkin_date).days
+    if nights < 1:
+        raise ValueError("Check-out date should be more than check-in date, or nights given")
+    checkins = [
+        data.checkin_date + timedelta(days=offset)
+        for offset in range((latest_checkin_date - data.checkin_date).days + 1)
+    ]
+    if checkin_weekdays:
+        checkins = [checkin for checkin in checkins if WEEKDAYS[checkin.weekday()] in checkin_weekdays]
+    if not checkins:
+        raise ValueError("No check-in date between checkin_date and latest_checkin_date matches")
+    if len(checkins) > MAX_FLEXIBLE_DATE_WINDOWS:
+        raise ValueError(
+            f"{len(checkins)} check-in dates to try, at most {MAX_FLEXIBLE_DATE_WINDOWS} are "
+            "searched at once: narrow the range or the weekdays"
+        )
+
+    semaphore = asyncio.Semaphore(FLEXIBLE_DATES_CONCURRENCY)
+    currencies = set()
+
+    async def price_window(checkin: date) -> DateWindowPrice:
+        checkout = checkin + timedelta(days=nights)
+        window = data.model_copy(update={"checkin_date": checkin, "checkout_date": checkout})
+        async with semaphore:
+            try:
+                # Through the search cache, so a window already searched costs nothing
+                result = await _search_available_hotels.fn(window)
+            except httpx.HTTPStatusError as e:
+                error = f"Upstream responded with HTTP {e.response.status_code}"
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            else:
+                if not isinstance(result, BookingError):
+                    currencies.update(hotel.currency_code for hotel in result)
+                    return window_prices(checkin, checkout, result, filters)
+                error = str(result.detail)
+        return DateWindowPrice(
+            checkin_date=checkin.isoformat(), checkout_date=checkout.isoformat(), error=error
+        )
+
+    windows = await asyncio.gather(*(price_window(checkin) for checkin in checkins))
+    priced = [window for window in windows if window.min_price_per_night is not None]
+    return PriceMatrix(
+        nights=nights,
+        currency=", ".join(sorted(currencies)) or None,
+        cheapest=min(priced, key=lambda window: window.min_price_per_night, default=None),
+        windows=DATE_WINDOW_TABLE.encode(windows),
+    )
+
+
+@mcp.tool
+async def _search_destinations_batch(
+    destinations: Annotated[list[str], Field(min_length=1, max_length=MAX_BATCH_DESTINATIONS)],
+    data: SearchArgs,
+    filters: Optional[HotelFilter] = None,
+    top: Annotated[int, Field(ge=0, le=10)] = 3,
+) -> dict[str, BatchItem[DestinationSummary]]:
+    """Compare the stays of several destinations for the same dates and occupancy.
+    Prefer this over resolving and searching every candidate destination one by one:
+    all of them are resolved and searched concurrently, and only a summary of each
+    is returned.
+
+    Args:
+       destinations: Names of the places, e.g. ["Goa", "Kochi"], or their destination IDs
+       data: The stay to search, its destination is ignored and `max_results` is the
+           number of hotels summarized per destination
+       filters: Bounds and flags the summarized hotels must satisfy
+       top: Number of best reviewed hotels listed per destination
+
+    Returns:
+        dict: Hotel count, price per night percentiles and best reviewed hotels, or the
+        error, per destination.
+    """
+
+    async def summarize(destination: str) -> DestinationSummary:
+        if destination.lstrip("-").isdigit():
+            dest_id, dest_type, label = destination, data.dest_type, None
+        else:
+            match = await _resolve_destination.fn(destination)
+            dest_id, dest_type, label = match.dest_id, match.dest_type, match.label
+        search = data.model_copy(update={"destination_id": dest_id, "dest_type": dest_type})
+        result = await _search_available_hotels.fn(search)
+        if isinstance(result, BookingError):
+            raise ValueError(str(result.detail))
+
+        frame = HotelFrame(result)
+        selected = priced(frame, filters)
+        ranked = frame.rank(filters, [SortingMethods.BAYESIAN_REVIEW_SCORE], top)
+        # Listed with the score they are ranked by, next to the review score and count it is based on
+        scores = {id(hotel): round(float(score), 2) for hotel, score in zip(frame.hotels, frame.bayesian_score)}
+        top_table = TableEncoder[Hotel](
+            {**HOTEL_TABLE.columns, "bayesian_review_score": lambda hotel: scores[id(hotel)]}
+        )
+        return DestinationSummary(
+            dest_id=dest_id,
+            dest_type=dest_type,
+            label=label,
+            hotels=len(selected),
+            currency=", ".join(sorted({hotel.currency_code for hotel in result})) or None,
+            price_per_night=price_percentiles(frame, selected),
+            top_hotels=top_table.encode(ranked) if top else None,
+        )
+
+    return await _gather_per_hotel(destinations, summarize)
+
+
+async def _reference_point(
+    landmark: Optional[str], latitude: Optional[float], longitude: Optional[float]
+) -> tuple[float, float]:
+    if latitude is not None and longitude is not None:
+        return latitude, longitude
+    if not landmark:
+        raise ValueError("Either a landmark or both latitude and longitude are needed")
+    match = await _resolve_destination.fn(landmark)
+    return match.latitude, match.longitude
+
+
+def _nearby(
+    frame: HotelFrame, positions, distances, output_format: OutputFormat
+) -> list[NearbyHotel] | Table | ResultPage:
+    nearby = [
+        NearbyHotel(distance_km=round(float(distance), 2), hotel=frame.hotels[position])
+        for position, distance in zip(positions, distances)
+    ]
+    return _formatted("nearby_hotels", nearby, output_format)
+
+
+@mcp.tool
+async def _find_hotels_within(
+    data: SearchArgs,
+    radius_km: float,
+    landmark: Optional[str] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    filters: Optional[HotelFilter] = None,
+    output_format: OutputFormat = OutputFormat.JSON,
+) -> list[NearbyHotel] | Table | ResultPage | BookingError:
+    """Find the available stays within a distance of a landmark or point, nearest first.
+    Answers "hotels within 1 km of Baga Beach" without map lookups: the landmark
+    is resolved like `_resolve_destination` and distances are computed locally
+    over the hotels of the search.
+
+    Args:
+       data: The stay to search, `max_results` is the most hotels to return
+       radius_km: Largest straight line distance from the reference point in km
+       landmark: Name of the landmark, city or area to measure from
+       latitude: Latitude of the reference point, instead of a landmark
+       longitude: Longitude of the reference point, instead of a landmark
+       filters: Bounds and flags the hotels must satisfy
+       output_format: `json` for full hotel objects, `table` for column names plus one row
+           per hotel with only the fields needed to compare stays, using far fewer tokens,
+           `handle` to keep the full result server-side and only get its first page as a
+           table plus a handle to read the rest with `_page_results`
+
+    Returns:
+        list[dict]: The stays inside the radius with their distance in km.
+    """
+    latitude, longitude = await _reference_point(landmark, latitude, longitude)
+    frame = await _search_frame(data)
+    if isinstance(frame, BookingError):
+        return frame
+
+    positions, distances = frame.geo.within(
+        latitude, longitude, radius_km, frame.mask(filters or HotelFilter())
+    )
+    return _nearby(frame, positions[: data.max_results], distances[: data.max_results], output_format)
+
+
+@mcp.tool
+async def _find_nearest_hotels(
+    data: SearchArgs,
+    landmark: Optional[str] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    filters: Optional[HotelFilter] = None,
+    output_format: OutputFormat = OutputFormat.JSON,
+) -> list[NearbyHotel] | Table | ResultPage | BookingError:
+    """Find the available stays nearest to a landmark or point.
+    Answers "the 5 closest hotels to the airport" without map lookups: the
+    landmark is resolved like `_resolve_destination` and distances are computed
+    locally over the hotels of the search.
+
+    Args:
+       data: The stay to search, `max_results` is the number of hotels to return
+       landmark: Name of the landmark, city or area to measure from
+       latitude: Latitude of the reference point, instead of a landmark
+       longitude: Longitude of the reference point, instead of a landmark
+       filters: Bounds and flags the hotels must satisfy
+       output_format: `json` for full hotel objects, `table` for column names plus one row
+           per hotel with only the fields needed to compare stays, using far fewer tokens,
+           `handle` to keep the full result server-side and only get its first page as a
+           table plus a handle to read the rest with `_page_results`
+
+    Returns:
+        list[dict]: The nearest stays with their distance in km, nearest first.
+    """
+    latitude, longitude = await _reference_point(landmark, latitude, longitude)
+    frame = await _search_frame(data)
+    if isinstance(frame, BookingError):
+        return frame
+
+    positions, distances = frame.geo.nearest(
+        latitude, longitude, data.max_results, frame.mask(filters or HotelFilter())
+    )
+    return _nearby(frame, positions, distances, output_format)
+
+
+@mcp.tool
+async def _fetch_review_scores(hotel_id: str):
     """Fetch review scores for a given hotel ID.
 
     Args:
@@ -252,18 +749,18 @@ def _fetch_review_scores(hotel_id: str):
     Returns:
         dict: JSON response containing review scores.
     """
-    url = f"{base_url}/hotels/review-scores"
+    path = "/hotels/review-scores"
 
     querystring = {"hotel_id": hotel_id, "locale": "en-gb"}
 
-    response = requests.get(url, headers=headers, params=querystring)
+    response = await booking_client.get(path, querystring, priority=Priority.ENRICHMENT)
 
     response.raise_for_status()
     return response.json()
 
 
 # @mcp.tool
-def _fetch_hotel_description(hotel_id: str):
+async def _fetch_hotel_description(hotel_id: str):
     """Fetch the description of a given hotel ID.
 
     Args:
@@ -272,18 +769,18 @@ def _fetch_hotel_description(hotel_id: str):
     Returns:
         dict: JSON response containing the hotel description.
     """
-    url = f"{base_url}/hotels/description"
+    path = "/hotels/description"
 
     querystring = {"locale": "en-gb", "hotel_id": hotel_id}
 
-    response = requests.get(url, headers=headers, params=querystring)
+    response = await booking_client.get(path, querystring, priority=Priority.ENRICHMENT)
 
     response.raise_for_status()
     return response.json()
 
 
 # @mcp.tool
-def _fetch_hotel_facilities(hotel_id: str):
+async def _fetch_hotel_facilities(hotel_id: str):
     """Fetch the facilities of a given hotel ID.
 
     Args:
@@ -292,56 +789,202 @@ def _fetch_hotel_facilities(hotel_id: str):
     Returns:
         dict: JSON response containing the hotel facilities.
     """
-    url = f"{base_url}/hotels/facilities"
+    path = "/hotels/facilities"
 
     querystring = {"locale": "en-gb", "hotel_id": hotel_id}
 
-    response = requests.get(url, headers=headers, params=querystring)
+    response = await booking_client.get(path, querystring, priority=Priority.ENRICHMENT)
 
     response.raise_for_status()
     return response.json()
 
 
 @mcp.tool
-def _fetch_hotel_reviews(hotel_id: str) -> list[HotelReview]:
-    """Fetch reviews for a given hotel ID.
+async def _fetch_hotel_reviews(
+    hotel_id: str, output_format: OutputFormat = OutputFormat.JSON
+) -> list[HotelReview] | Table | ResultPage:
+    """Fetch the most recent reviews for a given hotel ID, in English, German or French.
 
     Args:
         hotel_id (str): The ID of the hotel to fetch reviews for.
+        output_format (str): `json` for full review objects, `table` for column names plus
+            one row per review, using far fewer tokens, `handle` to keep the full result
+            server-side and only get its first page plus a handle for `_page_results`.
 
     Returns:
         dict: JSON response containing hotel reviews.
     """
-    url = f"{base_url}/hotels/reviews"
+    languages = ["en-gb", "de", "fr"]
+    await _sync_reviews(hotel_id, REVIEW_PAGE_SIZE, languages=languages)
+    reviews = review_store.reviews(hotel_id, REVIEW_PAGE_SIZE, languages=languages)
+    return _formatted("reviews", reviews, output_format)
 
-    querystring = {
-        "customer_type": "solo_traveller,review_category_group_of_friends",
-        "locale": "en-gb",
-        "language_filter": "en-gb,de,fr",
-        "page_number": "0",
-        "sort_type": "SORT_MOST_RELEVANT",
-        "hotel_id": hotel_id,
-    }
 
-    response = requests.get(url, headers=headers, params=querystring)
+async def _sync_reviews(
+    hotel_id: str,
+    wanted: int,
+    since: Optional[date] = None,
+    languages: Optional[list[str]] = None,
+    on_page: Optional[Callable[[int], Awaitable[None]]] = None,
+):
+    """Store the new reviews of a hotel, and older ones until `wanted` stored reviews match.
+
+    Pages are read newest first. Once the last sync of the hotel is older than the
+    sync interval of the store, pages are read from the first one until a page
+    holds a review which is stored already. Then, as long as fewer than `wanted`
+    stored reviews match the filters, pages are read from the one following the
+    stored reviews, up to the oldest review or, with `since`, the first older one.
+    The following page is requested before a page is stored whenever it looks
+    needed, so that its download overlaps with storing and progress reports.
+
+    Languages are filtered locally rather than with upstream's `language_filter`,
+    so that the store keeps the newest reviews in every language and serves any
+    later filter. Reading past the reviews in other languages costs pages though,
+    so for a language filter at most `REVIEW_LANGUAGE_PAGES` pages per page of
+    wanted reviews are read per call; the next call carries on from there.
 
-    response.raise_for_status()
-    response = response.json()
-    result = []
-    keys_to_remove = {"author", "pros_translated", "title_translated", "reviewer_photos", "cons_translated", "is_trivial"}
-    
-    for item in response.get("result", []):
-        # Remove non-essential information and specified keys
-        for key in keys_to_remove:
-            item.pop(key, None)
-        item.get("stayed_room_info", {}).pop("photo", None)
-
-        result.append(HotelReview(**item))
-    return result
+    Args:
+        hotel_id (str): The ID of the hotel
+        wanted (int): Number of matching reviews the caller needs
+        since (date): Reviews written before this date aren't needed
+        languages (list[str]): Language codes the caller keeps, e.g. `en` or `de`
+        on_page: Called with the number of pages read so far after every page
+    """
+    path = "/hotels/reviews"
+    querystring = {"locale": "en-gb", "sort_type": "SORT_RECENT_DESC", "hotel_id": hotel_id}
+    cutoff = since.isoformat() if since else None
+    max_backfill = (
+        math.ceil(wanted / REVIEW_PAGE_SIZE) * REVIEW_LANGUAGE_PAGES if languages else REVIEW_MAX_PAGES
+    )
+
+    def covered(complete: bool) -> bool:
+        # Nothing older to read, or nothing older needed
+        return complete or bool(since and review_store.has_older(hotel_id, since))
+
+    def matching() -> int:
+        return review_store.count(hotel_id, since, languages, limit=wanted)
+
+    def fetch(page_number: int) -> tuple[int, asyncio.Task]:
+        return page_number, asyncio.ensure_future(
+            booking_client.get_page(
+                path,
+                {**querystring, "page_number": str(page_number)},
+                REVIEW_DECODER,
+                priority=Priority.ENRICHMENT,
+            )
+        )
+
+    async with review_store.sync_lock(hotel_id):
+        state = review_store.state(hotel_id)
+        complete = state is not None and state.complete
+        stale = review_store.stale(state)
+        if not stale and (covered(complete) or matching() >= wanted):
+            return
+        # Stored reviews are the newest ones, new reviews only push them further down
+        topping_up = stale and state is not None and state.reviews > 0
+        newest = review_store.newest(hotel_id) if topping_up else None
+        page_number = 0 if topping_up or state is None else state.reviews // REVIEW_PAGE_SIZE
+
+        def next_needed(page: DecodedPage) -> bool:
+            """Whether the page after `page` will be read, judged before `page` is stored."""
+            if page.scanned < REVIEW_PAGE_SIZE or not page.items or pages >= REVIEW_MAX_PAGES:
+                return False
+            if topping_up:
+                # Not caught up with the stored reviews as long as the whole page is newer
+                return page.items[-1].date > newest
+            if backfilled >= max_backfill or (cutoff and page.items[-1].date[:10] < cutoff):
+                return False
+            in_page = sum(
+                1 for review in page.items if not languages or matches_language(review.languagecode, languages)
+            )
+            return found + in_page < wanted
+
+        pages = backfilled = found = 0
+        pending: Optional[tuple[int, asyncio.Task]] = None
+        try:
+            while pages < REVIEW_MAX_PAGES:
+                if not topping_up:
+                    if backfilled >= max_backfill or covered(complete):
+                        break
+                    found = matching()
+                    if found >= wanted:
+                        break
+                if pending is None or pending[0] != page_number:
+                    if pending is not None:
+                        _discard(pending[1])
+                    pending = fetch(page_number)
+                page = await pending[1]
+                pending = None
+                pages += 1
+                backfilled += not topping_up
+                review_store.pages_fetched += 1
+                if next_needed(page):
+                    pending = fetch(page_number + 1)
+                added = review_store.add(hotel_id, page.items)
+                if on_page is not None:
+                    await on_page(pages)
+                if page.scanned < REVIEW_PAGE_SIZE:
+                    complete = True
+                    break
+                if topping_up and added < len(page.items):
+                    # Caught up with the stored reviews, carry on after them if more are needed
+                    topping_up = False
+                    page_number = review_store.state(hotel_id).reviews // REVIEW_PAGE_SIZE
+                    continue
+                page_number += 1
+        finally:
+            if pending is not None:
+                _discard(pending[1])
+        review_store.mark_synced(hotel_id, complete)
+
+
+def _discard(task: asyncio.Task):
+    """Cancel a prefetched page which turned out not to be needed."""
+    task.cancel()
+    # One which failed meanwhile doesn't need a "never retrieved" warning
+    task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+
+@mcp.tool
+async def _collect_hotel_reviews(
+    hotel_id: str,
+    limit: Annotated[int, Field(ge=1, le=MAX_COLLECTED_REVIEWS)] = 50,
+    since: Optional[date] = None,
+    languages: Optional[list[str]] = None,
+    output_format: OutputFormat = OutputFormat.JSON,
+    ctx: Optional[Context] = None,
+) -> list[HotelReview] | Table | ResultPage:
+    """Collect up to `limit` reviews of a hotel, newest first, across as many pages as needed.
+    Prefer this over `_fetch_hotel_reviews` to read more than one page, recent reviews only
+    or reviews in given languages. The reviews are returned together once collected, the
+    number of matching reviews found so far is reported as progress after every page.
+
+    Args:
+        hotel_id (str): The ID of the hotel to fetch reviews for.
+        limit (int): The maximum number of reviews to return.
+        since (date): Only return reviews written on or after this date.
+        languages (list[str]): Only return reviews in these languages, e.g. ["en", "de"].
+        output_format (str): `json` for full review objects, `table` for column names plus
+            one row per review, using far fewer tokens, `handle` to keep the full result
+            server-side and only get its first page plus a handle for `_page_results`.
+
+    Returns:
+        list: The matching reviews.
+    """
+
+    async def report(pages: int):
+        found = review_store.count(hotel_id, since, languages, limit=limit)
+        await ctx.report_progress(
+            progress=found, total=limit, message=f"{found} matching reviews after {pages} pages"
+        )
+
+    await _sync_reviews(hotel_id, limit, since, languages, report if ctx is not None else None)
+    reviews = review_store.reviews(hotel_id, limit, since, languages)
+    return _formatted("reviews", reviews, output_format)
 
 
 # @mcp.tool
-def _fetch_hotel_room_list(
+async def _fetch_hotel_room_list(
     hotel_id: str,
     checkin_date: date,
     checkout_date: date,
@@ -360,7 +1003,7 @@ def _fetch_hotel_room_list(
     Returns:
         dict: JSON response containing the room list.
     """
-    url = f"{base_url}/hotels/room-list"
+    path = "/hotels/room-list"
 
     querystring = {
         "checkin_date": checkin_date,
@@ -374,14 +1017,14 @@ def _fetch_hotel_room_list(
         "hotel_id": hotel_id,
     }
 
-    response = requests.get(url, headers=headers, params=querystring)
+    response = await booking_client.get(path, querystring, priority=Priority.ENRICHMENT)
 
     response.raise_for_status()
     return response.json()
 
 
 # @mcp.tool
-def _fetch_hotel_pictures(hotel_id: str):
+async def _fetch_hotel_pictures(hotel_id: str):
     """Fetch the pictures for a given hotel ID.
 
     Args:
@@ -390,17 +1033,372 @@ def _fetch_hotel_pictures(hotel_id: str):
     Returns:
         dict: JSON response containing the hotel pictures.
     """
-    url = f"{base_url}/hotels/photos"
+    path = "/hotels/photos"
 
     querystring = {"hotel_id": hotel_id, "locale": "en-gb"}
 
-    response = requests.get(url, headers=headers, params=querystring)
+    response = await booking_client.get(path, querystring, priority=Priority.ENRICHMENT)
 
     response.raise_for_status()
     return response.json()
 
 
+@mcp.tool
+async def _fetch_hotel_dossier(
+    hotel_id: str,
+    sections: Optional[list[DossierSection]] = None,
+    checkin_date: Optional[date] = None,
+    checkout_date: Optional[date] = None,
+    adults_number_by_rooms: str = "2",
+    children_number_by_rooms: str = "0",
+    max_photos: Annotated[int, Field(ge=0, le=50)] = 10,
+) -> HotelDossier:
+    """Fetch description, facilities, photos and available rooms of a hotel in one go.
+    Useful to answer questions like "tell me more about this hotel".
+
+    Args:
+        hotel_id (str): The ID of the hotel.
+        sections (list[str]): Sections to include out of description, facilities, photos
+            and rooms. Defaults to all of them, rooms only when dates are given.
+        checkin_date (date): The check-in date, needed for rooms.
+        checkout_date (date): The check-out date, needed for rooms.
+        adults_number_by_rooms (str): The number of adults per room, comma separated.
+        children_number_by_rooms (str): The number of children per room, comma separated.
+        max_photos (int): The maximum number of photos to include.
+
+    Returns:
+        HotelDossier: The requested sections, with the reason for every section that failed.
+    """
+    has_dates = checkin_date is not None and checkout_date is not None
+    if sections is None:
+        sections = [section for section in DossierSection if has_dates or section != DossierSection.ROOMS]
+
+    fetchers = {
+        DossierSection.DESCRIPTION: lambda: _fetch_hotel_description(hotel_id),
+        DossierSection.FACILITIES: lambda: _fetch_hotel_facilities(hotel_id),
+        DossierSection.PHOTOS: lambda: _fetch_hotel_pictures(hotel_id),
+        DossierSection.ROOMS: lambda: _fetch_hotel_room_list(
+            hotel_id, checkin_date, checkout_date, adults_number_by_rooms, children_number_by_rooms
+        ),
+    }
+    projections = {
+        DossierSection.DESCRIPTION: project_description,
+        DossierSection.FACILITIES: project_facilities,
+        DossierSection.PHOTOS: lambda payload: project_photos(payload, max_photos),
+        DossierSection.ROOMS: project_rooms,
+    }
+
+    dossier = HotelDossier(hotel_id=hotel_id)
+    sections = list(dict.fromkeys(sections))
+    if DossierSection.ROOMS in sections and not has_dates:
+        sections.remove(DossierSection.ROOMS)
+        dossier.errors[DossierSection.ROOMS] = "checkin_date and checkout_date are required for rooms"
+
+    # All sections are requested concurrently, a failed section doesn't fail the others
+    payloads = await asyncio.gather(
+        *(fetchers[section]() for section in sections), return_exceptions=True
+    )
+    for section, payload in zip(sections, payloads):
+        if isinstance(payload, httpx.HTTPStatusError):
+            dossier.errors[section] = f"Upstream responded with HTTP {payload.response.status_code}"
+        elif isinstance(payload, Exception):
+            dossier.errors[section] = f"{type(payload).__name__}: {payload}"
+        else:
+            setattr(dossier, section.value, projections[section](payload))
+    return dossier
+
+
+async def _gather_per_hotel(
+    hotel_ids: list[str], fetch: Callable[[str], Awaitable[Any]]
+) -> dict[str, BatchItem]:
+    """Run `fetch` for every hotel or destination with at most `BATCH_CONCURRENCY` calls in flight.
+
+    A failure is recorded against its own ID and never fails the whole batch.
+    """
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def fetch_one(hotel_id: str) -> BatchItem:
+        async with semaphore:
+            try:
+                return BatchItem(ok=True, result=await fetch(hotel_id))
+            except httpx.HTTPStatusError as e:
+                return BatchItem(ok=False, error=f"Upstream responded with HTTP {e.response.status_code}")
+            except Exception as e:
+                return BatchItem(ok=False, error=f"{type(e).__name__}: {e}")
+
+    hotel_ids = list(dict.fromkeys(hotel_ids))
+    results = await asyncio.gather(*(fetch_one(hotel_id) for hotel_id in hotel_ids))
+    return dict(zip(hotel_ids, results))
+
+
+@mcp.tool
+async def _fetch_review_scores_batch(
+    hotel_ids: Annotated[list[str], Field(min_length=1, max_length=MAX_BATCH_SIZE)],
+) -> dict[str, BatchItem[Any]]:
+    """Fetch review scores for several hotels at once.
+    Prefer this over calling `_fetch_review_scores` once per hotel when comparing hotels.
+
+    Args:
+        hotel_ids (list[str]): The IDs of the hotels to fetch review scores for.
+
+    Returns:
+        dict: Review scores or the error per hotel ID.
+    """
+    return await _gather_per_hotel(hotel_ids, _fetch_review_scores.fn)
+
+
+@mcp.tool
+async def _fetch_hotel_reviews_batch(
+    hotel_ids: Annotated[list[str], Field(min_length=1, max_length=MAX_BATCH_SIZE)],
+    output_format: OutputFormat = OutputFormat.JSON,
+) -> dict[str, BatchItem[list[HotelReview] | Table | ResultPage]]:
+    """Fetch reviews for several hotels at once.
+    Prefer this over calling `_fetch_hotel_reviews` once per hotel when comparing hotels.
+
+    Args:
+        hotel_ids (list[str]): The IDs of the hotels to fetch reviews for.
+        output_format (str): `json` for full review objects, `table` for column names plus
+            one row per review, using far fewer tokens, `handle` to keep the full result
+            server-side and only get its first page plus a handle for `_page_results`.
+
+    Returns:
+        dict: Hotel reviews or the error per hotel ID.
+    """
+    return await _gather_per_hotel(
+        hotel_ids, lambda hotel_id: _fetch_hotel_reviews.fn(hotel_id, output_format)
+    )
+
+
+@mcp.tool
+async def _summarize_hotel_reviews(
+    hotel_id: str,
+    max_reviews: Annotated[int, Field(ge=1, le=MAX_COLLECTED_REVIEWS)] = 200,
+    since: Optional[date] = None,
+    languages: Optional[list[str]] = None,
+) -> ReviewSummary:
+    """Summarize what guests say about a hotel instead of returning the reviews themselves.
+    Prefer this over fetching reviews to answer questions like "what do guests think of it".
+
+    Args:
+        hotel_id (str): The ID of the hotel.
+        max_reviews (int): The maximum number of most recent reviews to summarize.
+        since (date): Only summarize reviews written on or after this date.
+        languages (list[str]): Only summarize reviews in these languages, e.g. ["en", "de"].
+
+    Returns:
+        ReviewSummary: Score distribution and averages, travel purposes, frequent tags and
+            the most mentioned pros and cons.
+    """
+    await _sync_reviews(hotel_id, max_reviews, since, languages)
+    return summarize_reviews(hotel_id, review_store.reviews(hotel_id, max_reviews, since, languages))
+
+
+@mcp.tool
+async def _summarize_hotel_reviews_batch(
+    hotel_ids: Annotated[list[str], Field(min_length=1, max_length=MAX_BATCH_SIZE)],
+    max_reviews: Annotated[int, Field(ge=1, le=MAX_COLLECTED_REVIEWS)] = 100,
+    since: Optional[date] = None,
+    languages: Optional[list[str]] = None,
+) -> dict[str, BatchItem[ReviewSummary]]:
+    """Summarize the reviews of several hotels at once, e.g. to compare what guests think.
+
+    Args:
+        hotel_ids (list[str]): The IDs of the hotels.
+        max_reviews (int): The maximum number of reviews to summarize per hotel.
+        since (date): Only summarize reviews written on or after this date.
+        languages (list[str]): Only summarize reviews in these languages, e.g. ["en", "de"].
+
+    Returns:
+        dict: Review summary or the error per hotel ID.
+    """
+    return await _gather_per_hotel(
+        hotel_ids,
+        lambda hotel_id: _summarize_hotel_reviews.fn(hotel_id, max_reviews, since, languages),
+    )
+
+
+@mcp.tool
+async def _page_results(
+    handle: str,
+    offset: Annotated[int, Field(ge=0)] = 0,
+    limit: Annotated[int, Field(ge=1, le=MAX_RESULT_PAGE_SIZE)] = RESULT_PAGE_SIZE,
+    fields: Optional[list[str]] = None,
+    output_format: OutputFormat = OutputFormat.TABLE,
+) -> ResultPage:
+    """Read a page of a result stored by a tool called with `output_format="handle"`.
+    Pages are sliced from the stored result, the upstream API isn't called again.
+
+    Args:
+        handle (str): The handle returned along with the first page.
+        offset (int): Position of the first record to return, `next_offset` of the previous page.
+        limit (int): The maximum number of records to return.
+        fields (list[str]): Only return these columns, or these fields with `json`. All by default.
+        output_format (str): `table` for column names plus one row per record, `json` for
+            full objects.
+
+    Returns:
+        dict: The records of the page, the total number of records and the next offset.
+    """
+    result = result_store.get(handle)
+    if result is None:
+        raise ValueError(f"Unknown or expired result handle {handle!r}, call the tool again")
+    return _result_page(handle, result, offset, limit, fields, output_format)
+
+
+@mcp.custom_route("/cache/stats", methods=["GET"])
+async def cache_stats(request: Request) -> JSONResponse:
+    """Hit rates and entry ages of the response caches and coalesced upstream calls,
+    plus the cumulative time spent per phase of serving upstream data."""
+    return JSONResponse(
+        {
+            "locations": location_cache.stats(),
+            "location_index": location_index.stats(),
+            "search": search_cache.stats(),
+            "ranking_frames": frame_cache.stats(),
+            "results": result_store.stats(),
+            "reviews": review_store.stats(),
+            "single_flight": booking_client.single_flight.stats(),
+            "scheduler": booking_client.scheduler.stats(),
+            "hedging": booking_client.hedger.stats(),
+            "timings": phase_timings.snapshot(),
+        }
+    )
+
+
+def _cache_lookups():
+    """Hits and misses of every cache, by the tier or kind of match that served them."""
+    stats = location_cache.stats()
+    yield {"cache": "locations", "result": "memory_hit"}, stats["memory_hits"]
+    yield {"cache": "locations", "result": "disk_hit"}, stats["disk_hits"]
+    yield {"cache": "locations", "result": "miss"}, stats["misses"]
+    stats = location_index.stats()
+    for kind in ("exact", "prefix", "fuzzy"):
+        yield {"cache": "location_index", "result": f"{kind}_hit"}, stats[f"{kind}_hits"]
+    yield {"cache": "location_index", "result": "miss"}, stats["misses"]
+    stats = search_cache.stats()
+    yield {"cache": "search", "result": "fresh_hit"}, stats["fresh_hits"]
+    yield {"cache": "search", "result": "stale_hit"}, stats["stale_hits"]
+    yield {"cache": "search", "result": "miss"}, stats["misses"]
+    stats = frame_cache.stats()
+    yield {"cache": "ranking_frames", "result": "hit"}, stats["hits"]
+    yield {"cache": "ranking_frames", "result": "miss"}, stats["misses"]
+    stats = result_store.stats()
+    yield {"cache": "results", "result": "memory_hit"}, stats["hits"]
+    yield {"cache": "results", "result": "shared_hit"}, stats["shared_hits"]
+    yield {"cache": "results", "result": "miss"}, stats["misses"]
+    stats = booking_client.single_flight.stats()
+    yield {"cache": "single_flight", "result": "hit"}, stats["collapsed"]
+    yield {"cache": "single_flight", "result": "miss"}, stats["executions"]
+
+
+def _upstream_queue():
+    for priority, queued in booking_client.scheduler.stats()["queued"].items():
+        yield {"priority": priority}, queued
+
+
+def _hedge_thresholds():
+    for endpoint in booking_client.hedger.endpoints:
+        threshold = booking_client.hedger.threshold(endpoint)
+        if threshold is not None:
+            yield {"endpoint": endpoint}, threshold
+
+
+def _remaining_quota():
+    remaining = booking_client.scheduler.remaining_quota()
+    # Unknown until upstream reports it
+    if remaining is not None:
+        yield {}, remaining
+
+
+registry.collector(
+    "booking_cache_lookups_total", "counter", "Cache lookups by cache and result", _cache_lookups
+)
+registry.collector(
+    "booking_phase_seconds_total",
+    "counter",
+    "Time spent per phase of serving upstream data: queue, network, decode and validate",
+    lambda: (({"phase": phase}, seconds) for phase, seconds in phase_timings.seconds.items()),
+)
+registry.collector(
+    "booking_upstream_queued_requests",
+    "gauge",
+    "Upstream requests waiting for the scheduler",
+    _upstream_queue,
+)
+registry.collector(
+    "booking_upstream_hedge_threshold_seconds",
+    "gauge",
+    "Time after which a request to a hedged endpoint is sent a second time",
+    _hedge_thresholds,
+    merge="max",
+)
+registry.collector(
+    "booking_upstream_remaining_quota",
+    "gauge",
+    "Requests left in the RapidAPI quota, as last reported upstream",
+    _remaining_quota,
+    # Workers share one quota, the lowest report is the most recent
+    merge="min",
+)
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request) -> PlainTextResponse:
+    """Tool, upstream, cache and phase metrics in the Prometheus text format."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@mcp.custom_route("/ready", methods=["GET"])
+async def readiness(request: Request) -> JSONResponse:
+    """200 while this worker takes tool calls, 503 while starting or draining for shutdown."""
+    return JSONResponse(
+        {"ready": _ready, "pid": os.getpid()},
+        status_code=200 if _ready else 503,
+    )
+
+
+def create_app():
+    """ASGI app serving the tools in stateless HTTP mode with plain JSON responses.
+
+    No MCP session is kept between requests, so any worker process can answer
+    any request. Used by the multi-worker mode below, or by any ASGI server:
+        uvicorn --factory services.server.server:create_app --workers 4
+    """
+    return mcp.http_app(stateless_http=True, json_response=True)
+
+
 if __name__ == "__main__":
-    # Start an HTTP server on port 8000
-    mcp.run(transport="http", host="127.0.0.1", port=8000)
+    host = os.getenv("MCP_HOST", "127.0.0.1")
+    port = int(os.getenv("MCP_PORT", 8000))
+    # Worker processes sharing the port; more than one runs the stateless app
+    workers = int(os.getenv("MCP_WORKERS", 1))
+    if workers > 1 or os.getenv("MCP_STATELESS") == "1":
+        import uvicorn
+
+        # Workers warm one search cache instead of one each
+        os.environ.setdefault("SEARCH_CACHE_SHARED", "1")
+        # Handles issued by one worker can be paged through on any other
+        os.environ.setdefault("RESULT_STORE_SHARED", "1")
+        # Workers draw on one token bucket and count one monthly quota, instead
+        # of each sending the full rate and spending the full quota
+        os.environ.setdefault(
+            "UPSTREAM_SCHEDULER_PATH", os.path.join(DEFAULT_CACHE_DIR, "scheduler.sqlite3")
+        )
+        # And any of them can answer a scrape with the metrics of all
+        metrics_dir = os.environ.setdefault(
+            "METRICS_DIR", os.path.join(DEFAULT_CACHE_DIR, "metrics")
+        )
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        uvicorn.run(
+            "services.server.server:create_app",
+            factory=True,
+            host=host,
+            port=port,
+            workers=workers,
+            # Seconds in-flight tool calls get to finish once asked to stop
+            timeout_graceful_shutdown=int(os.getenv("MCP_GRACEFUL_TIMEOUT", 30)),
+        )
+    else:
+        # Start an HTTP server on port 8000
+        mcp.run(transport="http", host=host, port=port)
 
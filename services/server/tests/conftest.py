@@ -0,0 +1,84 @@
+import os
+import tempfile
+
+# Keep the singletons created at import time away from the real cache directory
+os.environ.setdefault("BOOKING_CACHE_DIR", tempfile.mkdtemp(prefix="booking-cache-"))
+
+from datetime import date, timedelta
+
+import httpx
+import pytest
+
+from services.server.analysis import FrameCache
+from services.server.cache import LocationCache, LocationIndex, ResultStore, ReviewStore, SearchCache
+from services.server.mock_upstream import MockSettings, create_app
+from services.server.upstream import BookingClient, Hedger, UpstreamScheduler
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def mock_settings() -> MockSettings:
+    """Settings of the local stand-in, without latency so that tests run fast."""
+    return MockSettings(latency_ms=0, jitter_ms=0, chunk_size=0, seed=0)
+
+
+@pytest.fixture
+def upstream_app(mock_settings):
+    return create_app(mock_settings)
+
+
+@pytest.fixture
+def upstream(upstream_app):
+    """Counters of the requests the stand-in received."""
+    return upstream_app.state.upstream
+
+
+@pytest.fixture
+async def booking(upstream_app):
+    """A `BookingClient` talking to the stand-in in process."""
+    client = BookingClient(
+        base_url="http://upstream/v1",
+        api_key="test",
+        http2=False,
+        max_retries=2,
+        scheduler=UpstreamScheduler(rate=1000, backoff_base=0.001),
+        hedger=Hedger(endpoints=set()),
+        transport=httpx.ASGITransport(app=upstream_app),
+    )
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path, booking):
+    """The server module with its client and caches replaced by fresh ones for the test."""
+    from services.server import server
+
+    monkeypatch.setattr(server, "booking_client", booking)
+    monkeypatch.setattr(server, "search_cache", SearchCache(shared=False))
+    monkeypatch.setattr(server, "frame_cache", FrameCache())
+    monkeypatch.setattr(server, "location_cache", LocationCache(path=str(tmp_path / "locations.sqlite3")))
+    monkeypatch.setattr(server, "location_index", LocationIndex(path=str(tmp_path / "location_index")))
+    monkeypatch.setattr(server, "result_store", ResultStore(shared=False))
+    monkeypatch.setattr(server, "review_store", ReviewStore(path=str(tmp_path / "reviews.sqlite3")))
+    return server
+
+
+@pytest.fixture
+def search_args(server):
+    """Builds the arguments of a search a month from now."""
+
+    def build(max_results: int = 10, nights: int = 2):
+        checkin = date.today() + timedelta(days=30)
+        return server.SearchArgs(
+            checkin_date=checkin.isoformat(),
+            checkout_date=(checkin + timedelta(days=nights)).isoformat(),
+            destination_id="-2092174",
+            max_results=max_results,
+        )
+
+    return build
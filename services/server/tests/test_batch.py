@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from starlette.responses import JSONResponse
+
+from services.server.bench.tools import TOOL_ARGS
+
+pytestmark = pytest.mark.anyio
+
+
+def failing_for(upstream_app, hotel_id: str, status: int = 404):
+    """ASGI app answering `status` for one hotel and passing every other request on."""
+
+    async def app(scope, receive, send):
+        if f"hotel_id={hotel_id}".encode() in scope["query_string"]:
+            await JSONResponse({"message": "Hotel not found"}, status)(scope, receive, send)
+            return
+        await upstream_app(scope, receive, send)
+
+    return app
+
+
+async def test_review_scores_batch_reports_failures_per_hotel(server, booking, upstream_app):
+    booking.transport.app = failing_for(upstream_app, "100002")
+
+    result = await server._fetch_review_scores_batch.fn(["100001", "100002", "100001"])
+
+    assert list(result) == ["100001", "100002"]
+    assert result["100001"].ok and result["100001"].result
+    assert not result["100002"].ok
+    assert result["100002"].error == "Upstream responded with HTTP 404"
+
+
+async def test_batch_calls_are_bounded(server, booking, upstream_app, monkeypatch):
+    monkeypatch.setattr(server, "BATCH_CONCURRENCY", 2)
+    in_flight = peak = 0
+
+    async def app(scope, receive, send):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        await upstream_app(scope, receive, send)
+
+    booking.transport.app = app
+    result = await server._fetch_review_scores_batch.fn([str(100000 + i) for i in range(6)])
+
+    assert all(item.ok for item in result.values())
+    assert peak == 2
+
+
+async def test_reviews_batch(server):
+    result = await server._fetch_hotel_reviews_batch.fn(["100001", "100002"])
+
+    assert all(item.ok for item in result.values())
+    assert all(len(item.result) > 0 for item in result.values())
+
+
+async def test_destinations_are_resolved_searched_and_summarized(server, search_args, upstream):
+    result = await server._search_destinations_batch.fn(["Goa", "-2092174"], search_args(20), top=2)
+
+    goa, by_id = result["Goa"].result, result["-2092174"].result
+    assert goa.dest_id == "-2103041"
+    assert goa.label == "Goa, India"
+    assert by_id.label is None
+    assert goa.hotels == 20
+    assert set(goa.price_per_night) == {"p10", "p25", "p50", "p75", "p90"}
+    top = [dict(zip(goa.top_hotels.columns, row)) for row in goa.top_hotels.rows]
+    assert len(top) == 2
+    assert top[0]["bayesian_review_score"] >= top[1]["bayesian_review_score"]
+    assert all(hotel["review_score"] is not None and hotel["reviews"] is not None for hotel in top)
+    assert upstream.requests["/hotels/locations"] == 1
+
+
+async def test_destination_failures_are_reported_per_destination(server, search_args, booking, upstream_app):
+    async def app(scope, receive, send):
+        if b"name=Atlantis" in scope["query_string"]:
+            await JSONResponse([], 200)(scope, receive, send)
+            return
+        await upstream_app(scope, receive, send)
+
+    booking.transport.app = app
+
+    result = await server._search_destinations_batch.fn(["Atlantis", "Goa"], search_args(20))
+
+    assert not result["Atlantis"].ok
+    assert "No destination found" in result["Atlantis"].error
+    assert result["Goa"].ok
+
+
+async def test_every_tool_has_benchmark_arguments(server):
+    tools = await server.mcp.get_tools()
+
+    assert set(tools) == set(TOOL_ARGS)
@@ -0,0 +1,24 @@
+import pytest
+
+from services.server.bench import tools as bench
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+
+    assert bench.percentile(values, 50) == 50
+    assert bench.percentile(values, 99) == 99
+    assert bench.percentile(values, 100) == 100
+    assert bench.percentile([], 50) == 0.0
+
+
+def test_unknown_tools_are_rejected_before_starting(capsys):
+    with pytest.raises(SystemExit):
+        bench.main(["--tools", "_no_such_tool"])
+
+    assert "_no_such_tool" in capsys.readouterr().err
+
+
+def test_every_call_gets_distinct_arguments():
+    for tool, make_args in bench.TOOL_ARGS.items():
+        assert make_args(0) != make_args(1), tool
@@ -0,0 +1,47 @@
+import pytest
+
+from services.server.upstream import BookingClient
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_requests_share_one_pooled_client(booking, upstream):
+    first = booking.client
+    await booking.get_json("/hotels/review-scores", {"hotel_id": "100001", "locale": "en-gb"})
+    await booking.get_json("/hotels/description", {"hotel_id": "100001", "locale": "en-gb"})
+
+    assert booking.client is first
+    assert upstream.requests["/hotels/review-scores"] == 1
+    assert upstream.requests["/hotels/description"] == 1
+
+
+async def test_client_is_recreated_after_close(booking):
+    first = booking.client
+    await booking.aclose()
+
+    assert booking.client is not first
+    assert not booking.client.is_closed
+
+
+async def test_rapidapi_headers_are_sent(booking, upstream_app):
+    seen = {}
+
+    async def capture(scope, receive, send):
+        seen.update({key.decode(): value.decode() for key, value in scope["headers"]})
+        await upstream_app(scope, receive, send)
+
+    booking.transport.app = capture
+    await booking.get_json("/hotels/review-scores", {"hotel_id": "100001", "locale": "en-gb"})
+
+    assert seen["x-rapidapi-key"] == "test"
+    assert seen["x-rapidapi-host"] == "booking-com.p.rapidapi.com"
+
+
+def test_settings_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv("BOOKING_HTTP_MAX_CONNECTIONS", "7")
+    monkeypatch.setenv("BOOKING_HTTP_TIMEOUT", "12")
+
+    client = BookingClient()
+
+    assert client.max_connections == 7
+    assert client.timeout == 12
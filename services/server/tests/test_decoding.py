@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from services.server.decoding import HOTEL_DECODER, LOCATION_DECODER, REVIEW_DECODER, Projection
+from services.server.mock_upstream import samples
+
+
+def test_projection_drops_top_level_and_nested_keys():
+    projection = Projection(drop={"a"}, nested={"inner": Projection(drop={"b"})})
+
+    item = projection.apply({"a": 1, "c": 2, "inner": {"b": 3, "d": 4}})
+
+    assert item == {"c": 2, "inner": {"d": 4}}
+
+
+def test_hotels_are_validated_and_projected():
+    page = samples.sample_search_page(5)
+
+    hotels = HOTEL_DECODER.decode(json.dumps(page).encode())
+    items = HOTEL_DECODER.items(page)
+
+    assert [hotel.hotel_id for hotel in hotels] == [100000 + index for index in range(5)]
+    assert "max_photo_url" not in items[0]
+    assert "benefits" not in items[0]["composite_price_breakdown"]
+
+
+def test_hotels_without_prices_are_skipped_and_counted():
+    page = samples.sample_search_page(4)
+    del page["result"][1]["composite_price_breakdown"]
+
+    decoded = HOTEL_DECODER.decode_page(json.dumps(page).encode(), limit=2)
+
+    assert [hotel.hotel_id for hotel in decoded.items] == [100000, 100002]
+    assert decoded.scanned == 4
+
+
+def test_bodies_which_are_the_list_itself():
+    content = json.dumps([samples.sample_location("Goa", index) for index in range(3)]).encode()
+
+    assert len(LOCATION_DECODER.decode(content)) == 3
+
+
+def test_invalid_items_raise():
+    page = samples.sample_reviews_page(100001)
+    page["result"][0]["date"] = {"not": "a date"}
+
+    with pytest.raises(ValueError):
+        REVIEW_DECODER.decode(json.dumps(page).encode())
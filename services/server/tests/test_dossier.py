@@ -0,0 +1,62 @@
+from datetime import date, timedelta
+
+import pytest
+from starlette.responses import JSONResponse
+
+from services.server.schema.api_response import DossierSection
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_sections_without_dates_skip_rooms(server, upstream):
+    dossier = await server._fetch_hotel_dossier.fn("100001", max_photos=3)
+
+    assert dossier.description
+    assert dossier.facilities
+    assert len(dossier.photos) == 3
+    assert dossier.rooms is None
+    assert dossier.errors == {}
+    assert "/hotels/room-list" not in upstream.requests
+
+
+async def test_photos_can_be_left_out(server):
+    dossier = await server._fetch_hotel_dossier.fn("100001", sections=[DossierSection.PHOTOS], max_photos=0)
+
+    assert dossier.photos == []
+    assert dossier.errors == {}
+
+
+async def test_rooms_need_dates(server):
+    dossier = await server._fetch_hotel_dossier.fn("100001", sections=[DossierSection.ROOMS])
+
+    assert dossier.rooms is None
+    assert "checkin_date" in dossier.errors[DossierSection.ROOMS]
+
+
+async def test_rooms_with_dates(server):
+    checkin = date.today() + timedelta(days=10)
+
+    dossier = await server._fetch_hotel_dossier.fn(
+        "100001",
+        sections=[DossierSection.ROOMS],
+        checkin_date=checkin,
+        checkout_date=checkin + timedelta(days=2),
+    )
+
+    assert dossier.rooms
+    assert dossier.errors == {}
+
+
+async def test_failed_section_does_not_fail_the_others(server, booking, upstream_app):
+    async def app(scope, receive, send):
+        if scope["path"].endswith("/photos"):
+            await JSONResponse({"message": "Not found"}, 404)(scope, receive, send)
+            return
+        await upstream_app(scope, receive, send)
+
+    booking.transport.app = app
+    dossier = await server._fetch_hotel_dossier.fn("100001")
+
+    assert dossier.photos is None
+    assert dossier.errors == {DossierSection.PHOTOS: "Upstream responded with HTTP 404"}
+    assert dossier.description and dossier.facilities
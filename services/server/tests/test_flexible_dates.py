@@ -0,0 +1,102 @@
+from datetime import date, timedelta
+
+import pytest
+from starlette.responses import JSONResponse
+
+from services.server.analysis import HotelFilter, window_prices
+from services.server.mock_upstream import app as mock_app
+from services.server.mock_upstream import samples
+from services.server.schema.api_response import Hotel
+
+pytestmark = pytest.mark.anyio
+
+CHECKIN = date(2026, 3, 6)
+
+
+def hotel(index: int, **fields) -> Hotel:
+    return Hotel.model_validate({**samples.sample_hotel(index), **fields})
+
+
+def test_window_prices_skip_filtered_and_sold_out_hotels():
+    hotels = [hotel(1), hotel(2, soldout=1), hotel(3, **{"class": 1})]
+    # Hotel 2 is the cheapest but sold out, hotel 3 fails the filter
+    hotels[1].composite_price_breakdown.gross_amount_per_night.value = 1.0
+
+    window = window_prices(CHECKIN, CHECKIN + timedelta(days=2), hotels, HotelFilter(min_class=2))
+
+    assert window.hotels == 1
+    assert window.min_price_per_night == window.median_price_per_night
+    assert window.cheapest_hotel_id == 100001
+
+
+def test_window_without_prices():
+    window = window_prices(CHECKIN, CHECKIN + timedelta(days=2), [])
+
+    assert window.hotels == 0
+    assert window.min_price_per_night is None
+
+
+@pytest.fixture
+def cheaper_on_fridays(monkeypatch):
+    """Search results costing 1000 more per night unless checking in on a Friday."""
+    search = mock_app.SYNTHETIC["/hotels/search"]
+
+    def priced_by_weekday(params):
+        page = search(params)
+        if date.fromisoformat(params["checkin_date"]).weekday() != 4:
+            for item in page["result"]:
+                item["composite_price_breakdown"]["gross_amount_per_night"]["value"] += 1000
+        return page
+
+    monkeypatch.setitem(mock_app.SYNTHETIC, "/hotels/search", priced_by_weekday)
+
+
+async def test_cheapest_window_is_found(server, search_args, upstream, cheaper_on_fridays):
+    data = search_args(20, nights=2)
+
+    matrix = await server._search_flexible_dates.fn(data, data.checkin_date + timedelta(days=13))
+
+    assert matrix.nights == 2
+    assert len(matrix.windows.rows) == 14
+    assert date.fromisoformat(matrix.cheapest.checkin_date).weekday() == 4
+    assert matrix.currency == "INR"
+    assert upstream.requests["/hotels/search"] == 14
+
+
+async def test_weekdays_narrow_the_windows(server, search_args):
+    data = search_args(20)
+
+    matrix = await server._search_flexible_dates.fn(
+        data, data.checkin_date + timedelta(days=13), nights=1, checkin_weekdays=["sat"]
+    )
+
+    assert len(matrix.windows.rows) == 2
+    assert matrix.nights == 1
+
+
+async def test_failed_windows_are_reported(server, search_args, booking, upstream_app):
+    data = search_args(20)
+    failing = data.checkin_date + timedelta(days=1)
+
+    async def app(scope, receive, send):
+        if f"checkin_date={failing.isoformat()}".encode() in scope["query_string"]:
+            await JSONResponse({"message": "Unavailable"}, 404)(scope, receive, send)
+            return
+        await upstream_app(scope, receive, send)
+
+    booking.transport.app = app
+
+    matrix = await server._search_flexible_dates.fn(data, data.checkin_date + timedelta(days=2))
+    windows = [dict(zip(matrix.windows.columns, row)) for row in matrix.windows.rows]
+
+    assert [window["error"] is not None for window in windows] == [False, True, False]
+    assert matrix.cheapest is not None
+
+
+async def test_too_many_windows_are_rejected(server, search_args, upstream):
+    data = search_args(20)
+
+    with pytest.raises(ValueError, match="narrow the range"):
+        await server._search_flexible_dates.fn(data, data.checkin_date + timedelta(days=60))
+
+    assert upstream.requests["/hotels/search"] == 0
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from services.server.analysis import GeoIndex, haversine_km
+
+pytestmark = pytest.mark.anyio
+
+rng = np.random.default_rng(0)
+LATITUDES = rng.uniform(-60, 60, 2000)
+LONGITUDES = rng.uniform(-180, 180, 2000)
+
+
+def brute_force(latitude, longitude):
+    distances = haversine_km(latitude, longitude, LATITUDES, LONGITUDES)
+    order = np.argsort(distances, kind="stable")
+    return order, distances[order]
+
+
+def test_haversine_of_a_known_distance():
+    # Paris to London
+    assert haversine_km(48.8566, 2.3522, np.array([51.5074]), np.array([-0.1278]))[0] == pytest.approx(
+        343.5, abs=0.5
+    )
+
+
+@pytest.mark.parametrize("latitude, longitude", [(10.0, 20.0), (55.0, 179.9), (-30.0, -179.5)])
+def test_within_matches_brute_force(latitude, longitude):
+    index = GeoIndex(LATITUDES, LONGITUDES)
+    order, distances = brute_force(latitude, longitude)
+    expected = order[distances <= 1500]
+
+    positions, found = index.within(latitude, longitude, 1500)
+
+    assert list(positions) == list(expected)
+    assert np.all(np.diff(found) >= 0)
+
+
+def test_nearest_matches_brute_force_and_honours_the_mask():
+    index = GeoIndex(LATITUDES, LONGITUDES)
+    mask = np.arange(len(LATITUDES)) % 2 == 0
+    order, _ = brute_force(0.0, 0.0)
+
+    positions, _ = index.nearest(0.0, 0.0, 5, mask)
+
+    assert list(positions) == [position for position in order if mask[position]][:5]
+    assert len(index.nearest(0.0, 0.0, 5, np.zeros(len(LATITUDES), dtype=bool))[0]) == 0
+
+
+async def test_hotels_within_a_radius_of_a_point(server, search_args):
+    nearby = await server._find_hotels_within.fn(search_args(100), 1.0, latitude=15.5, longitude=73.76)
+
+    assert nearby
+    assert all(hotel.distance_km <= 1.0 for hotel in nearby)
+    assert [hotel.distance_km for hotel in nearby] == sorted(hotel.distance_km for hotel in nearby)
+
+
+async def test_nearest_hotels_to_a_landmark(server, search_args, upstream):
+    nearby = await server._find_nearest_hotels.fn(search_args(3), landmark="Goa")
+
+    assert len(nearby) == 3
+    assert upstream.requests["/hotels/locations"] == 1
+
+
+async def test_a_reference_point_is_required(server, search_args):
+    with pytest.raises(ValueError, match="landmark"):
+        await server._find_nearest_hotels.fn(search_args(), latitude=15.5)
@@ -0,0 +1,122 @@
+import asyncio
+
+import httpx
+import pytest
+
+from services.server.upstream import BookingClient, Hedger, UpstreamScheduler
+
+pytestmark = pytest.mark.anyio
+
+
+def responder(*delays: float, fail: bool = False):
+    """A `send` answering its nth call after `delays[n]` seconds."""
+    calls = []
+
+    async def send() -> httpx.Response:
+        delay = delays[len(calls)]
+        calls.append(delay)
+        await asyncio.sleep(delay)
+        if fail:
+            raise httpx.ConnectError(f"failed after {delay}")
+        return httpx.Response(200, json={"delay": delay})
+
+    send.calls = calls
+    return send
+
+
+async def admit():
+    pass
+
+
+def warmed(latency: float = 0.01, samples: int = 20, **settings) -> Hedger:
+    hedger = Hedger(endpoints={"/x"}, percentile=90, min_delay=0.01, min_samples=samples, **settings)
+    hedger._latency("/x").latencies.extend([latency] * samples)
+    hedger._latency("/x").hedged.extend([False] * samples)
+    return hedger
+
+
+async def test_nothing_is_hedged_before_enough_samples():
+    hedger = warmed(samples=20)
+    hedger._latency("/x").latencies.pop()
+    send = responder(0.05)
+
+    await hedger.send("/x", send, admit)
+
+    assert send.calls == [0.05]
+    assert hedger.threshold("/y") is None
+
+
+async def test_slow_requests_are_hedged_and_the_original_latency_is_kept():
+    hedger = warmed(max_ratio=1)
+    send = responder(0.3, 0.0)
+
+    response = await hedger.send("/x", send, admit)
+    recorded = hedger._latency("/x").latencies
+
+    assert response.json() == {"delay": 0.0}
+    assert hedger.stats()["/x"]["wins"] == 1
+    # The original was given up when the hedge answered, past the threshold
+    assert len(recorded) == 21
+    assert 0.01 <= recorded[-1] < 0.3
+
+
+async def test_the_original_latency_is_kept_when_it_wins():
+    hedger = warmed(max_ratio=1)
+    send = responder(0.03, 0.3)
+
+    response = await hedger.send("/x", send, admit)
+
+    assert response.json() == {"delay": 0.03}
+    assert hedger.stats()["/x"]["wins"] == 0
+    assert hedger._latency("/x").latencies[-1] >= 0.03
+
+
+async def test_hedges_stay_within_the_ratio():
+    hedger = warmed(max_ratio=0.05)
+
+    for _ in range(3):
+        send = responder(0.03, 0.0)
+        await hedger.send("/x", send, admit)
+
+    assert hedger.stats()["/x"]["hedges"] == 1
+
+
+async def test_the_original_error_is_raised_when_both_fail():
+    hedger = warmed(max_ratio=1)
+
+    with pytest.raises(httpx.ConnectError, match="after 0.03"):
+        await hedger.send("/x", responder(0.03, 0.0, fail=True), admit)
+
+    assert len(hedger._latency("/x").latencies) == 20
+
+
+async def test_the_client_hedges_slow_upstream_requests(upstream_app, upstream):
+    delays = [0.3, 0.0]
+    sent = []
+
+    async def app(scope, receive, send):
+        if scope["type"] == "http":
+            sent.append(delays[len(sent)])
+            await asyncio.sleep(sent[-1])
+        await upstream_app(scope, receive, send)
+
+    hedger = warmed(max_ratio=1)
+    hedger.endpoints = {"/hotels/locations"}
+    hedger._endpoints["/hotels/locations"] = hedger._endpoints.pop("/x")
+    client = BookingClient(
+        base_url="http://upstream/v1",
+        api_key="test",
+        http2=False,
+        scheduler=UpstreamScheduler(rate=1000, backoff_base=0.001),
+        hedger=hedger,
+        transport=httpx.ASGITransport(app=app),
+    )
+    try:
+        locations = await client.get_json("/hotels/locations", {"name": "Goa", "locale": "en-gb"})
+    finally:
+        await client.aclose()
+
+    assert locations
+    assert sent == [0.3, 0.0]
+    assert upstream.requests["/hotels/locations"] == 1
+    assert hedger.stats()["/hotels/locations"]["wins"] == 1
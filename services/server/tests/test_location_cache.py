@@ -0,0 +1,85 @@
+import time
+
+import pytest
+
+from services.server.cache import LocationCache, SQLiteStore
+from services.server.mock_upstream import samples
+from services.server.schema.api_response import Location
+
+
+@pytest.fixture
+def locations() -> list[Location]:
+    return [Location.model_validate(samples.sample_location("Goa", index)) for index in range(3)]
+
+
+@pytest.fixture
+def cache(tmp_path) -> LocationCache:
+    return LocationCache(path=str(tmp_path / "locations.sqlite3"), ttl=60)
+
+
+def test_lookup_ignores_case_spacing_and_punctuation(cache, locations):
+    cache.set("North Goa, India", locations)
+
+    assert cache.get("  north goa india. ") == locations
+    assert cache.memory_hits == 1
+
+
+def test_locales_are_cached_apart(cache, locations):
+    cache.set("Goa", locations, locale="en-gb")
+
+    assert cache.get("Goa", locale="de") is None
+
+
+def test_disk_tier_survives_a_restart(tmp_path, locations):
+    path = str(tmp_path / "locations.sqlite3")
+    LocationCache(path=path, ttl=60).set("Goa", locations)
+
+    restarted = LocationCache(path=path, ttl=60)
+
+    assert restarted.get("Goa") == locations
+    assert restarted.disk_hits == 1
+    # Promoted to memory by the first read
+    assert restarted.get("Goa") == locations
+    assert restarted.memory_hits == 1
+
+
+def test_expired_entries_are_dropped(cache, locations, monkeypatch):
+    cache.set("Goa", locations)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+
+    assert cache.get("Goa") is None
+    assert len(cache.store) == 0
+
+
+def test_memory_and_disk_are_bounded(tmp_path, locations):
+    cache = LocationCache(path=str(tmp_path / "locations.sqlite3"), memory_size=2, disk_size=3)
+    for index in range(5):
+        cache.set(f"place {index}", locations)
+
+    assert cache.stats()["memory_entries"] == 2
+    assert len(cache.store) == 3
+    assert cache.get("place 0") is None
+    assert cache.get("place 4") == locations
+
+
+def test_purge_a_single_place(cache, locations):
+    cache.set("Goa", locations)
+    cache.set("Delhi", locations)
+
+    assert cache.purge(place="GOA") == 1
+    assert cache.get("Goa") is None
+    assert cache.get("Delhi") == locations
+
+
+def test_store_evicts_least_recently_read(tmp_path):
+    store = SQLiteStore(str(tmp_path / "store.sqlite3"), "entries")
+    for key in "abc":
+        store.set(key, {"key": key}, ttl=60)
+        time.sleep(0.001)
+    store.get("a")
+
+    assert store.evict(2) == 1
+    assert store.get("b") is None
+    assert store.get("a")[0] == {"key": "a"}
+    assert store.get("c")[0] == {"key": "c"}
@@ -0,0 +1,94 @@
+import pytest
+
+from services.server.cache import LocationIndex
+from services.server.cache.locations import PLACE_SIZE, normalize_place
+from services.server.mock_upstream import samples
+from services.server.schema.api_response import Location
+
+pytestmark = pytest.mark.anyio
+
+
+def locations(name: str, count: int = 3) -> list[Location]:
+    # The mock numbers destinations the same for every name
+    return [
+        Location.model_validate({**samples.sample_location(name, index), "dest_id": f"{name}-{index}"})
+        for index in range(count)
+    ]
+
+
+@pytest.fixture
+def index(tmp_path) -> LocationIndex:
+    return LocationIndex(path=str(tmp_path / "location_index"), flush_every=100, reload_interval=0)
+
+
+def test_exact_match_of_name_label_and_alias(index):
+    index.add("Bombay", locations("Mumbai"))
+
+    assert index.lookup("mumbai").match.dest_id == "Mumbai-0"
+    assert index.lookup("Mumbai, India").match.confidence == 1.0
+    hit = index.lookup("BOMBAY")
+    assert hit.match.name == "Mumbai"
+    assert hit.query == "bombay"
+    assert index.hits["exact"] == 3
+
+
+def test_prefix_and_fuzzy_matches(index):
+    index.add("Amsterdam", locations("Amsterdam"))
+    index.flush()
+
+    prefix = index.lookup("amster")
+    fuzzy = index.lookup("amsterdm")
+
+    assert prefix.match.name == "Amsterdam"
+    assert prefix.match.confidence < index.min_confidence
+    assert fuzzy.match.name == "Amsterdam"
+    assert fuzzy.match.confidence >= index.min_confidence
+    assert index.lookup("zzzzzz") is None
+    assert index.misses == 1
+
+
+def test_flush_writes_a_generation_other_processes_load(tmp_path, index):
+    index.add("Goa", locations("Goa"))
+    index.flush()
+    index.add("Delhi", locations("Delhi"))
+    index.flush()
+
+    other = LocationIndex(path=str(tmp_path / "location_index"), reload_interval=0)
+
+    assert other.lookup("goa").match.name == "Goa"
+    assert other.lookup("delhi").match.name == "Delhi"
+    assert other.stats()["generation"] == 2
+    # Only the latest two generations are kept
+    assert not any(file.exists() for file in index.files(0))
+
+
+def test_long_names_resolve_to_the_location_cache_key(index):
+    place = "Llanfairpwllgwyngyllgogerychwyrndrobwllllantysiliogogogoch " * 4
+    index.add(place, locations("Llanfair"))
+    index.flush()
+
+    hit = index.lookup(place)
+
+    assert len(normalize_place(place).encode()) <= PLACE_SIZE
+    assert hit.query == normalize_place(place)
+
+
+async def test_aliases_are_served_from_the_location_cache(server, upstream):
+    await server._fetch_locations.fn("Bombay")
+
+    resolved = await server._resolve_destination.fn("bombay")
+    cached = await server._fetch_locations.fn("Bombay, ")
+
+    assert resolved.source == "index"
+    assert cached[0].name == "Bombay"
+    assert upstream.requests["/hotels/locations"] == 1
+
+
+async def test_index_hits_count_one_location_cache_miss(server, upstream):
+    await server._fetch_locations.fn("Amsterdam")
+    server.location_cache.purge()
+
+    await server._fetch_locations.fn("Amsterdm")
+
+    assert upstream.requests["/hotels/locations"] == 2
+    assert server.location_cache.stats()["misses"] == 2
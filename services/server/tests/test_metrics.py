@@ -0,0 +1,115 @@
+import asyncio
+import json
+import subprocess
+import sys
+
+import httpx
+import pytest
+
+from services.server.metrics import Registry
+from services.server.metrics.instruments import UPSTREAM_IN_FLIGHT, UPSTREAM_REQUESTS
+from services.server.upstream.metering import MeteredTransport
+
+pytestmark = pytest.mark.anyio
+
+
+def test_counters_gauges_and_histograms_are_rendered():
+    registry = Registry()
+    calls = registry.counter("calls_total", "Calls", ("tool",))
+    running = registry.gauge("running", "Calls in progress")
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    calls.inc(tool='say "hi"')
+    running.set(3)
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE calls_total counter" in lines
+    assert 'calls_total{tool="say \\"hi\\""} 1' in lines
+    assert "running 3" in lines
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1"} 2' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "latency_seconds_sum 5.55" in lines
+    assert "latency_seconds_count 3" in lines
+
+
+def test_collectors_are_read_at_every_render():
+    registry = Registry()
+    hits = {"memory": 1}
+    registry.collector("hits_total", "counter", "Hits", lambda: (({"tier": k}, v) for k, v in hits.items()))
+
+    hits["memory"] = 5
+
+    assert 'hits_total{tier="memory"} 5' in registry.render()
+
+
+def test_duplicate_names_are_rejected():
+    registry = Registry()
+    registry.counter("calls_total", "Calls")
+
+    with pytest.raises(ValueError):
+        registry.gauge("calls_total", "Calls")
+
+
+def snapshot_of(pid: int, directory, calls: float, running: float):
+    other = Registry(directory=str(directory))
+    other.counter("calls_total", "Calls").inc(calls)
+    other.gauge("running", "Calls in progress").set(running)
+    other.gauge("remaining_quota", "Quota", merge="min").set(running * 10)
+    (directory / f"{pid}.json").write_text(json.dumps(other.snapshot()))
+
+
+def local_registry(directory) -> Registry:
+    registry = Registry(directory=str(directory))
+    registry.counter("calls_total", "Calls").inc(1)
+    registry.gauge("running", "Calls in progress").set(1)
+    registry.gauge("remaining_quota", "Quota", merge="min").set(50)
+    return registry
+
+
+def test_processes_are_merged(tmp_path):
+    registry = local_registry(tmp_path)
+    registry.share()
+    snapshot_of(1, tmp_path, calls=2, running=4)
+
+    lines = registry.render().splitlines()
+
+    assert "calls_total 3" in lines
+    assert "running 5" in lines
+    assert "remaining_quota 40" in lines
+
+
+def test_exited_processes_keep_counters_but_not_gauges(tmp_path):
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    registry = local_registry(tmp_path)
+    snapshot_of(exited.pid, tmp_path, calls=2, running=4)
+
+    lines = registry.render().splitlines()
+
+    assert "calls_total 3" in lines
+    assert "running 1" in lines
+    assert "remaining_quota 50" in lines
+
+
+async def test_cancelled_upstream_requests_leave_the_in_flight_gauge():
+    started = asyncio.Event()
+
+    async def app(scope, receive, send):
+        started.set()
+        await asyncio.sleep(10)
+
+    transport = MeteredTransport(httpx.ASGITransport(app=app))
+    request = asyncio.ensure_future(
+        transport.handle_async_request(httpx.Request("GET", "http://upstream/cancelled"))
+    )
+    await started.wait()
+
+    request.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await request
+
+    assert UPSTREAM_IN_FLIGHT.values[("/cancelled",)] == 0
+    assert UPSTREAM_REQUESTS.values[("/cancelled", "cancelled")] == 1
@@ -0,0 +1,74 @@
+import httpx
+import pytest
+
+from services.server.mock_upstream import MockSettings, create_app
+from services.server.upstream import BookingClient, Hedger, UpstreamScheduler
+from services.server.upstream.recording import FixtureStore, request_key
+
+pytestmark = pytest.mark.anyio
+
+
+def local_client(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://upstream")
+
+
+def test_request_key_ignores_parameter_order_and_types():
+    assert request_key("/hotels/search", {"b": 2, "a": "x"}) == request_key(
+        "/hotels/search", {"a": "x", "b": "2"}
+    )
+
+
+def test_fixture_store_finds_exact_and_nearest(tmp_path):
+    store = FixtureStore(tmp_path)
+    for dest_id in ("1", "2"):
+        body = f'{{"result": [{dest_id}]}}'.encode()
+        store.save("/hotels/search", {"dest_id": dest_id, "page_number": "0"}, 200, "application/json", body)
+
+    assert store.find("/hotels/search", {"page_number": 0, "dest_id": 1})["body"] == {"result": [1]}
+    assert store.find("/hotels/search", {"dest_id": "2", "page_number": "1"}) is None
+    assert store.nearest("/hotels/search", {"dest_id": "2", "page_number": "1"})["body"] == {"result": [2]}
+    assert store.nearest("/hotels/reviews", {"hotel_id": "1"}) is None
+    assert len(store) == 2
+
+
+async def test_recorded_responses_are_replayed(tmp_path, upstream_app):
+    params = {"hotel_id": "100001", "locale": "en-gb"}
+    recorder = BookingClient(
+        base_url="http://upstream/v1",
+        http2=False,
+        scheduler=UpstreamScheduler(rate=1000),
+        hedger=Hedger(endpoints=set()),
+        transport=httpx.ASGITransport(app=upstream_app),
+        record_dir=str(tmp_path),
+    )
+    recorded = await recorder.get_json("/hotels/review-scores", params)
+    await recorder.aclose()
+
+    replay = create_app(MockSettings(fixtures=str(tmp_path), latency_ms=0, jitter_ms=0, synthetic=False))
+    async with local_client(replay) as client:
+        response = await client.get("/v1/hotels/review-scores", params=params)
+        missing = await client.get("/v1/hotels/photos", params=params)
+
+    assert response.json() == recorded
+    assert replay.state.upstream.sources["fixture"] == 1
+    assert missing.status_code == 404
+
+
+async def test_injected_faults_and_quota_headers():
+    app = create_app(MockSettings(latency_ms=0, jitter_ms=0, quota=2, retry_after=3, seed=0))
+    async with local_client(app) as client:
+        responses = [
+            await client.get("/v1/hotels/review-scores", params={"hotel_id": "1"}) for _ in range(3)
+        ]
+
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert [response.headers["x-ratelimit-requests-remaining"] for response in responses] == ["1", "0", "0"]
+    assert responses[2].headers["retry-after"] == "3"
+
+
+async def test_error_rate_is_injected():
+    app = create_app(MockSettings(latency_ms=0, jitter_ms=0, error_rate=1, seed=0))
+    async with local_client(app) as client:
+        response = await client.get("/v1/hotels/review-scores", params={"hotel_id": "1"})
+
+    assert response.status_code in (500, 502, 503)
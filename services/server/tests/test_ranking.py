@@ -0,0 +1,81 @@
+import pytest
+
+from services.server.analysis import FrameCache, HotelFilter, HotelFrame
+from services.server.mock_upstream import samples
+from services.server.schema.api_response import Hotel
+from shared.schema.sorting_methods import SortingMethods
+
+pytestmark = pytest.mark.anyio
+
+HOTELS = [Hotel.model_validate(samples.sample_hotel(index)) for index in range(50)]
+
+
+@pytest.fixture
+def frame() -> HotelFrame:
+    return HotelFrame(HOTELS)
+
+
+def test_filters_are_combined(frame):
+    filters = HotelFilter(min_class=4, max_price_per_night=4500, max_distance_km=1.0)
+
+    ranked = frame.rank(filters)
+
+    assert ranked
+    for hotel in ranked:
+        assert hotel.hotel_class >= 4
+        assert hotel.composite_price_breakdown.gross_amount_per_night.value <= 4500
+        assert float(hotel.distance_to_cc) <= 1.0
+
+
+def test_later_methods_break_ties(frame):
+    ranked = frame.rank(sort_by=[SortingMethods.HOTEL_STAR_RATING_DESC, SortingMethods.PRICE_LOW_TO_HIGH])
+
+    assert [hotel.hotel_class for hotel in ranked[:10]] == [5] * 10
+    prices = [hotel.composite_price_breakdown.gross_amount_per_night.value for hotel in ranked[:10]]
+    assert prices == sorted(prices)
+
+
+def test_bayesian_score_discounts_few_reviews():
+    few = Hotel.model_validate({**samples.sample_hotel(1), "review_score": 9.9, "review_nr": 1})
+    many = Hotel.model_validate({**samples.sample_hotel(2), "review_score": 9.5, "review_nr": 5000})
+    average = Hotel.model_validate({**samples.sample_hotel(3), "review_score": 6.0, "review_nr": 5000})
+
+    ranked = HotelFrame([few, many, average]).rank(sort_by=[SortingMethods.BAYESIAN_REVIEW_SCORE])
+
+    assert ranked == [many, few, average]
+
+
+@pytest.mark.parametrize("method", [SortingMethods.RECENCY_DESC, SortingMethods.RECENCY_ASC])
+def test_review_sorting_methods_are_rejected(frame, method):
+    with pytest.raises(ValueError, match="sorts reviews"):
+        frame.rank(sort_by=[SortingMethods.POPULARITY, method])
+
+
+def test_frames_are_reused_for_the_same_hotels():
+    cache = FrameCache(max_entries=1)
+
+    first = cache.get("a", HOTELS)
+
+    assert cache.get("a", HOTELS) is first
+    assert cache.get("a", list(map(Hotel.model_copy, HOTELS))) is not first
+    cache.get("b", HOTELS)
+    assert cache.stats()["entries"] == 1
+    assert cache.hits == 1
+
+
+async def test_reranking_is_answered_locally(server, search_args, upstream):
+    data = search_args()
+
+    cheapest = await server._rank_hotels.fn(data, sort_by=[SortingMethods.PRICE_LOW_TO_HIGH])
+    best = await server._rank_hotels.fn(data, HotelFilter(min_review_score=9), [SortingMethods.BAYESIAN_REVIEW_SCORE])
+
+    assert len(cheapest) == 10
+    assert all(hotel.review_score >= 9 for hotel in best)
+    assert upstream.requests["/hotels/search"] == 5
+
+
+async def test_tool_rejects_review_sorting_before_searching(server, search_args, upstream):
+    with pytest.raises(ValueError, match="RECENCY_DESC"):
+        await server._rank_hotels.fn(search_args(), sort_by=[SortingMethods.RECENCY_DESC])
+
+    assert upstream.requests["/hotels/search"] == 0
@@ -0,0 +1,95 @@
+import time
+
+import pytest
+from fastmcp import Client
+
+from services.server.bench import tools as bench
+from services.server.cache import ResultStore
+from services.server.encoding import HOTEL_TABLE
+from services.server.mock_upstream import samples
+from services.server.schema.api_response import Hotel, OutputFormat
+
+pytestmark = pytest.mark.anyio
+
+HOTELS = [Hotel.model_validate(samples.sample_hotel(index)) for index in range(25)]
+
+
+def test_results_are_read_back_by_handle():
+    store = ResultStore(shared=False)
+
+    handle, _ = store.put("hotels", HOTELS)
+
+    assert store.get(handle).items == HOTELS
+    assert store.get("unknown") is None
+    assert (store.hits, store.misses) == (1, 1)
+
+
+def test_results_expire_and_are_bounded(monkeypatch):
+    store = ResultStore(ttl=60, max_entries=2, shared=False)
+    first, _ = store.put("hotels", HOTELS)
+    second, _ = store.put("hotels", HOTELS)
+    third, _ = store.put("hotels", HOTELS)
+
+    assert store.get(first) is None
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert store.get(second) is None
+    assert store.get(third) is None
+
+
+def test_shared_results_can_be_read_by_other_processes(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    handle, _ = ResultStore(shared=True, path=path).put("hotels", HOTELS)
+
+    other = ResultStore(shared=True, path=path)
+
+    assert other.get(handle).items == HOTELS
+    assert other.shared_hits == 1
+
+
+def test_tables_select_columns_in_order():
+    table = HOTEL_TABLE.select(["name", "hotel_id"]).encode(HOTELS[:2])
+
+    assert table.columns == ["name", "hotel_id"]
+    assert table.rows[0] == ["Sample Hotel 0", 100000]
+    with pytest.raises(ValueError, match="Unknown columns"):
+        HOTEL_TABLE.select(["name", "stars"])
+
+
+async def test_pages_follow_the_handle(server, search_args, upstream):
+    first = await server._search_available_hotels.fn(search_args(25), OutputFormat.HANDLE)
+
+    second = await server._page_results.fn(first.handle, offset=first.next_offset, limit=10)
+    last = await server._page_results.fn(first.handle, offset=second.next_offset, limit=10)
+
+    assert (first.total, first.next_offset) == (25, server.RESULT_PAGE_SIZE)
+    assert len(second.table.rows) == 10
+    assert len(last.table.rows) == 5
+    assert last.next_offset is None
+    assert upstream.requests["/hotels/search"] == 2
+
+
+async def test_pages_pick_fields(server, search_args):
+    first = await server._search_available_hotels.fn(search_args(5), OutputFormat.HANDLE)
+
+    table = await server._page_results.fn(first.handle, fields=["hotel_id"])
+    records = await server._page_results.fn(first.handle, fields=["hotel_id"], output_format=OutputFormat.JSON)
+
+    assert table.table.columns == ["hotel_id"]
+    assert records.items[0] == {"hotel_id": first.table.rows[0][0]}
+    with pytest.raises(ValueError, match="Unknown fields"):
+        await server._page_results.fn(first.handle, fields=["stars"], output_format=OutputFormat.JSON)
+
+
+async def test_unknown_handles_are_rejected(server):
+    with pytest.raises(ValueError, match="call the tool again"):
+        await server._page_results.fn("expired")
+
+
+async def test_benchmark_stores_a_handle_to_page(server):
+    async with Client(server.mcp) as client:
+        handle = await bench.stored_handle(client, 0)
+        page = await client.call_tool("_page_results", {**bench.TOOL_ARGS["_page_results"](3), "handle": handle})
+
+    assert page.structured_content["offset"] == 30
+    assert server.result_store.get(handle) is not None
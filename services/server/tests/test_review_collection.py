@@ -0,0 +1,97 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+# The mock upstream has 1050 reviews for this hotel and 75 for SMALL_HOTEL
+HOTEL = "100001"
+SMALL_HOTEL = "100002"
+NEWEST = date(2025, 12, 31)
+
+
+class Progress:
+    def __init__(self):
+        self.reports = []
+
+    async def report_progress(self, progress, total, message):
+        self.reports.append((progress, total))
+
+
+async def test_reviews_span_pages_newest_first(server, upstream):
+    reviews = await server._collect_hotel_reviews.fn(HOTEL, limit=60)
+
+    assert len(reviews) == 60
+    assert [review.date for review in reviews] == sorted((review.date for review in reviews), reverse=True)
+    assert len({review.review_hash for review in reviews}) == 60
+    assert upstream.requests["/hotels/reviews"] <= 4
+
+
+async def test_reading_stops_at_the_oldest_review(server):
+    reviews = await server._collect_hotel_reviews.fn(SMALL_HOTEL, limit=200)
+
+    assert len(reviews) == 75
+
+
+async def test_since_stops_at_the_first_older_review(server, upstream):
+    since = NEWEST - timedelta(days=20)
+
+    reviews = await server._collect_hotel_reviews.fn(HOTEL, limit=200, since=since)
+
+    assert len(reviews) == 11
+    assert all(review.date[:10] >= since.isoformat() for review in reviews)
+    assert upstream.requests["/hotels/reviews"] <= 2
+
+
+async def test_languages_are_filtered(server):
+    reviews = await server._collect_hotel_reviews.fn(HOTEL, limit=30, languages=["de"])
+
+    assert len(reviews) == 30
+    assert {review.languagecode for review in reviews} == {"de"}
+
+
+async def test_progress_is_reported(server):
+    progress = Progress()
+
+    await server._collect_hotel_reviews.fn(HOTEL, limit=60, ctx=progress)
+
+    assert progress.reports
+    assert progress.reports[-1] == (60, 60)
+
+
+async def test_next_page_is_requested_while_storing(server, upstream):
+    requested = []
+
+    class SlowProgress:
+        async def report_progress(self, progress, total, message):
+            await asyncio.sleep(0.01)
+            requested.append(upstream.requests["/hotels/reviews"])
+
+    await server._collect_hotel_reviews.fn(HOTEL, limit=60, ctx=SlowProgress())
+
+    # Every page but the last was followed by a request for the next one
+    assert requested == [2, 3, 3]
+
+
+async def test_no_page_is_read_beyond_the_limit(server, upstream):
+    await server._collect_hotel_reviews.fn(HOTEL, limit=50)
+
+    assert upstream.requests["/hotels/reviews"] == 2
+
+
+async def test_language_filters_read_a_bounded_number_of_pages(server, upstream):
+    reviews = await server._collect_hotel_reviews.fn(HOTEL, limit=25, languages=["es"])
+
+    assert reviews == []
+    assert upstream.requests["/hotels/reviews"] == server.REVIEW_LANGUAGE_PAGES
+
+
+async def test_top_up_stops_at_the_stored_reviews(server, upstream):
+    await server._collect_hotel_reviews.fn(HOTEL, limit=25)
+    server.review_store.sync_interval = 0
+
+    reviews = await server._collect_hotel_reviews.fn(HOTEL, limit=25)
+
+    assert len(reviews) == 25
+    assert upstream.requests["/hotels/reviews"] == 2
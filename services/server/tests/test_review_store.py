@@ -0,0 +1,122 @@
+import gc
+import json
+import time
+
+import pytest
+
+from services.server.cache import ReviewStore
+from services.server.cache import __main__ as cli
+from services.server.mock_upstream import samples
+from services.server.schema.api_response import HotelReview
+
+pytestmark = pytest.mark.anyio
+
+
+def reviews(hotel_id: int, count: int, start: int = 0) -> list[HotelReview]:
+    return [
+        HotelReview.model_validate(samples.sample_review(index, hotel_id)) for index in range(start, start + count)
+    ]
+
+
+@pytest.fixture
+def store(tmp_path) -> ReviewStore:
+    return ReviewStore(path=str(tmp_path / "reviews.sqlite3"))
+
+
+def test_reviews_are_stored_once_and_served_newest_first(store):
+    assert store.add("1", reviews(1, 10)) == 10
+    assert store.add("1", reviews(1, 15)) == 5
+
+    served = store.reviews("1", 5)
+
+    assert [review.date for review in served] == sorted((review.date for review in served), reverse=True)
+    assert store.newest("1") == served[0].date
+    assert store.count("1", languages=["de"]) == 5
+    assert store.state("1").reviews == 15
+
+
+def test_languages_and_limits_are_applied_by_the_query(store):
+    codes = ["en-gb", "EN-us", "de", "en", "eng"]
+    store.add("1", [review.model_copy(update={"languagecode": code}) for review, code in zip(reviews(1, 5), codes)])
+
+    english = store.reviews("1", 10, languages=["en"])
+
+    assert sorted(review.languagecode for review in english) == ["EN-us", "en", "en-gb"]
+    assert sorted(review.languagecode for review in store.reviews("1", 10, languages=["en-GB", "de"])) == ["de", "en-gb"]
+    assert store.count("1", languages=["en"]) == 3
+    assert store.count("1", languages=["en"], limit=2) == 2
+    assert len(store.reviews("1", 2)) == 2
+
+
+def test_sync_state_expires_after_the_interval(tmp_path):
+    store = ReviewStore(path=str(tmp_path / "reviews.sqlite3"), sync_interval=60)
+    store.add("1", reviews(1, 5))
+    assert store.stale(store.state("1"))
+
+    store.mark_synced("1", complete=True)
+
+    assert not store.stale(store.state("1"))
+    assert store.state("1").complete
+
+
+def test_hotels_not_synced_for_max_age_are_pruned(store, monkeypatch):
+    store.max_age = 60
+    for hotel_id in (1, 2):
+        store.add(str(hotel_id), reviews(hotel_id, 5))
+        store.mark_synced(str(hotel_id), complete=False)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    store.mark_synced("2", complete=False)
+
+    assert store.prune() == 1
+    assert store.state("1") is None
+    assert store.count("2") == 5
+
+
+def test_least_recently_synced_hotels_are_pruned_beyond_max_reviews(store):
+    store.max_reviews = 25
+    for hotel_id in (1, 2, 3):
+        store.add(str(hotel_id), reviews(hotel_id, 10))
+        store.mark_synced(str(hotel_id), complete=False)
+        time.sleep(0.001)
+
+    assert store.prune() == 1
+    assert store.stats()["reviews"] == 20
+    assert store.state("1") is None
+
+
+def test_syncs_prune_periodically(store):
+    store.max_reviews = 5
+    store.prune_every = 2
+    store.add("1", reviews(1, 10))
+    store.mark_synced("1", complete=False)
+    assert store.count("1") == 10
+
+    store.mark_synced("1", complete=False)
+
+    assert store.count("1") == 0
+    assert store.stats()["evicted_hotels"] == 1
+
+
+async def test_sync_locks_are_dropped_after_use(store):
+    async with store.sync_lock("1"):
+        assert store.sync_lock("1").locked()
+    gc.collect()
+
+    assert len(store._sync_locks) == 0
+
+
+def test_cli_stats_and_purge(store, monkeypatch, capsys):
+    monkeypatch.setattr(cli, "review_store", store)
+    store.add("1", reviews(1, 5))
+    store.add("2", reviews(2, 3))
+    store.mark_synced("1", complete=False)
+
+    cli.main(["stats"])
+    stats = json.loads(capsys.readouterr().out)
+    cli.main(["purge-reviews", "--hotel", "2"])
+
+    assert stats["reviews"]["reviews"] == 8
+    assert stats["reviews"]["hotels"] == 1
+    assert "Removed 3 reviews" in capsys.readouterr().out
+    assert store.count("1") == 5
@@ -0,0 +1,83 @@
+from datetime import date
+
+import pytest
+
+from services.server.analysis import summarize_reviews
+from services.server.analysis.reviews import _bigrams
+from services.server.mock_upstream import samples
+from services.server.schema.api_response import HotelReview
+
+pytestmark = pytest.mark.anyio
+
+
+def review(index: int, **fields) -> HotelReview:
+    return HotelReview.model_validate({**samples.sample_review(index, 100001), **fields})
+
+
+def test_empty_summary():
+    summary = summarize_reviews("1", [])
+
+    assert summary.review_count == 0
+    assert summary.average_score is None
+
+
+def test_scores_and_purposes():
+    reviews = [
+        review(0, average_score=10.0, travel_purpose="leisure"),
+        review(1, average_score=8.5, travel_purpose="leisure"),
+        review(2, average_score=6.0, travel_purpose="business"),
+        review(3, average_score=1.0, travel_purpose=""),
+    ]
+
+    summary = summarize_reviews("1", reviews, today=date(2026, 1, 1))
+
+    assert summary.review_count == 4
+    assert summary.average_score == 6.38
+    assert summary.score_distribution == {
+        **{str(score): 0 for score in range(1, 11)},
+        "1": 1,
+        "6": 1,
+        "8": 1,
+        "10": 1,
+    }
+    assert summary.travel_purpose == {"business": 0.25, "leisure": 0.5, "unknown": 0.25}
+    assert summary.newest_review == "2025-12-31"
+    assert summary.oldest_review == "2025-12-25"
+
+
+def test_recent_reviews_weigh_more():
+    reviews = [
+        review(0, average_score=10.0, date="2025-12-31 10:00:00"),
+        review(1, average_score=2.0, date="2023-12-31 10:00:00"),
+    ]
+
+    summary = summarize_reviews("1", reviews, today=date(2026, 1, 1))
+
+    assert summary.average_score == 6.0
+    assert summary.recency_weighted_score > 9
+
+
+def test_tags_and_phrases_count_once_per_review():
+    reviews = [
+        review(0, tags=["Couple", "Couple"], pros="Great breakfast. Great breakfast!", cons=None),
+        review(1, tags=["Couple", "Solo traveller"], pros="Great breakfast and friendly staff", cons=None),
+    ]
+
+    summary = summarize_reviews("1", reviews)
+
+    assert summary.top_tags[0].phrase == "Couple"
+    assert summary.top_tags[0].count == 2
+    assert summary.top_pros[0].phrase == "great breakfast"
+    assert summary.top_pros[0].count == 2
+    assert summary.top_cons == []
+
+
+def test_phrases_skip_filler_words():
+    assert _bigrams("The staff was very friendly, clean rooms") == {"clean rooms"}
+
+
+async def test_summary_tool(server):
+    summary = await server._summarize_hotel_reviews.fn("100001", max_reviews=50)
+
+    assert summary.review_count == 50
+    assert summary.top_pros
@@ -0,0 +1,167 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from services.server.upstream import (
+    BookingClient,
+    Hedger,
+    Priority,
+    QuotaExhausted,
+    UpstreamScheduler,
+    priority_scope,
+)
+from services.server.upstream.scheduler import effective_priority
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_higher_priority_goes_first():
+    scheduler = UpstreamScheduler(rate=50, burst=1)
+    await scheduler.acquire()
+    order = []
+
+    async def request(name: str, priority: Priority):
+        await scheduler.acquire(priority)
+        order.append(name)
+
+    tasks = [asyncio.ensure_future(request("refresh", Priority.BACKGROUND))]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.ensure_future(request("enrich", Priority.ENRICHMENT)))
+    tasks.append(asyncio.ensure_future(request("search", Priority.INTERACTIVE)))
+    await asyncio.gather(*tasks)
+
+    assert order == ["search", "enrich", "refresh"]
+
+
+async def test_rate_is_respected():
+    scheduler = UpstreamScheduler(rate=100, burst=1)
+    started = time.monotonic()
+
+    for _ in range(6):
+        await scheduler.acquire()
+
+    assert time.monotonic() - started >= 0.045
+    assert scheduler.granted == 6
+
+
+def test_priority_scope_only_lowers_priority():
+    with priority_scope(Priority.ENRICHMENT):
+        assert effective_priority(Priority.INTERACTIVE) == Priority.ENRICHMENT
+        assert effective_priority(Priority.BACKGROUND) == Priority.BACKGROUND
+    assert effective_priority() == Priority.INTERACTIVE
+
+
+async def test_monthly_quota_is_enforced():
+    scheduler = UpstreamScheduler(rate=1000, monthly_quota=2)
+    await scheduler.acquire()
+    await scheduler.acquire()
+
+    assert scheduler.remaining_quota() == 0
+    with pytest.raises(QuotaExhausted):
+        await scheduler.acquire()
+
+
+def test_quota_reported_upstream_wins():
+    scheduler = UpstreamScheduler(rate=10, monthly_quota=100)
+    scheduler.observe(
+        httpx.Response(
+            200,
+            headers={"x-ratelimit-requests-remaining": "7", "x-ratelimit-requests-reset": "60"},
+        )
+    )
+
+    assert scheduler.remaining_quota() == 7
+
+
+def test_throttling_pauses_every_request():
+    scheduler = UpstreamScheduler(rate=10, backoff_max=30)
+
+    delay = scheduler.backoff(httpx.Response(429, headers={"retry-after": "2"}), attempt=0)
+
+    assert delay == 2
+    assert scheduler.stats()["paused_for"] == pytest.approx(2, abs=0.1)
+    assert scheduler.throttled == 1
+
+
+def test_backoff_without_retry_after_is_bounded():
+    scheduler = UpstreamScheduler(rate=10, backoff_base=0.5, backoff_max=3)
+
+    delays = [scheduler.backoff(httpx.Response(503), attempt) for attempt in range(10)]
+
+    assert all(0 <= delay <= 3 for delay in delays)
+
+
+def scripted_client(statuses: list[int], max_retries: int = 3) -> tuple[BookingClient, list]:
+    sent = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        sent.append(request)
+        return httpx.Response(statuses[min(len(sent), len(statuses)) - 1], json={})
+
+    client = BookingClient(
+        base_url="http://upstream/v1",
+        http2=False,
+        max_retries=max_retries,
+        scheduler=UpstreamScheduler(rate=1000, backoff_base=0.001),
+        hedger=Hedger(endpoints=set()),
+        transport=httpx.MockTransport(handle),
+    )
+    return client, sent
+
+
+async def test_failed_requests_are_retried():
+    client, sent = scripted_client([503, 502, 200])
+
+    response = await client.get("/hotels/review-scores", {"hotel_id": "1"})
+
+    assert response.status_code == 200
+    assert len(sent) == 3
+    assert client.scheduler.retries == 2
+
+
+async def test_retries_give_up_after_max_retries():
+    client, sent = scripted_client([503], max_retries=2)
+
+    response = await client.get("/hotels/review-scores", {"hotel_id": "1"})
+
+    assert response.status_code == 503
+    assert len(sent) == 3
+
+
+async def test_client_errors_are_not_retried():
+    client, sent = scripted_client([404])
+
+    response = await client.get("/hotels/review-scores", {"hotel_id": "1"})
+
+    assert response.status_code == 404
+    assert len(sent) == 1
+
+
+async def test_processes_share_the_rate_and_quota(tmp_path):
+    path = str(tmp_path / "scheduler.sqlite3")
+    first = UpstreamScheduler(rate=100, burst=1, monthly_quota=5, path=path)
+    second = UpstreamScheduler(rate=100, burst=1, monthly_quota=5, path=path)
+    started = time.monotonic()
+
+    for _ in range(2):
+        await first.acquire()
+        await second.acquire()
+
+    # One burst and three refills of 10 ms between them, not one burst each
+    assert time.monotonic() - started >= 0.025
+    assert first.used_this_month == second.used_this_month == 4
+    await second.acquire()
+    with pytest.raises(QuotaExhausted):
+        await first.acquire()
+
+
+def test_throttling_pauses_every_process(tmp_path):
+    path = str(tmp_path / "scheduler.sqlite3")
+    first = UpstreamScheduler(rate=10, path=path)
+    second = UpstreamScheduler(rate=10, path=path)
+
+    first.backoff(httpx.Response(429, headers={"retry-after": "2"}), attempt=0)
+
+    assert second.stats()["paused_for"] == pytest.approx(2, abs=0.1)
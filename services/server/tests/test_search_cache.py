@@ -0,0 +1,148 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+
+from services.server.cache import SearchCache, canonical_key
+from services.server.mock_upstream import samples
+from services.server.schema.api_response import BookingError, Hotel
+from services.server.upstream.scheduler import Priority, effective_priority
+
+pytestmark = pytest.mark.anyio
+
+HOTELS = [Hotel.model_validate(samples.sample_hotel(index)) for index in range(100)]
+CHECKIN = date.today() + timedelta(days=30)
+KEY = canonical_key({"dest_id": "-2092174", "checkin_date": CHECKIN})
+
+
+class Upstream:
+    """Fake search returning the first `max_results` of `available` hotels."""
+
+    def __init__(self, available: int = 100):
+        self.available = available
+        self.calls: list[tuple[int, Priority]] = []
+
+    async def fetch(self, max_results: int) -> list[Hotel]:
+        self.calls.append((max_results, effective_priority()))
+        return HOTELS[: min(max_results, self.available)]
+
+
+@pytest.fixture
+def cache() -> SearchCache:
+    return SearchCache(fresh_ttl=60, stale_ttl=3600, max_entries=8, shared=False)
+
+
+def age(cache: SearchCache, seconds: float):
+    cache._entries[KEY].created_at -= seconds
+
+
+async def settle(cache: SearchCache):
+    await asyncio.gather(*cache._refreshing.values())
+
+
+def test_canonical_key_ignores_order_and_value_types():
+    assert canonical_key({"a": 1, "b": "x"}) == canonical_key({"b": "x", "a": "1"})
+
+
+async def test_fresh_entry_is_served_without_upstream(cache):
+    upstream = Upstream()
+    await cache.get_or_fetch(KEY, CHECKIN, 20, upstream.fetch)
+
+    result = await cache.get_or_fetch(KEY, CHECKIN, 10, upstream.fetch)
+
+    assert result == HOTELS[:10]
+    assert len(upstream.calls) == 1
+    assert cache.fresh_hits == 1
+
+
+async def test_larger_request_than_cached_is_fetched(cache):
+    upstream = Upstream()
+    await cache.get_or_fetch(KEY, CHECKIN, 10, upstream.fetch)
+
+    result = await cache.get_or_fetch(KEY, CHECKIN, 50, upstream.fetch)
+
+    assert len(result) == 50
+    assert [max_results for max_results, _ in upstream.calls] == [10, 50]
+
+
+async def test_short_result_means_upstream_has_no_more(cache):
+    upstream = Upstream(available=7)
+    await cache.get_or_fetch(KEY, CHECKIN, 10, upstream.fetch)
+
+    result = await cache.get_or_fetch(KEY, CHECKIN, 50, upstream.fetch)
+
+    assert len(result) == 7
+    assert len(upstream.calls) == 1
+
+
+async def test_stale_entry_is_served_and_refreshed_in_background(cache):
+    upstream = Upstream()
+    await cache.get_or_fetch(KEY, CHECKIN, 20, upstream.fetch)
+    age(cache, 120)
+
+    result = await cache.get_or_fetch(KEY, CHECKIN, 20, upstream.fetch)
+    await settle(cache)
+
+    assert result == HOTELS[:20]
+    assert cache.stale_hits == 1
+    assert cache.refreshes == 1
+    assert upstream.calls[-1] == (20, Priority.BACKGROUND)
+    assert await cache.get_or_fetch(KEY, CHECKIN, 20, upstream.fetch) == HOTELS[:20]
+    assert cache.fresh_hits == 1
+
+
+async def test_refresh_started_by_a_smaller_request_keeps_the_whole_entry(cache):
+    upstream = Upstream()
+    await cache.get_or_fetch(KEY, CHECKIN, 100, upstream.fetch)
+    age(cache, 120)
+
+    assert len(await cache.get_or_fetch(KEY, CHECKIN, 10, upstream.fetch)) == 10
+    await settle(cache)
+
+    assert upstream.calls[-1] == (100, Priority.BACKGROUND)
+    result = await cache.get_or_fetch(KEY, CHECKIN, 100, upstream.fetch)
+    assert len(result) == 100
+    assert len(upstream.calls) == 2
+
+
+async def test_failed_refresh_keeps_serving_the_stale_entry(cache):
+    upstream = Upstream()
+    await cache.get_or_fetch(KEY, CHECKIN, 20, upstream.fetch)
+    age(cache, 120)
+
+    async def failing(max_results: int):
+        raise RuntimeError("upstream down")
+
+    assert await cache.get_or_fetch(KEY, CHECKIN, 20, failing) == HOTELS[:20]
+    await settle(cache)
+
+    assert cache.refresh_errors == 1
+    assert await cache.get_or_fetch(KEY, CHECKIN, 20, upstream.fetch) == HOTELS[:20]
+
+
+async def test_errors_and_past_checkins_are_not_served_from_cache(cache):
+    async def error(max_results: int):
+        return BookingError(detail="No availability")
+
+    assert isinstance(await cache.get_or_fetch(KEY, CHECKIN, 10, error), BookingError)
+    assert cache.stats()["entries"] == 0
+
+    upstream = Upstream()
+    yesterday = date.today() - timedelta(days=1)
+    await cache.get_or_fetch(KEY, yesterday, 10, upstream.fetch)
+    await cache.get_or_fetch(KEY, yesterday, 10, upstream.fetch)
+    assert len(upstream.calls) == 2
+
+
+async def test_shared_tier_is_read_by_another_process(tmp_path):
+    path = str(tmp_path / "search.sqlite3")
+    first = SearchCache(fresh_ttl=60, shared=True, path=path)
+    second = SearchCache(fresh_ttl=60, shared=True, path=path)
+    upstream = Upstream()
+    await first.get_or_fetch(KEY, CHECKIN, 20, upstream.fetch)
+
+    result = await second.get_or_fetch(KEY, CHECKIN, 20, upstream.fetch)
+
+    assert [hotel.hotel_id for hotel in result] == [hotel.hotel_id for hotel in HOTELS[:20]]
+    assert second.shared_hits == 1
+    assert len(upstream.calls) == 1
@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+
+import pytest
+
+from services.server.mock_upstream import app as mock_app
+from services.server.mock_upstream import samples
+
+pytestmark = pytest.mark.anyio
+
+QUERY = {"dest_id": "-2092174", "dest_type": "city", "locale": "en-gb"}
+
+
+async def test_pages_are_fetched_until_max_results(server, upstream):
+    hotels = await server._fetch_search_pages(QUERY, 50)
+
+    assert len(hotels) == 50
+    assert len({hotel.hotel_id for hotel in hotels}) == 50
+    assert upstream.requests["/hotels/search"] == 3
+
+
+async def test_short_page_ends_the_search(server, upstream, monkeypatch):
+    def search(params):
+        page = int(params["page_number"])
+        return samples.sample_search_page(20 if page == 0 else 5, 20 * page)
+
+    monkeypatch.setitem(mock_app.SYNTHETIC, "/hotels/search", search)
+
+    hotels = await server._fetch_search_pages(QUERY, 200)
+
+    assert len(hotels) == 25
+    # Only the pages in flight when the short page arrived were requested
+    assert upstream.requests["/hotels/search"] <= server.SEARCH_PAGE_CONCURRENCY + 1
+
+
+async def test_duplicates_across_pages_are_dropped(server, monkeypatch):
+    # Upstream shifts results between pages while they are being read
+    monkeypatch.setitem(
+        mock_app.SYNTHETIC,
+        "/hotels/search",
+        lambda params: samples.sample_search_page(20, 15 * int(params["page_number"])),
+    )
+
+    hotels = await server._fetch_search_pages(QUERY, 40)
+
+    ids = [hotel.hotel_id for hotel in hotels]
+    assert len(ids) == len(set(ids)) == 35
+
+
+async def test_search_tool_serves_repeats_from_cache(server, upstream):
+    checkin = date.today() + timedelta(days=30)
+    data = server.SearchArgs(
+        checkin_date=checkin.isoformat(),
+        checkout_date=(checkin + timedelta(days=2)).isoformat(),
+        destination_id="-2092174",
+        max_results=30,
+    )
+
+    first = await server._search_available_hotels.fn(data)
+    second = await server._search_available_hotels.fn(data)
+
+    assert len(first) == 30
+    assert second == first
+    assert upstream.requests["/hotels/search"] == 2
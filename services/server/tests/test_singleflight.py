@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from services.server.upstream.singleflight import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    release = asyncio.Event()
+    executions = 0
+
+    async def work():
+        nonlocal executions
+        executions += 1
+        await release.wait()
+        return "result"
+
+    calls = [asyncio.ensure_future(flight.do("key", work)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*calls) == ["result"] * 5
+    assert executions == 1
+    assert flight.stats() == {"calls": 5, "executions": 1, "collapsed": 4, "in_flight": 0}
+
+
+async def test_different_keys_run_apart():
+    flight = SingleFlight()
+
+    async def work(value):
+        await asyncio.sleep(0)
+        return value
+
+    assert await asyncio.gather(flight.do("a", lambda: work(1)), flight.do("b", lambda: work(2))) == [1, 2]
+    assert flight.executions == 2
+
+
+async def test_finished_calls_are_not_reused():
+    flight = SingleFlight()
+    results = iter([1, 2])
+
+    async def work():
+        return next(results)
+
+    assert await flight.do("key", work) == 1
+    assert await flight.do("key", work) == 2
+
+
+async def test_exception_reaches_every_waiter():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0)
+        raise ValueError("upstream failed")
+
+    results = await asyncio.gather(
+        flight.do("key", work), flight.do("key", work), return_exceptions=True
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.in_flight == 0
+
+
+async def test_cancelled_waiter_does_not_cancel_the_others():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return "result"
+
+    first = asyncio.ensure_future(flight.do("key", work))
+    second = asyncio.ensure_future(flight.do("key", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == "result"
+    assert first.cancelled()
+
+
+async def test_client_collapses_identical_requests(booking, upstream):
+    params = {"hotel_id": "100001", "locale": "en-gb"}
+
+    responses = await asyncio.gather(
+        *(booking.get("/hotels/review-scores", params) for _ in range(3))
+    )
+
+    assert all(response.status_code == 200 for response in responses)
+    assert upstream.requests["/hotels/review-scores"] == 1
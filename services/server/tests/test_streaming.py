@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from services.server.decoding import HOTEL_DECODER, iter_json_items
+from services.server.mock_upstream import samples
+
+pytestmark = pytest.mark.anyio
+
+
+class Chunks:
+    """Async iterator over a body split into `size` byte chunks, counting the reads."""
+
+    def __init__(self, content: bytes, size: int):
+        self.chunks = [content[start : start + size] for start in range(0, len(content), size)]
+        self.read = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> bytes:
+        if self.read >= len(self.chunks):
+            raise StopAsyncIteration
+        self.read += 1
+        return self.chunks[self.read - 1]
+
+
+async def collect(content: bytes, size: int, items_key=None) -> list:
+    return [item async for item in iter_json_items(Chunks(content, size), items_key)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 10_000])
+async def test_items_are_independent_of_chunk_boundaries(size):
+    body = {
+        "count": 12345,
+        "meta": {"nested": [1, 2, {"deep": "]}"}], "escaped": "quote \" and \\\\"},
+        "result": [{"name": "Hôtel Ünïcode ✓", "price": 1e3}, 42, -0.5, "text", None, [1, [2]]],
+        "after": True,
+    }
+
+    items = await collect(json.dumps(body, ensure_ascii=False).encode(), size, "result")
+
+    assert items == body["result"]
+
+
+async def test_top_level_array():
+    assert await collect(b' [1, {"a": []} , "x"] ', 2) == [1, {"a": []}, "x"]
+
+
+async def test_empty_arrays_and_missing_key():
+    assert await collect(b"[]", 1) == []
+    assert await collect(b'{"result": []}', 1, "result") == []
+    assert await collect(b'{"other": [1]}', 1, "result") == []
+
+
+async def test_reading_stops_with_the_consumer():
+    content = json.dumps({"result": list(range(1000))}).encode()
+    chunks = Chunks(content, 16)
+
+    items = iter_json_items(chunks, "result")
+    first = [await anext(items) for _ in range(3)]
+    await items.aclose()
+
+    assert first == [0, 1, 2]
+    assert chunks.read < 5
+
+
+@pytest.mark.parametrize(
+    "content, items_key",
+    [
+        (b'{"result": [1, 2', "result"),
+        (b'{"result": {"a": 1}}', "result"),
+        (b"[1, 2]", "result"),
+        (b"[1 2]", None),
+        (b'[1, "unterminated', None),
+    ],
+)
+async def test_invalid_or_truncated_bodies_raise(content, items_key):
+    with pytest.raises(ValueError):
+        await collect(content, 4, items_key)
+
+
+async def test_decode_stream_stops_after_limit():
+    content = json.dumps(samples.sample_search_page(20)).encode()
+    chunks = Chunks(content, 512)
+
+    page = await HOTEL_DECODER.decode_stream(chunks, limit=3)
+
+    assert [hotel.hotel_id for hotel in page.items] == [100000, 100001, 100002]
+    assert page.scanned == 3
+    assert chunks.read < len(chunks.chunks)
+
+
+async def test_streamed_and_buffered_decoding_agree(booking):
+    params = {"dest_id": "-2092174", "page_number": "0"}
+
+    streamed = await booking.get_items("/hotels/search", params, HOTEL_DECODER, limit=5)
+    booking.stream_decode = False
+    buffered = await booking.get_items("/hotels/search", params, HOTEL_DECODER, limit=5)
+
+    assert streamed == buffered
+    assert len(streamed) == 5
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from services.server.encoding import HOTEL_TABLE, REVIEW_TABLE, TableEncoder
+from services.server.mock_upstream import samples
+from services.server.schema.api_response import Hotel, HotelReview, OutputFormat
+
+pytestmark = pytest.mark.anyio
+
+HOTELS = [Hotel.model_validate(samples.sample_hotel(index)) for index in range(5)]
+
+
+def test_rows_follow_the_columns():
+    table = TableEncoder({"double": lambda x: 2 * x, "square": lambda x: x * x}).encode([1, 3])
+
+    assert table.columns == ["double", "square"]
+    assert table.rows == [[2, 1], [6, 9]]
+
+
+def test_hotel_rows():
+    table = HOTEL_TABLE.encode(HOTELS)
+    row = dict(zip(table.columns, table.rows[1]))
+
+    assert len(table.rows) == 5
+    assert row["hotel_id"] == 100001
+    assert row["name"] == "Sample Hotel 1"
+    assert row["km_to_centre"] == 0.1
+    assert row["price_per_night"] == HOTELS[1].composite_price_breakdown.gross_amount_per_night.value
+    assert (row["review_score"], row["reviews"]) == (HOTELS[1].review_score, HOTELS[1].review_nr)
+
+
+def test_table_is_much_smaller_than_json():
+    table = HOTEL_TABLE.encode(HOTELS).model_dump_json()
+    full = json.dumps([hotel.model_dump(mode="json", by_alias=True, exclude_none=True) for hotel in HOTELS])
+
+    assert len(table) * 4 < len(full)
+
+
+def test_review_rows():
+    reviews = [HotelReview.model_validate(review) for review in samples.sample_reviews_page(100001)["result"]]
+
+    table = REVIEW_TABLE.encode(reviews)
+    row = dict(zip(table.columns, table.rows[0]))
+
+    assert row["review_id"] == reviews[0].review_id
+    assert len(row["date"]) == 10
+
+
+async def test_tools_answer_in_table_format(server):
+    table = await server._fetch_hotel_reviews.fn("100001", OutputFormat.TABLE)
+
+    assert table.columns == list(REVIEW_TABLE.columns)
+    assert len(table.rows) == server.REVIEW_PAGE_SIZE
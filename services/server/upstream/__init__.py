@@ -0,0 +1,15 @@
+# __init__.py
+
+from .client import BookingClient, booking_client
+from .hedging import Hedger
+from .scheduler import Priority, QuotaExhausted, UpstreamScheduler, priority_scope
+
+__all__ = [
+    "BookingClient",
+    "booking_client",
+    "Hedger",
+    "Priority",
+    "QuotaExhausted",
+    "UpstreamScheduler",
+    "priority_scope",
+]
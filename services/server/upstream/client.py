@@ -0,0 +1,300 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Optional
+
+import httpx
+
+from services.server.decoding import DecodedPage, ResponseDecoder, phase_timings
+from services.server.metrics.instruments import UPSTREAM_RETRIES
+from services.server.upstream.hedging import Hedger
+from services.server.upstream.metering import MeteredTransport
+from services.server.upstream.recording import FixtureStore, RecordingTransport, request_key
+from services.server.upstream.scheduler import Priority, UpstreamScheduler
+from services.server.upstream.singleflight import SingleFlight
+
+BASE_URL = "https://booking-com.p.rapidapi.com/v1"
+RAPIDAPI_HOST = "booking-com.p.rapidapi.com"
+# Responses worth retrying, every request sent by the client is an idempotent GET
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package, fall back to HTTP/1.1 without it."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class BookingClient:
+    """Shared async client for the Booking.com RapidAPI endpoints.
+
+    A single `httpx.AsyncClient` is kept for the lifetime of the server so that
+    connections to the upstream host are pooled and kept alive between tool calls
+    instead of paying a TCP+TLS handshake on every request. Compressed responses
+    (gzip, and brotli when the `brotli` package is installed) are decoded by httpx.
+
+    All settings can be overridden through the environment:
+        BOOKING_HTTP_TIMEOUT: Total read/write/pool timeout in seconds (default 30)
+        BOOKING_HTTP_CONNECT_TIMEOUT: Connect timeout in seconds (default 5)
+        BOOKING_HTTP_MAX_CONNECTIONS: Max open connections to the upstream host (default 20)
+        BOOKING_HTTP_MAX_KEEPALIVE: Max idle keep-alive connections (default 10)
+        BOOKING_HTTP_KEEPALIVE_EXPIRY: Seconds an idle connection is kept (default 30)
+        BOOKING_HTTP2: Set to 0 to disable HTTP/2 negotiation (default 1)
+        BOOKING_STREAM_DECODE: Set to 0 to buffer bodies in `get_items` (default 1)
+        BOOKING_MAX_RETRIES: Retries of throttled or failed requests (default 3)
+        BOOKING_BASE_URL: Upstream base url, e.g. a local stand-in (default RapidAPI)
+        BOOKING_RECORD_DIR: Record every upstream response as a replay fixture in this directory
+
+    Every request is admitted by the `UpstreamScheduler`, which spreads requests
+    over the RapidAPI quota, and retried on 429, 5xx and connection errors.
+    Requests to the endpoints hedged by the `Hedger` are sent a second time when
+    they are slower than usual, see its settings.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None,
+        stream_decode: Optional[bool] = None,
+        max_retries: Optional[int] = None,
+        scheduler: Optional[UpstreamScheduler] = None,
+        hedger: Optional[Hedger] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        record_dir: Optional[str] = None,
+    ):
+        self.base_url = base_url or os.getenv("BOOKING_BASE_URL", BASE_URL)
+        self.api_key = api_key
+        self.timeout = timeout or float(os.getenv("BOOKING_HTTP_TIMEOUT", 30))
+        self.connect_timeout = connect_timeout or float(
+            os.getenv("BOOKING_HTTP_CONNECT_TIMEOUT", 5)
+        )
+        self.max_connections = max_connections or int(
+            os.getenv("BOOKING_HTTP_MAX_CONNECTIONS", 20)
+        )
+        self.max_keepalive_connections = max_keepalive_connections or int(
+            os.getenv("BOOKING_HTTP_MAX_KEEPALIVE", 10)
+        )
+        self.keepalive_expiry = keepalive_expiry or float(
+            os.getenv("BOOKING_HTTP_KEEPALIVE_EXPIRY", 30)
+        )
+        if http2 is None:
+            http2 = os.getenv("BOOKING_HTTP2", "1") != "0"
+        self.http2 = http2 and _http2_available()
+        if stream_decode is None:
+            stream_decode = os.getenv("BOOKING_STREAM_DECODE", "1") != "0"
+        self.stream_decode = stream_decode
+        self.max_retries = (
+            max_retries if max_retries is not None else int(os.getenv("BOOKING_MAX_RETRIES", 3))
+        )
+        self.scheduler = scheduler or UpstreamScheduler()
+        self.hedger = hedger or Hedger()
+        self.transport = transport
+        self.record_dir = record_dir or os.getenv("BOOKING_RECORD_DIR")
+        self._client: Optional[httpx.AsyncClient] = None
+        self.single_flight = SingleFlight()
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {
+            "x-rapidapi-key": self.api_key or os.getenv("RAPID_BOOKING_API_KEY", ""),
+            "x-rapidapi-host": RAPIDAPI_HOST,
+        }
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The pooled client, created lazily inside the running event loop."""
+        if self._client is None or self._client.is_closed:
+            limits = httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            )
+            base_path = httpx.URL(self.base_url).path
+            transport = MeteredTransport(
+                self.transport or httpx.AsyncHTTPTransport(http2=self.http2, limits=limits),
+                base_path=base_path,
+            )
+            if self.record_dir:
+                transport = RecordingTransport(
+                    FixtureStore(self.record_dir), transport, base_path=base_path
+                )
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                http2=self.http2,
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                limits=limits,
+                transport=transport,
+            )
+        return self._client
+
+    request_key = staticmethod(request_key)
+
+    async def send(
+        self,
+        path: str,
+        params: dict[str, Any],
+        priority: Optional[Priority] = None,
+        stream: bool = False,
+    ) -> httpx.Response:
+        """Send a GET request through the scheduler, retrying throttled and failed attempts.
+
+        Args:
+            path (str): Endpoint path relative to the base url
+            params (dict): Query parameters of the request
+            priority (Priority): Scheduling class of the request
+            stream (bool): Return before the body is read, the caller must close the response
+
+        Returns:
+            httpx.Response: The last response received, status is not checked
+        """
+        request = self.client.build_request("GET", path, params=params)
+        attempt = 0
+        while True:
+            with phase_timings.measure("queue"):
+                await self.scheduler.acquire(priority)
+            try:
+                with phase_timings.measure("network"):
+                    response = await self._send_once(path, request, stream, priority)
+            except httpx.TransportError as err:
+                if attempt >= self.max_retries:
+                    raise
+                UPSTREAM_RETRIES.inc(endpoint=path, reason=type(err).__name__)
+                await asyncio.sleep(self.scheduler.backoff(None, attempt))
+                attempt += 1
+                continue
+
+            self.scheduler.observe(response)
+            if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                return response
+            await response.aclose()
+            UPSTREAM_RETRIES.inc(endpoint=path, reason=str(response.status_code))
+            await asyncio.sleep(self.scheduler.backoff(response, attempt))
+            attempt += 1
+
+    async def _send_once(
+        self, path: str, request: httpx.Request, stream: bool, priority: Optional[Priority]
+    ) -> httpx.Response:
+        if path not in self.hedger.endpoints:
+            return await self.client.send(request, stream=stream)
+
+        def send() -> Awaitable[httpx.Response]:
+            # Each copy gets a request object of its own
+            copy = self.client.build_request("GET", request.url)
+            return self.client.send(copy, stream=stream)
+
+        return await self.hedger.send(path, send, lambda: self.scheduler.acquire(priority))
+
+    async def get(
+        self,
+        path: str,
+        params: dict[str, Any],
+        coalesce: bool = True,
+        priority: Optional[Priority] = None,
+    ) -> httpx.Response:
+        """Send a GET request to an upstream endpoint.
+
+        Concurrent identical requests share a single upstream call unless
+        `coalesce` is disabled.
+
+        Args:
+            path (str): Endpoint path relative to the base url, e.g. `/hotels/search`
+            params (dict): Query parameters of the request
+            coalesce (bool): Share the response with identical in-flight requests
+            priority (Priority): Scheduling class of the request
+
+        Returns:
+            httpx.Response: The upstream response, status is not checked
+        """
+        if not coalesce:
+            return await self.send(path, params, priority)
+        return await self.single_flight.do(
+            self.request_key(path, params),
+            lambda: self.send(path, params, priority),
+        )
+
+    async def get_json(
+        self, path: str, params: dict[str, Any], priority: Optional[Priority] = None
+    ) -> Any:
+        """Send a GET request and return the decoded JSON body.
+
+        Raises:
+            httpx.HTTPStatusError: If the upstream responds with an error status
+        """
+        response = await self.get(path, params, priority=priority)
+        response.raise_for_status()
+        return response.json()
+
+    async def get_items(
+        self,
+        path: str,
+        params: dict[str, Any],
+        decoder: ResponseDecoder,
+        limit: Optional[int] = None,
+        priority: Optional[Priority] = None,
+    ) -> list:
+        """Send a GET request and decode the items of the response body.
+
+        In streaming mode items are validated while the body arrives and the
+        response is closed as soon as `limit` items are collected, so the memory
+        held per request is bounded by the items kept rather than the page size.
+        Concurrent identical requests share the decoded result.
+
+        Args:
+            path (str): Endpoint path relative to the base url
+            params (dict): Query parameters of the request
+            decoder (ResponseDecoder): Decoder of the response body
+            limit (int): Maximum number of items to return
+            priority (Priority): Scheduling class of the request
+
+        Raises:
+            httpx.HTTPStatusError: If the upstream responds with an error status,
+                the body of the error response is available on the exception
+        """
+        page = await self.get_page(path, params, decoder, limit, priority)
+        return page.items
+
+    async def get_page(
+        self,
+        path: str,
+        params: dict[str, Any],
+        decoder: ResponseDecoder,
+        limit: Optional[int] = None,
+        priority: Optional[Priority] = None,
+    ) -> DecodedPage:
+        """Same as `get_items`, also reporting the number of raw items read."""
+        return await self.single_flight.do(
+            f"{self.request_key(path, params)}#{decoder.model.__name__}:{limit}",
+            lambda: self._get_page(path, params, decoder, limit, priority),
+        )
+
+    async def _get_page(self, path, params, decoder, limit, priority) -> DecodedPage:
+        if not self.stream_decode:
+            response = await self.send(path, params, priority)
+            response.raise_for_status()
+            return decoder.decode_page(response.content, limit)
+
+        response = await self.send(path, params, priority, stream=True)
+        try:
+            if response.is_error:
+                await response.aread()
+                response.raise_for_status()
+            return await decoder.decode_stream(response.aiter_bytes(), limit)
+        finally:
+            await response.aclose()
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+booking_client = BookingClient()
@@ -0,0 +1,177 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+import httpx
+import numpy as np
+
+from services.server.metrics.instruments import UPSTREAM_HEDGES
+
+
+def _close_loser(task: asyncio.Future):
+    """Release the connection of a request which answered after losing the race."""
+    if not task.cancelled() and task.exception() is None:
+        asyncio.ensure_future(task.result().aclose())
+
+
+class _EndpointLatency:
+    def __init__(self, window: int):
+        # Seconds until the response to the original of recent requests, and whether they were hedged
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.hedged: deque[bool] = deque(maxlen=window)
+        self.requests = 0
+        self.hedges = 0
+        self.wins = 0
+
+
+class Hedger:
+    """Send a second copy of a slow upstream request and keep whichever answers first.
+
+    The time until the response to the original of every request of a hedged
+    endpoint is tracked over the last `window` requests, up to its cancellation
+    when the hedge answered first. A request still unanswered after the
+    `percentile` of these latencies, `min_delay` at least, is sent once more
+    and the first of both responses is used, the other request is cancelled.
+    Nothing is hedged until `min_samples` latencies are known, and at most
+    `max_ratio` of the recent requests of an endpoint are hedged so that the
+    duplicates stay a bounded share of the RapidAPI quota. Every request sent
+    upstream is a GET, which makes all endpoints safe to hedge.
+
+    Settings can be overridden through the environment:
+        BOOKING_HEDGE_ENDPOINTS: Comma separated endpoints to hedge, e.g. /hotels/search (default none)
+        BOOKING_HEDGE_PERCENTILE: Latency percentile after which a request is hedged (default 90)
+        BOOKING_HEDGE_MIN_DELAY: Seconds a request is always given before hedging (default 0.05)
+        BOOKING_HEDGE_MAX_RATIO: Max fraction of the recent requests hedged (default 0.05)
+        BOOKING_HEDGE_MIN_SAMPLES: Latencies needed before hedging starts (default 20)
+        BOOKING_HEDGE_WINDOW: Recent requests the percentile and ratio are taken over (default 200)
+    """
+
+    def __init__(
+        self,
+        endpoints: Optional[set[str]] = None,
+        percentile: Optional[float] = None,
+        min_delay: Optional[float] = None,
+        max_ratio: Optional[float] = None,
+        min_samples: Optional[int] = None,
+        window: Optional[int] = None,
+    ):
+        if endpoints is None:
+            endpoints = {
+                endpoint.strip()
+                for endpoint in os.getenv("BOOKING_HEDGE_ENDPOINTS", "").split(",")
+                if endpoint.strip()
+            }
+        self.endpoints = endpoints
+        self.percentile = percentile or float(os.getenv("BOOKING_HEDGE_PERCENTILE", 90))
+        self.min_delay = (
+            min_delay
+            if min_delay is not None
+            else float(os.getenv("BOOKING_HEDGE_MIN_DELAY", 0.05))
+        )
+        self.max_ratio = (
+            max_ratio
+            if max_ratio is not None
+            else float(os.getenv("BOOKING_HEDGE_MAX_RATIO", 0.05))
+        )
+        self.min_samples = min_samples or int(os.getenv("BOOKING_HEDGE_MIN_SAMPLES", 20))
+        self.window = window or int(os.getenv("BOOKING_HEDGE_WINDOW", 200))
+        self._endpoints: dict[str, _EndpointLatency] = {}
+
+    def _latency(self, endpoint: str) -> _EndpointLatency:
+        latency = self._endpoints.get(endpoint)
+        if latency is None:
+            latency = self._endpoints[endpoint] = _EndpointLatency(self.window)
+        return latency
+
+    def threshold(self, endpoint: str) -> Optional[float]:
+        """Seconds after which a request to `endpoint` is hedged, None while not hedging it."""
+        latency = self._endpoints.get(endpoint)
+        if endpoint not in self.endpoints or latency is None:
+            return None
+        if len(latency.latencies) < self.min_samples:
+            return None
+        return max(float(np.percentile(latency.latencies, self.percentile)), self.min_delay)
+
+    def _within_budget(self, latency: _EndpointLatency) -> bool:
+        # This request counts as hedged once the hedge is sent
+        return sum(latency.hedged) + 1 <= self.max_ratio * (len(latency.hedged) + 1)
+
+    async def send(
+        self,
+        endpoint: str,
+        send: Callable[[], Awaitable[httpx.Response]],
+        admit: Callable[[], Awaitable[None]],
+    ) -> httpx.Response:
+        """Run `send`, and once more if it is slower than the threshold of `endpoint`.
+
+        Args:
+            endpoint (str): Path of the endpoint, the latencies are tracked per endpoint
+            send: Coroutine factory sending the request once
+            admit: Waits until the scheduler lets the hedge go out
+
+        Returns:
+            httpx.Response: The first response, an exception is only raised when both fail
+        """
+        latency = self._latency(endpoint)
+        threshold = self.threshold(endpoint)
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(send())
+        hedge: Optional[asyncio.Future] = None
+        winner: Optional[asyncio.Future] = None
+        try:
+            if threshold is not None:
+                await asyncio.wait({primary}, timeout=threshold)
+            if primary.done() or threshold is None or not self._within_budget(latency):
+                latency.hedged.append(False)
+                winner = primary
+                response = await primary
+                latency.latencies.append(time.perf_counter() - started)
+                return response
+
+            latency.hedged.append(True)
+            latency.hedges += 1
+            hedge = asyncio.ensure_future(self._admitted(admit, send))
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((task for task in done if task.exception() is None), None)
+                if winner is not None:
+                    break
+            else:
+                # Both failed, report the error of the original request
+                return primary.result()
+            won = winner is hedge
+            if not won or not primary.done():
+                # The latency of the original request even when the hedge won, up to
+                # its cancellation below, so the threshold isn't learned from the
+                # faster of both attempts
+                latency.latencies.append(time.perf_counter() - started)
+            latency.wins += won
+            UPSTREAM_HEDGES.inc(endpoint=endpoint, result="won" if won else "lost")
+            return winner.result()
+        finally:
+            latency.requests += 1
+            for task in (primary, hedge):
+                if task is not None and task is not winner:
+                    task.cancel()
+                    task.add_done_callback(_close_loser)
+
+    @staticmethod
+    async def _admitted(admit, send) -> httpx.Response:
+        await admit()
+        return await send()
+
+    def stats(self) -> dict:
+        stats = {}
+        for endpoint, latency in self._endpoints.items():
+            threshold = self.threshold(endpoint)
+            stats[endpoint] = {
+                "requests": latency.requests,
+                "hedges": latency.hedges,
+                "wins": latency.wins,
+                "hedge_rate": latency.hedges / latency.requests if latency.requests else 0.0,
+                "threshold_ms": threshold * 1000 if threshold is not None else None,
+            }
+        return stats
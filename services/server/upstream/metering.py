@@ -0,0 +1,78 @@
+import asyncio
+import time
+from typing import AsyncIterator
+
+import httpx
+
+from services.server.metrics.instruments import (
+    UPSTREAM_BYTES,
+    UPSTREAM_DURATION,
+    UPSTREAM_IN_FLIGHT,
+    UPSTREAM_REQUESTS,
+)
+
+
+class _MeteredStream(httpx.AsyncByteStream):
+    """Body stream recording its size and the request duration once it is read or closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, endpoint: str, started: float):
+        self.stream = stream
+        self.endpoint = endpoint
+        self.started = started
+        self.received = 0
+        self.done = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self.stream:
+            self.received += len(chunk)
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self.stream.aclose()
+        finally:
+            if not self.done:
+                self.done = True
+                UPSTREAM_IN_FLIGHT.inc(-1, endpoint=self.endpoint)
+                UPSTREAM_BYTES.inc(self.received, endpoint=self.endpoint)
+                elapsed = time.perf_counter() - self.started
+                UPSTREAM_DURATION.observe(elapsed, endpoint=self.endpoint)
+
+
+class MeteredTransport(httpx.AsyncBaseTransport):
+    """Transport recording status, duration and received bytes of every upstream request.
+
+    Bytes are counted as they come off the wire, before decompression, and the
+    duration runs until the body is fully read or the response closed, so that
+    streamed bodies and early stops are measured as they happen.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, base_path: str = ""):
+        self.transport = transport
+        self.base_path = base_path.rstrip("/")
+
+    def endpoint(self, request: httpx.Request) -> str:
+        path = request.url.path
+        if self.base_path and path.startswith(self.base_path):
+            path = path[len(self.base_path):]
+        return path
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        endpoint = self.endpoint(request)
+        started = time.perf_counter()
+        UPSTREAM_IN_FLIGHT.inc(endpoint=endpoint)
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException as err:
+            # Cancelled requests, e.g. the loser of a hedge, end here as well
+            status = "cancelled" if isinstance(err, asyncio.CancelledError) else "error"
+            UPSTREAM_IN_FLIGHT.inc(-1, endpoint=endpoint)
+            UPSTREAM_REQUESTS.inc(endpoint=endpoint, status=status)
+            UPSTREAM_DURATION.observe(time.perf_counter() - started, endpoint=endpoint)
+            raise
+        UPSTREAM_REQUESTS.inc(endpoint=endpoint, status=str(response.status_code))
+        response.stream = _MeteredStream(response.stream, endpoint, started)
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
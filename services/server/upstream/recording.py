@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import urlencode
+
+import httpx
+
+
+def request_key(path: str, params: dict[str, Any]) -> str:
+    """Endpoint plus canonical querystring, identical for identical requests."""
+    return f"{path}?{urlencode(sorted((k, str(v)) for k, v in params.items()))}"
+
+
+class Fixture(dict):
+    """A recorded upstream response: `path`, `params`, `status`, `content_type` and `body`."""
+
+    def content(self) -> bytes:
+        body = self["body"]
+        if isinstance(body, str) and not self["content_type"].startswith("application/json"):
+            return body.encode()
+        return json.dumps(body, ensure_ascii=False).encode()
+
+
+class FixtureStore:
+    """Directory of recorded upstream responses, one JSON file per distinct request.
+
+    Files are laid out as `<endpoint>/<hash of the request>.json` where the hash
+    is taken from the same canonical request key the client uses for coalescing,
+    so a replayed request finds its recording regardless of parameter order.
+    Credentials and response headers are never written.
+    """
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self._index: Optional[dict[str, dict[str, Path]]] = None
+
+    def _file(self, path: str, params: dict[str, Any]) -> Path:
+        digest = hashlib.sha1(request_key(path, params).encode()).hexdigest()[:16]
+        return self.directory / path.strip("/").replace("/", "_") / f"{digest}.json"
+
+    def save(self, path: str, params: dict[str, Any], status: int, content_type: str, content: bytes):
+        try:
+            body = json.loads(content)
+        except ValueError:
+            body = content.decode(errors="replace")
+        file = self._file(path, params)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        fixture = {
+            "path": path,
+            "params": {k: str(v) for k, v in sorted(params.items())},
+            "status": status,
+            "content_type": content_type,
+            "body": body,
+        }
+        tmp = file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(fixture, ensure_ascii=False, indent=1))
+        os.replace(tmp, file)
+        self._index = None
+
+    def _load(self, file: Path) -> Fixture:
+        return Fixture(json.loads(file.read_text()))
+
+    def find(self, path: str, params: dict[str, Any]) -> Optional[Fixture]:
+        """The recording of exactly this request, if any."""
+        file = self._file(path, params)
+        return self._load(file) if file.exists() else None
+
+    def for_endpoint(self, path: str) -> list[Path]:
+        if self._index is None:
+            self._index = {}
+            for file in sorted(self.directory.glob("*/*.json")):
+                self._index.setdefault(file.parent.name, {})[file.stem] = file
+        return list(self._index.get(path.strip("/").replace("/", "_"), {}).values())
+
+    def nearest(self, path: str, params: dict[str, Any]) -> Optional[Fixture]:
+        """The exact recording, else the recording of the same endpoint sharing most parameters."""
+        fixture = self.find(path, params)
+        if fixture is not None:
+            return fixture
+        wanted = {(k, str(v)) for k, v in params.items()}
+        best, best_score = None, -1
+        for file in self.for_endpoint(path):
+            candidate = self._load(file)
+            score = len(wanted & set(candidate["params"].items()))
+            if score > best_score:
+                best, best_score = candidate, score
+        return best
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.directory.glob("*/*.json"))
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Transport capturing every successful or client-error upstream response into a `FixtureStore`.
+
+    Bodies are read in full before being handed back, so streaming decode loses
+    its early stop while recording.
+    """
+
+    def __init__(self, store: FixtureStore, transport: httpx.AsyncBaseTransport, base_path: str = ""):
+        self.store = store
+        self.transport = transport
+        self.base_path = base_path.rstrip("/")
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.transport.handle_async_request(request)
+        # Throttling and server errors say nothing about the endpoint worth replaying
+        if response.status_code == 429 or response.status_code >= 500:
+            return response
+        try:
+            content = await response.aread()
+        finally:
+            await response.aclose()
+        path = request.url.path
+        if self.base_path and path.startswith(self.base_path):
+            path = path[len(self.base_path):]
+        self.store.save(
+            path,
+            dict(request.url.params),
+            response.status_code,
+            response.headers.get("content-type", "application/json"),
+            content,
+        )
+        # The body handed back is already decoded and complete
+        headers = [
+            (k, v)
+            for k, v in response.headers.items()
+            if k not in ("content-encoding", "content-length", "transfer-encoding")
+        ]
+        return httpx.Response(
+            response.status_code,
+            headers=headers,
+            content=content,
+            request=request,
+            extensions=response.extensions,
+        )
+
+    async def aclose(self):
+        await self.transport.aclose()
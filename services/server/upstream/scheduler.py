@@ -0,0 +1,327 @@
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import Optional
+
+import httpx
+
+
+class Priority(IntEnum):
+    """Order in which queued upstream requests are let through, lowest first."""
+
+    INTERACTIVE = 0
+    ENRICHMENT = 1
+    BACKGROUND = 2
+
+
+_priority: ContextVar[Priority] = ContextVar("upstream_priority", default=Priority.INTERACTIVE)
+
+
+@contextmanager
+def priority_scope(priority: Priority):
+    """Lower the priority of every upstream request made within the block."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def effective_priority(priority: Optional[Priority] = None) -> Priority:
+    # A scope can only lower the priority requested by the caller, never raise it
+    return max(priority or Priority.INTERACTIVE, _priority.get())
+
+
+class QuotaExhausted(Exception):
+    pass
+
+
+def _current_month() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m")
+
+
+class TokenBucket:
+    """Tokens, throttling pause and monthly request count of one process."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.refilled_at = time.time()
+        self.paused_until = 0.0
+        self.month = _current_month()
+        self.used = 0
+
+    def _refill(self, now: float):
+        # Wall clock time, comparable between processes; a clock set back refills nothing
+        self.tokens = min(self.burst, self.tokens + max(now - self.refilled_at, 0.0) * self.rate)
+        self.refilled_at = now
+        if self.month != _current_month():
+            self.month = _current_month()
+            self.used = 0
+
+    def take(self) -> float:
+        """Take a token, or tell how many seconds to wait before trying again."""
+        now = time.time()
+        self._refill(now)
+        pause = self.paused_until - now
+        shortage = (1 - self.tokens) / self.rate if self.tokens < 1 else 0.0
+        delay = max(pause, shortage, 0.0)
+        if delay <= 0:
+            self.tokens -= 1
+            self.used += 1
+        return delay
+
+    def pause(self, seconds: float):
+        """Let no request through for `seconds`."""
+        self.paused_until = max(self.paused_until, time.time() + seconds)
+
+    def paused_for(self) -> float:
+        return max(self.paused_until - time.time(), 0.0)
+
+    def used_this_month(self) -> int:
+        self._refill(time.time())
+        return self.used
+
+
+class SharedTokenBucket(TokenBucket):
+    """A `TokenBucket` kept in a SQLite row, for processes sharing one RapidAPI plan.
+
+    Every operation loads the row, applies the change and writes it back within
+    one write transaction, so the processes together stay within the rate, burst
+    and monthly quota.
+    """
+
+    def __init__(self, rate: float, burst: float, path: str):
+        super().__init__(rate, burst)
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS token_bucket (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                tokens REAL NOT NULL,
+                refilled_at REAL NOT NULL,
+                paused_until REAL NOT NULL,
+                month TEXT NOT NULL,
+                used INTEGER NOT NULL
+            )"""
+        )
+        # The first process creates the row, the others join it
+        self._conn.execute(
+            "INSERT OR IGNORE INTO token_bucket VALUES (0, ?, ?, ?, ?, ?)",
+            (self.tokens, self.refilled_at, self.paused_until, self.month, self.used),
+        )
+
+    @contextmanager
+    def _synced(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.tokens, self.refilled_at, self.paused_until, self.month, self.used = self._conn.execute(
+                    "SELECT tokens, refilled_at, paused_until, month, used FROM token_bucket WHERE id = 0"
+                ).fetchone()
+                yield
+                self._conn.execute(
+                    """UPDATE token_bucket
+                        SET tokens = ?, refilled_at = ?, paused_until = ?, month = ?, used = ?
+                        WHERE id = 0""",
+                    (self.tokens, self.refilled_at, self.paused_until, self.month, self.used),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def take(self) -> float:
+        with self._synced():
+            return super().take()
+
+    def pause(self, seconds: float):
+        with self._synced():
+            super().pause(seconds)
+
+    def paused_for(self) -> float:
+        with self._synced():
+            return super().paused_for()
+
+    def used_this_month(self) -> int:
+        with self._synced():
+            return super().used_this_month()
+
+
+class UpstreamScheduler:
+    """Rate limiter for the RapidAPI plan shared by all upstream requests.
+
+    Requests wait for a token from a bucket refilled at `rate` tokens per second,
+    queued by priority so that interactive searches go ahead of enrichment and
+    background refreshes. A 429 response pauses the whole queue for the time given
+    by `Retry-After` (or a jittered exponential backoff), and the monthly budget is
+    tracked both locally and from the `x-ratelimit-requests-*` response headers.
+
+    With a `path`, the bucket, the pause and the monthly count live in a SQLite
+    file shared by every process using it, so that several server workers send
+    `rate` requests per second and spend `monthly_quota` between them rather than
+    each. Priorities still only order the requests within a process.
+
+    Settings can be overridden through the environment:
+        RAPIDAPI_RATE_PER_SECOND: Sustained requests per second (default 5)
+        RAPIDAPI_BURST: Requests allowed in a burst (default the rate)
+        RAPIDAPI_MONTHLY_QUOTA: Requests per month, 0 for unlimited (default 0)
+        BOOKING_BACKOFF_BASE: First retry delay in seconds (default 0.5)
+        BOOKING_BACKOFF_MAX: Longest retry delay in seconds (default 30)
+        UPSTREAM_SCHEDULER_PATH: SQLite file of the state shared between processes
+            (default none, this process only)
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        monthly_quota: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_max: Optional[float] = None,
+        path: Optional[str] = None,
+    ):
+        self.rate = rate or float(os.getenv("RAPIDAPI_RATE_PER_SECOND", 5))
+        self.burst = burst or float(os.getenv("RAPIDAPI_BURST", self.rate))
+        self.monthly_quota = (
+            monthly_quota if monthly_quota is not None else int(os.getenv("RAPIDAPI_MONTHLY_QUOTA", 0))
+        )
+        self.backoff_base = backoff_base or float(os.getenv("BOOKING_BACKOFF_BASE", 0.5))
+        self.backoff_max = backoff_max or float(os.getenv("BOOKING_BACKOFF_MAX", 30))
+        self.path = path or os.getenv("UPSTREAM_SCHEDULER_PATH")
+
+        self._bucket = (
+            SharedTokenBucket(self.rate, self.burst, self.path) if self.path else TokenBucket(self.rate, self.burst)
+        )
+        self._queue: list[tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._condition = asyncio.Condition()
+
+        self.upstream_remaining: Optional[int] = None
+        self.upstream_reset_at: Optional[float] = None
+
+        self.granted = 0
+        self.throttled = 0
+        self.retries = 0
+        self.waited_seconds = 0.0
+
+    @property
+    def used_this_month(self) -> int:
+        return self._bucket.used_this_month()
+
+    def remaining_quota(self) -> Optional[int]:
+        """Requests left this month, None when unknown and unlimited."""
+        if self.upstream_reset_at is not None and time.time() >= self.upstream_reset_at:
+            self.upstream_remaining = self.upstream_reset_at = None
+        if self.upstream_remaining is not None:
+            return self.upstream_remaining
+        if self.monthly_quota:
+            return max(self.monthly_quota - self.used_this_month, 0)
+        return None
+
+    async def acquire(self, priority: Optional[Priority] = None):
+        """Wait until a request of the given priority may be sent.
+
+        Raises:
+            QuotaExhausted: If the monthly budget is used up
+        """
+        remaining = self.remaining_quota()
+        if remaining is not None and remaining <= 0:
+            raise QuotaExhausted("The monthly RapidAPI quota for the Booking API is used up")
+
+        entry = (effective_priority(priority), next(self._sequence))
+        started = time.monotonic()
+        async with self._condition:
+            heapq.heappush(self._queue, entry)
+            # A new head of the queue has to re-evaluate its waiting time
+            self._condition.notify_all()
+            try:
+                while True:
+                    if self._queue[0] != entry:
+                        await self._condition.wait()
+                        continue
+                    delay = self._bucket.take()
+                    if delay <= 0:
+                        heapq.heappop(self._queue)
+                        self.granted += 1
+                        self._condition.notify_all()
+                        break
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), delay)
+                    except TimeoutError:
+                        pass
+            except BaseException:
+                if entry in self._queue:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                    self._condition.notify_all()
+                raise
+        self.waited_seconds += time.monotonic() - started
+
+    def observe(self, response: httpx.Response):
+        """Track the quota reported by RapidAPI in the response headers."""
+        remaining = response.headers.get("x-ratelimit-requests-remaining")
+        if remaining is not None and remaining.isdigit():
+            self.upstream_remaining = int(remaining)
+            reset = response.headers.get("x-ratelimit-requests-reset")
+            if reset is not None and reset.isdigit():
+                self.upstream_reset_at = time.time() + int(reset)
+
+    def backoff(self, response: Optional[httpx.Response], attempt: int) -> float:
+        """Delay before retrying a failed request.
+
+        `Retry-After` is honored when present, otherwise the delay grows
+        exponentially with full jitter. A 429 also pauses every other request.
+        """
+        delay = _retry_after(response) if response is not None else None
+        if delay is None:
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        delay = min(delay, self.backoff_max)
+        self.retries += 1
+        if response is not None and response.status_code == 429:
+            self.throttled += 1
+            self._bucket.pause(delay)
+        return delay
+
+    def stats(self) -> dict:
+        queued = {priority.name.lower(): 0 for priority in Priority}
+        for priority, _ in self._queue:
+            queued[Priority(priority).name.lower()] += 1
+        return {
+            "granted": self.granted,
+            "throttled": self.throttled,
+            "retries": self.retries,
+            "waited_seconds": self.waited_seconds,
+            "queued": queued,
+            "used_this_month": self.used_this_month,
+            "remaining_quota": self.remaining_quota(),
+            "paused_for": self._bucket.paused_for(),
+        }
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
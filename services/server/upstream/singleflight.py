@@ -0,0 +1,58 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+
+class SingleFlight:
+    """Collapse concurrent identical calls into a single execution.
+
+    The first caller for a key starts the work, every caller arriving while it is
+    still running awaits the same task and receives the same result or exception.
+    Nothing is kept once the task finishes, so there is no staleness involved.
+    """
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.calls = 0
+        self.executions = 0
+        self.collapsed = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `fn` unless a call for `key` is already in flight, then share its outcome.
+
+        Args:
+            key (str): Identity of the call, equal keys are considered identical
+            fn: Coroutine factory performing the actual work
+
+        Returns:
+            Any: The result of the single shared execution
+        """
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.collapsed += 1
+        # Shield the shared task so that one cancelled waiter does not cancel it for all
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even when every waiter went away
+            task.exception()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "collapsed": self.collapsed,
+            "in_flight": self.in_flight,
+        }
@@ -6,7 +6,7 @@ class SortingMethods(Enum):
     POPULARITY = ("popularity", "Popularity")
     BAYESIAN_REVIEW_SCORE = ("bayesian_review_score", "Guest review score")
     HOTEL_STAR_RATING_DESC = ("class_descending", "Hotel Star Rating descending from stars (5 to 0)")
-    HOTEL_STAR_RATING_ASC = ("class_descending", "Hotel Star Rating ascending from stars (0 to 5)")
+    HOTEL_STAR_RATING_ASC = ("class_ascending", "Hotel Star Rating ascending from stars (0 to 5)")
     PRICE_LOW_TO_HIGH = ("price", "Price (low to high)")
     RELEVANCE = ("SORT_MOST_RELEVANT", "Most relevant to least relevant to the search")
     RECENCY_DESC = ("SORT_RECENT_DESC", "Sort by the latest/most recent results to the oldest ones")
@@ -16,6 +16,14 @@ class SortingMethods(Enum):
         self._value_ = value
         self.description = description
 
+    @classmethod
+    def _missing_(cls, value):
+        # Members are defined as (value, description) tuples, look them up by value alone
+        for member in cls:
+            if member.value == value:
+                return member
+        return None
+
     @property
     def desc(self):
         """Property to easily access the description."""